@@ -1,18 +1,30 @@
 """
 ChainSight — Supply Chain Risk Intelligence Dashboard
-Built with Streamlit + Plotly (both pre-installed on Streamlit Cloud)
-Zero extra dependencies needed.
+Built with Streamlit + Plotly. Risk scores come from chainsight_model.pkl,
+loaded once per server process by chainsight.serving.
 """
 
+import sys
+import time
+
 import streamlit as st
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
+import plotly.graph_objects as go       # free: streamlit has imported it already
+from datetime import date
+
+from chainsight import config, figcache, perf
+
+RUN_STARTED = time.perf_counter()
+timings = perf.timings                  # per-stage latency, see chainsight.perf
+
+# Everything else (numpy, the model, the aggregate store, the shipment index,
+# benchmark results) is imported or loaded by the page that needs it, so a
+# cold start only pays for the page being opened; see bench_startup.py.
 
 # ─── PAGE CONFIG (must be first Streamlit call) ───────────────────────────────
 st.set_page_config(
     page_title="ChainSight — Supply Chain Risk",
-    page_icon="◆",
+    page_icon=":material/diamond:",       # an emoji or icon name; other text
+                                          # goes through image_to_url (numpy)
     layout="wide",
     initial_sidebar_state="expanded",
 )
@@ -31,6 +43,7 @@ MUTED   = "#5A7080"
 DIM     = "#2A3A48"
 
 # ─── GLOBAL CSS ───────────────────────────────────────────────────────────────
+css_started = time.perf_counter()
 st.markdown(f"""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Space+Mono:wght@400;700&family=Syne:wght@400;600;700;800&display=swap');
@@ -82,7 +95,7 @@ footer {{
 }}
 h1, h2, h3 {{ color: {TEXT} !important; font-family: 'Syne', sans-serif !important; }}
 p  {{ color: {MUTED} !important; }}
-.stButton > button {{
+.stButton > button, .stDownloadButton > button {{
     background: {ACCENT} !important;
     color: {BG} !important;
     font-weight: 800 !important;
@@ -93,8 +106,8 @@ p  {{ color: {MUTED} !important; }}
     width: 100% !important;
     text-transform: uppercase;
 }}
-.stButton > button:hover {{ opacity: 0.85 !important; }}
-.stSelectbox label, .stNumberInput label {{
+.stButton > button:hover, .stDownloadButton > button:hover {{ opacity: 0.85 !important; }}
+.stSelectbox label, .stNumberInput label, .stDateInput label {{
     font-family: 'Space Mono', monospace !important;
     font-size: 10px !important;
     color: {MUTED} !important;
@@ -107,7 +120,7 @@ p  {{ color: {MUTED} !important; }}
     color: {TEXT} !important;
     border-radius: 8px !important;
 }}
-.stNumberInput input {{
+.stNumberInput input, .stDateInput input {{
     background: {SURFACE} !important;
     border: 1px solid {BORDER} !important;
     color: {TEXT} !important;
@@ -115,6 +128,7 @@ p  {{ color: {MUTED} !important; }}
 }}
 </style>
 """, unsafe_allow_html=True)
+timings.observe("css", "global", time.perf_counter() - css_started)
 
 # ─── PLOTLY BASE LAYOUT ───────────────────────────────────────────────────────
 PLOT_LAYOUT = dict(
@@ -132,65 +146,34 @@ def base_fig(height=320):
     fig.update_layout(height=height, **PLOT_LAYOUT)
     return fig
 
-def render(fig, key=None):
-    st.plotly_chart(fig, use_container_width=True,
-                    config={"displayModeBar": False}, key=key)
-
-# ─── DATA ─────────────────────────────────────────────────────────────────────
-ROUTE_LABELS  = ["Suez", "Commodity", "Pacific", "Atlantic", "Intra-Asia"]
-ROUTE_DELAYS  = [1.41, 1.22, 1.05, 0.92, 0.72]
-ROUTE_COLORS  = [ACCENT2, ACCENT3, ACCENT, BLUE, DIM]
-
-PRODUCT_LABELS = ["Perishables","Semiconductors","Consumer Elec.",
-                  "Pharma","Machinery","Textiles","Raw Materials"]
-PRODUCT_DELAYS = [1.28, 1.14, 1.07, 0.98, 0.91, 0.85, 0.78]
-PRODUCT_COLORS = [ACCENT2 if v>1.1 else ACCENT3 if v>0.95 else ACCENT
-                  for v in PRODUCT_DELAYS]
-
-ORIGIN_LABELS = ["Santos, BR","Mumbai, IN","Shenzhen, CN",
-                 "Shanghai, CN","Tokyo, JP","Hamburg, DE"]
-ORIGIN_DELAYS = [1.30, 1.22, 1.05, 0.98, 0.88, 0.72]
-ORIGIN_COLORS = [ACCENT2 if v>1.1 else ACCENT3 if v>0.95 else BLUE
-                 for v in ORIGIN_DELAYS]
-
-MONTHS = ["Jan","Feb","Mar","Apr","May","Jun",
-          "Jul","Aug","Sep","Oct","Nov","Dec"]
-VOL    = [780,720,850,810,760,900,870,830,780,910,840,760]
-DLY    = [11,8,13,10,9,14,12,11,9,15,11,9]
-
-MODELS_DATA = [
-    {"name": "XGBoost",             "acc": 92.4, "auc": 0.941, "best": True},
-    {"name": "Random Forest",       "acc": 89.8, "auc": 0.912, "best": False},
-    {"name": "SVM",                 "acc": 87.6, "auc": 0.889, "best": False},
-    {"name": "Logistic Regression", "acc": 84.3, "auc": 0.861, "best": False},
-    {"name": "KNN",                 "acc": 82.1, "auc": 0.838, "best": False},
-]
+def render(fig, key=None, select=False):
+    with timings.timer("render", key or "chart"):
+        if select:
+            st.plotly_chart(fig, use_container_width=True,
+                            config={"displayModeBar": False}, key=key,
+                            on_select="rerun", selection_mode="points")
+        else:
+            st.plotly_chart(fig, use_container_width=True,
+                            config={"displayModeBar": False}, key=key)
 
-FEAT_NAMES = ["Sched_Lead_Time","Base_Lead_Time","Route_Type","Origin_City",
-              "Weather_Index","Geopolitical_Idx","Transport_Mode",
-              "Product_Cat","Shipping_Cost"]
-FEAT_VALS  = [0.31, 0.22, 0.14, 0.09, 0.07, 0.06, 0.05, 0.04, 0.01]
+def cached_fig(key, build, *data):
+    """Figure from build(), reused while the values it is drawn from match.
+    Only actual builds are timed (stage "figure")."""
+    return figcache.figures.get(key, data, timings.timed("figure", key)(build))
 
-DELAY_BINS = list(range(16))
-DELAY_CNTS = [8753,362,185,148,112,89,72,58,45,38,30,24,19,14,11,40]
+def rank_colors(labels, palette):
+    return (palette + [DIM] * len(labels))[:len(labels)]
 
-CORR_NAMES = ["Actual_Lead_Time","Sched_Lead_Time","Base_Lead_Time",
-              "Weather_Severity","Geo_Risk_Index","Inflation_Rate","Shipping_Cost"]
-CORR_VALS  = [0.82, 0.43, 0.38, 0.12, 0.08, 0.03, 0.01]
-CORR_COLS  = [ACCENT2, ACCENT3, ACCENT3, BLUE, BLUE, DIM, DIM]
+def tier_colors(values, low):
+    return [ACCENT2 if v > 1.1 else ACCENT3 if v > 0.95 else low for v in values]
 
-DISRUPT_LABELS = ["Port Congestion","Geopolitical Conflict",
-                  "Extreme Weather","No Event"]
-DISRUPT_CNTS   = [820, 312, 115, 8753]
-DISRUPT_COLORS = [ACCENT2, ACCENT3, BLUE, DIM]
-
-ROUTE_RISK  = {"Suez":0.16,"Commodity":0.12,"Pacific":0.08,
-               "Atlantic":0.06,"Intra-Asia":0.04}
-PROD_RISK   = {"Perishables":0.05,"Semiconductors":0.04,
-               "Consumer Electronics":0.03,"Pharmaceuticals":0.02}
-ORIGIN_RISK = {"Santos, BR":0.06,"Mumbai, IN":0.05,"Shenzhen, CN":0.03}
+def highlight(colors, labels, selected):
+    if selected is None:
+        return colors
+    return [c if lbl == selected else DIM for c, lbl in zip(colors, labels)]
 
 # ─── UI HELPERS ───────────────────────────────────────────────────────────────
+@timings.timed("html")
 def page_header(title, accent, subtitle, badge="", badge_color=ACCENT):
     bdg = ""
     if badge:
@@ -213,6 +196,7 @@ def page_header(title, accent, subtitle, badge="", badge_color=ACCENT):
     </div>""", unsafe_allow_html=True)
 
 
+@timings.timed("html")
 def kpi(label, value, sub, color):
     st.markdown(f"""
     <div style='background:{CARD};border:1px solid {BORDER};border-radius:14px;
@@ -229,6 +213,7 @@ def kpi(label, value, sub, color):
     </div>""", unsafe_allow_html=True)
 
 
+@timings.timed("html")
 def card_title(title, sub=""):
     st.markdown(f"""
     <div style='margin-bottom:8px'>
@@ -258,35 +243,169 @@ with st.sidebar:
     <hr style='border-color:{BORDER};margin:0 0 14px'>
     """, unsafe_allow_html=True)
 
-    page = st.radio("nav", [
-        "▦  Overview",
-        "⚡  Risk Predictor",
-        "∿  EDA Insights",
-        "▤  Model Comparison",
-    ], label_visibility="collapsed")
+    pages = ["▦  Overview", "⚡  Risk Predictor", "∿  EDA Insights",
+             "▤  Model Comparison", "≋  Drift Monitor"]
+    # Hidden page: open the dashboard with ?perf=1.
+    if st.query_params.get("perf") == "1":
+        pages.append("◷  Performance")
+    page = st.radio("nav", pages, label_visibility="collapsed", key="page")
 
-    st.markdown(f"""
-    <hr style='border-color:{BORDER};margin:18px 0 12px'>
-    <div style='display:flex;align-items:center;gap:8px'>
-      <div style='width:8px;height:8px;border-radius:50%;background:{ACCENT};
-                  box-shadow:0 0 6px {ACCENT}'></div>
-      <span style='font-family:"Space Mono",monospace;font-size:9px;
-                   color:{MUTED};letter-spacing:1.5px'>MODEL LIVE · XGB v1.0</span>
-    </div>""", unsafe_allow_html=True)
+    # Filled in after the page has run (see MODEL STATUS at the end), so
+    # pages that never score anything do not load the model.
+    model_status = st.empty()
+
+
+# ─── DATA ─────────────────────────────────────────────────────────────────────
+# Figures from the 10,000-shipment sample; replaced below by the aggregate
+# store once `python -m chainsight.aggregates <csv>` has been run (only on
+# the pages that show them).
+N_SHIPMENTS = 10_000
+N_DELAYED   = 1_247
+AVG_DELAY   = 0.95
+MAX_DELAY   = 20
+
+ROUTE_LABELS  = ["Suez", "Commodity", "Pacific", "Atlantic", "Intra-Asia"]
+ROUTE_DELAYS  = [1.41, 1.22, 1.05, 0.92, 0.72]
+
+PRODUCT_LABELS = ["Perishables","Semiconductors","Consumer Elec.",
+                  "Pharma","Machinery","Textiles","Raw Materials"]
+PRODUCT_DELAYS = [1.28, 1.14, 1.07, 0.98, 0.91, 0.85, 0.78]
 
+ORIGIN_LABELS = ["Santos, BR","Mumbai, IN","Shenzhen, CN",
+                 "Shanghai, CN","Tokyo, JP","Hamburg, DE"]
+ORIGIN_DELAYS = [1.30, 1.22, 1.05, 0.98, 0.88, 0.72]
+
+MODE_LABELS = ["Sea", "Air"]
+MODE_DELAYS = [1.12, 0.62]
+
+MONTHS = ["Jan","Feb","Mar","Apr","May","Jun",
+          "Jul","Aug","Sep","Oct","Nov","Dec"]
+VOL    = [780,720,850,810,760,900,870,830,780,910,840,760]
+DLY    = [11,8,13,10,9,14,12,11,9,15,11,9]
+
+MODELS_DATA = [
+    {"name": "XGBoost",             "acc": 92.4, "auc": 0.941, "best": True},
+    {"name": "Random Forest",       "acc": 89.8, "auc": 0.912, "best": False},
+    {"name": "SVM",                 "acc": 87.6, "auc": 0.889, "best": False},
+    {"name": "Logistic Regression", "acc": 84.3, "auc": 0.861, "best": False},
+    {"name": "KNN",                 "acc": 82.1, "auc": 0.838, "best": False},
+]
+# Replaced on the Model Comparison page by `python -m chainsight.modelbench
+# <csv>` results when present.
+
+FEAT_NAMES = ["Sched_Lead_Time","Base_Lead_Time","Route_Type","Origin_City",
+              "Weather_Index","Geopolitical_Idx","Transport_Mode",
+              "Product_Cat","Shipping_Cost"]
+FEAT_VALS  = [0.31, 0.22, 0.14, 0.09, 0.07, 0.06, 0.05, 0.04, 0.01]
+
+DELAY_BINS = list(range(16))
+DELAY_CNTS = [8753,362,185,148,112,89,72,58,45,38,30,24,19,14,11,40]
+
+CORR_NAMES = ["Actual_Lead_Time","Sched_Lead_Time","Base_Lead_Time",
+              "Weather_Severity","Geo_Risk_Index","Inflation_Rate","Shipping_Cost"]
+CORR_VALS  = [0.82, 0.43, 0.38, 0.12, 0.08, 0.03, 0.01]
+
+DISRUPT_LABELS = ["Port Congestion","Geopolitical Conflict",
+                  "Extreme Weather","No Event"]
+DISRUPT_CNTS   = [820, 312, 115, 8753]
+
+AGG = None
+if page in ("▦  Overview", "∿  EDA Insights"):
+    from chainsight import aggregates
+    AGG = aggregates.load_view()
+if AGG is not None:
+    N_SHIPMENTS, N_DELAYED = AGG["N"], AGG["DELAYED"]
+    AVG_DELAY, MAX_DELAY   = AGG["AVG_DELAY"], AGG["MAX_DELAY"]
+    ROUTE_LABELS,   ROUTE_DELAYS   = AGG["ROUTE_LABELS"],   AGG["ROUTE_DELAYS"]
+    PRODUCT_LABELS, PRODUCT_DELAYS = AGG["PRODUCT_LABELS"], AGG["PRODUCT_DELAYS"]
+    ORIGIN_LABELS,  ORIGIN_DELAYS  = AGG["ORIGIN_LABELS"],  AGG["ORIGIN_DELAYS"]
+    MODE_LABELS,    MODE_DELAYS    = AGG["MODE_LABELS"],    AGG["MODE_DELAYS"]
+    VOL, DLY   = AGG["VOL"], AGG["DLY"]
+    DELAY_CNTS = AGG["DELAY_CNTS"]
+    CORR_NAMES, CORR_VALS = AGG["CORR_NAMES"], AGG["CORR_VALS"]
+    DISRUPT_LABELS, DISRUPT_CNTS = AGG["DISRUPT_LABELS"], AGG["DISRUPT_CNTS"]
+
+DELAY_RATE = N_DELAYED / N_SHIPMENTS if N_SHIPMENTS else 0.0
+
+ROUTE_COLORS   = rank_colors(ROUTE_LABELS, [ACCENT2, ACCENT3, ACCENT, BLUE])
+PRODUCT_COLORS = tier_colors(PRODUCT_DELAYS, ACCENT)
+ORIGIN_COLORS  = tier_colors(ORIGIN_DELAYS, BLUE)
+MODE_COLORS    = rank_colors(MODE_LABELS, [BLUE, ACCENT])
+CORR_COLS      = [ACCENT2 if abs(v)>0.6 else ACCENT3 if abs(v)>0.3
+                  else BLUE if abs(v)>0.05 else DIM for v in CORR_VALS]
+DISRUPT_COLORS = [DIM if lbl == "No Event" else c for lbl, c in
+                  zip(DISRUPT_LABELS, [ACCENT2, ACCENT3, BLUE] + [MUTED] * 10)]
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PAGE 1 — OVERVIEW
 # ══════════════════════════════════════════════════════════════════════════════
 if page == "▦  Overview":
+    from plotly.subplots import make_subplots
+    from chainsight import colindex
+
+    # Cross-filtering: clicking a bar on one of the four category charts
+    # re-aggregates the rest of the page from the in-memory shipment index.
+    XF_CHARTS = {"route": "route_bar", "product": "product_bar",
+                 "origin": "origin_bar", "mode": "mode_bar"}
+    IDX = colindex.load_index()
+    xf_gen = st.session_state.get("xf_gen", 0)
+    xf_key = {dim: key if IDX is None else f"{key}_{xf_gen}"
+              for dim, key in XF_CHARTS.items()}
+    xf = {}
+    if IDX is not None:
+        for dim, key in xf_key.items():
+            state = st.session_state.get(key)
+            points = state["selection"]["points"] if state else []
+            for pt in points[:1]:
+                for label in (pt.get("x"), pt.get("y")):
+                    if label in IDX.labels[dim]:
+                        xf[dim] = label
+        XF = IDX.crossfilter(xf)
+        N_SHIPMENTS, N_DELAYED = XF["N"], XF["DELAYED"]
+        DELAY_RATE = XF["DELAY_RATE"]
+        AVG_DELAY, MAX_DELAY = XF["AVG_DELAY"], XF["MAX_DELAY"]
+        ROUTE_LABELS,   ROUTE_DELAYS   = XF["ROUTE_LABELS"],   XF["ROUTE_DELAYS"]
+        PRODUCT_LABELS, PRODUCT_DELAYS = XF["PRODUCT_LABELS"], XF["PRODUCT_DELAYS"]
+        ORIGIN_LABELS,  ORIGIN_DELAYS  = XF["ORIGIN_LABELS"],  XF["ORIGIN_DELAYS"]
+        MODE_LABELS,    MODE_DELAYS    = XF["MODE_LABELS"],    XF["MODE_DELAYS"]
+        VOL, DLY = XF["VOL"], XF["DLY"]
+        ROUTE_COLORS   = highlight(
+            rank_colors(ROUTE_LABELS, [ACCENT2, ACCENT3, ACCENT, BLUE]),
+            ROUTE_LABELS, xf.get("route"))
+        PRODUCT_COLORS = highlight(tier_colors(PRODUCT_DELAYS, ACCENT),
+                                   PRODUCT_LABELS, xf.get("product"))
+        ORIGIN_COLORS  = highlight(tier_colors(ORIGIN_DELAYS, BLUE),
+                                   ORIGIN_LABELS, xf.get("origin"))
+        MODE_COLORS    = highlight(rank_colors(MODE_LABELS, [BLUE, ACCENT]),
+                                   MODE_LABELS, xf.get("mode"))
+
     page_header("Supply Chain", "Overview",
-                "10,000 SHIPMENTS  ·  GLOBAL ROUTES  ·  2024–2025",
+                f"{N_SHIPMENTS:,} SHIPMENTS  ·  GLOBAL ROUTES  ·  2024–2025",
                 "● Live Model", ACCENT)
 
+    if xf:
+        fa, fb = st.columns([5, 1])
+        with fa:
+            chips = "".join(
+                f"<span style='padding:4px 12px;border-radius:20px;"
+                f"border:1px solid {ACCENT}55;background:{ACCENT}11;"
+                f"font-family:\"Space Mono\",monospace;font-size:10px;"
+                f"color:{ACCENT};margin-right:8px'>{dim.upper()} = {label}</span>"
+                for dim, label in xf.items())
+            st.markdown(f"<div style='padding:10px 0 14px'>{chips}</div>",
+                        unsafe_allow_html=True)
+        with fb:
+            if st.button("✕  CLEAR FILTERS"):
+                st.session_state["xf_gen"] = xf_gen + 1
+                st.rerun()
+
     k1, k2, k3, k4 = st.columns(4)
-    with k1: kpi("TOTAL SHIPMENTS", "10,000", "Across 6 origin cities",  ACCENT)
-    with k2: kpi("DELAYED RATE",    "12.5%",  "1,247 late shipments",    ACCENT2)
-    with k3: kpi("AVG DELAY DAYS",  "0.95",   "Max observed: 20 days",   ACCENT3)
+    with k1: kpi("TOTAL SHIPMENTS", f"{N_SHIPMENTS:,}",
+                 f"Across {len(ORIGIN_LABELS)} origin cities", ACCENT)
+    with k2: kpi("DELAYED RATE",    f"{DELAY_RATE:.1%}",
+                 f"{N_DELAYED:,} late shipments",    ACCENT2)
+    with k3: kpi("AVG DELAY DAYS",  f"{AVG_DELAY:.2f}",
+                 f"Max observed: {MAX_DELAY:.0f} days", ACCENT3)
     with k4: kpi("MODEL ROC-AUC",   "0.941",  "XGBoost — best performer",BLUE)
 
     st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
@@ -294,123 +413,150 @@ if page == "▦  Overview":
     c1, c2 = st.columns([3, 2])
     with c1:
         card_title("Average Delay by Route Type", "MEAN DELAY DAYS PER ROUTE")
-        fig = base_fig(300)
-        fig.add_trace(go.Bar(
-            x=ROUTE_LABELS, y=ROUTE_DELAYS,
-            marker_color=ROUTE_COLORS, marker_line_width=0,
-            text=[f"{v}d" for v in ROUTE_DELAYS],
-            textposition="outside", textfont=dict(color=TEXT, size=11),
-            hovertemplate="%{x}: <b>%{y}d</b><extra></extra>",
-        ))
-        fig.update_layout(yaxis=dict(range=[0, 1.85], gridcolor=BORDER),
-                          xaxis=dict(gridcolor="rgba(0,0,0,0)"))
-        render(fig, "route_bar")
+        def route_bar():
+            fig = base_fig(300)
+            fig.add_trace(go.Bar(
+                x=ROUTE_LABELS, y=ROUTE_DELAYS,
+                marker_color=ROUTE_COLORS, marker_line_width=0,
+                text=[f"{v}d" for v in ROUTE_DELAYS],
+                textposition="outside", textfont=dict(color=TEXT, size=11),
+                hovertemplate="%{x}: <b>%{y}d</b><extra></extra>",
+            ))
+            fig.update_layout(yaxis=dict(range=[0, max(ROUTE_DELAYS) * 1.3],
+                                         gridcolor=BORDER),
+                              xaxis=dict(gridcolor="rgba(0,0,0,0)"))
+            return fig
+        render(cached_fig("route_bar", route_bar,
+                          ROUTE_LABELS, ROUTE_DELAYS, ROUTE_COLORS),
+               xf_key["route"], select=IDX is not None)
 
     with c2:
         card_title("Delivery Status", "DISTRIBUTION ACROSS ALL SHIPMENTS")
-        fig = go.Figure(go.Pie(
-            values=[87.5, 12.5], labels=["On Time", "Delayed"],
-            hole=0.62, marker=dict(colors=[ACCENT, ACCENT2],
-                                   line=dict(width=0)),
-            textinfo="percent",
-            textfont=dict(color=BG, size=12),
-            hovertemplate="%{label}: <b>%{percent}</b><extra></extra>",
-        ))
-        fig.update_layout(
-            height=300, paper_bgcolor=CARD, plot_bgcolor=CARD,
-            margin=dict(l=12, r=12, t=36, b=12),
-            showlegend=True,
-            legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.08,
-                        font=dict(color=MUTED, size=11, family="Space Mono")),
-            annotations=[dict(text="87.5%<br>On Time", x=0.5, y=0.5,
-                              font=dict(size=14, color=ACCENT, family="Space Mono"),
-                              showarrow=False)],
-        )
-        render(fig, "donut")
+        def donut():
+            fig = go.Figure(go.Pie(
+                values=[1 - DELAY_RATE, DELAY_RATE], labels=["On Time", "Delayed"],
+                hole=0.62, marker=dict(colors=[ACCENT, ACCENT2],
+                                       line=dict(width=0)),
+                textinfo="percent",
+                textfont=dict(color=BG, size=12),
+                hovertemplate="%{label}: <b>%{percent}</b><extra></extra>",
+            ))
+            fig.update_layout(
+                height=300, paper_bgcolor=CARD, plot_bgcolor=CARD,
+                margin=dict(l=12, r=12, t=36, b=12),
+                showlegend=True,
+                legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.08,
+                            font=dict(color=MUTED, size=11, family="Space Mono")),
+                annotations=[dict(text=f"{1 - DELAY_RATE:.1%}<br>On Time",
+                                  x=0.5, y=0.5,
+                                  font=dict(size=14, color=ACCENT, family="Space Mono"),
+                                  showarrow=False)],
+            )
+            return fig
+        render(cached_fig("donut", donut, DELAY_RATE), "donut")
 
     c3, c4 = st.columns(2)
     with c3:
         card_title("Avg Delay by Product Category", "WHICH PRODUCTS FACE HIGHEST RISK")
-        fig = base_fig(320)
-        fig.add_trace(go.Bar(
-            y=PRODUCT_LABELS, x=PRODUCT_DELAYS, orientation='h',
-            marker_color=PRODUCT_COLORS, marker_line_width=0,
-            text=[f"{v}d" for v in PRODUCT_DELAYS],
-            textposition="outside", textfont=dict(color=TEXT, size=10),
-            hovertemplate="%{y}: <b>%{x}d</b><extra></extra>",
-        ))
-        fig.update_layout(xaxis=dict(range=[0, 1.65], gridcolor=BORDER),
-                          yaxis=dict(autorange="reversed",
-                                     gridcolor="rgba(0,0,0,0)"))
-        render(fig, "product_bar")
+        def product_bar():
+            fig = base_fig(320)
+            fig.add_trace(go.Bar(
+                y=PRODUCT_LABELS, x=PRODUCT_DELAYS, orientation='h',
+                marker_color=PRODUCT_COLORS, marker_line_width=0,
+                text=[f"{v}d" for v in PRODUCT_DELAYS],
+                textposition="outside", textfont=dict(color=TEXT, size=10),
+                hovertemplate="%{y}: <b>%{x}d</b><extra></extra>",
+            ))
+            fig.update_layout(xaxis=dict(range=[0, max(PRODUCT_DELAYS) * 1.3],
+                                         gridcolor=BORDER),
+                              yaxis=dict(autorange="reversed",
+                                         gridcolor="rgba(0,0,0,0)"))
+            return fig
+        render(cached_fig("product_bar", product_bar,
+                          PRODUCT_LABELS, PRODUCT_DELAYS, PRODUCT_COLORS),
+               xf_key["product"], select=IDX is not None)
 
     with c4:
         card_title("Avg Delay by Origin City", "SOURCE RISK OVERVIEW")
-        fig = base_fig(320)
-        fig.add_trace(go.Bar(
-            y=ORIGIN_LABELS, x=ORIGIN_DELAYS, orientation='h',
-            marker_color=ORIGIN_COLORS, marker_line_width=0,
-            text=[f"{v}d" for v in ORIGIN_DELAYS],
-            textposition="outside", textfont=dict(color=TEXT, size=10),
-            hovertemplate="%{y}: <b>%{x}d</b><extra></extra>",
-        ))
-        fig.update_layout(xaxis=dict(range=[0, 1.65], gridcolor=BORDER),
-                          yaxis=dict(autorange="reversed",
-                                     gridcolor="rgba(0,0,0,0)"))
-        render(fig, "origin_bar")
+        def origin_bar():
+            fig = base_fig(320)
+            fig.add_trace(go.Bar(
+                y=ORIGIN_LABELS, x=ORIGIN_DELAYS, orientation='h',
+                marker_color=ORIGIN_COLORS, marker_line_width=0,
+                text=[f"{v}d" for v in ORIGIN_DELAYS],
+                textposition="outside", textfont=dict(color=TEXT, size=10),
+                hovertemplate="%{y}: <b>%{x}d</b><extra></extra>",
+            ))
+            fig.update_layout(xaxis=dict(range=[0, max(ORIGIN_DELAYS) * 1.3],
+                                         gridcolor=BORDER),
+                              yaxis=dict(autorange="reversed",
+                                         gridcolor="rgba(0,0,0,0)"))
+            return fig
+        render(cached_fig("origin_bar", origin_bar,
+                          ORIGIN_LABELS, ORIGIN_DELAYS, ORIGIN_COLORS),
+               xf_key["origin"], select=IDX is not None)
 
     c5, c6 = st.columns([3, 2])
     with c5:
         card_title("Shipment Volume & Delay Trend", "2024–2025 MONTHLY OVERVIEW")
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(go.Scatter(
-            x=MONTHS, y=VOL, name="Volume",
-            line=dict(color=BLUE, width=2.5),
-            fill='tozeroy', fillcolor="rgba(61,158,255,0.07)",
-            mode='lines+markers', marker=dict(size=5, color=BLUE),
-            hovertemplate="Volume: <b>%{y}</b><extra></extra>",
-        ), secondary_y=False)
-        fig.add_trace(go.Scatter(
-            x=MONTHS, y=DLY, name="Delayed",
-            line=dict(color=ACCENT2, width=2, dash='dash'),
-            mode='lines+markers',
-            marker=dict(size=5, color=ACCENT2, symbol='square'),
-            hovertemplate="Delayed: <b>%{y}</b><extra></extra>",
-        ), secondary_y=True)
-        fig.update_layout(
-            height=300, paper_bgcolor=CARD, plot_bgcolor=CARD,
-            margin=dict(l=12, r=12, t=36, b=12),
-            showlegend=True,
-            legend=dict(orientation="h", x=0, y=1.12,
-                        font=dict(color=MUTED, size=10, family="Space Mono")),
-            xaxis=dict(gridcolor="rgba(0,0,0,0)", linecolor=BORDER),
-            yaxis=dict(gridcolor=BORDER, linecolor=BORDER),
-            yaxis2=dict(gridcolor="rgba(0,0,0,0)", linecolor=BORDER),
-        )
-        render(fig, "trend")
+        def trend():
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(go.Scatter(
+                x=MONTHS, y=VOL, name="Volume",
+                line=dict(color=BLUE, width=2.5),
+                fill='tozeroy', fillcolor="rgba(61,158,255,0.07)",
+                mode='lines+markers', marker=dict(size=5, color=BLUE),
+                hovertemplate="Volume: <b>%{y}</b><extra></extra>",
+            ), secondary_y=False)
+            fig.add_trace(go.Scatter(
+                x=MONTHS, y=DLY, name="Delayed",
+                line=dict(color=ACCENT2, width=2, dash='dash'),
+                mode='lines+markers',
+                marker=dict(size=5, color=ACCENT2, symbol='square'),
+                hovertemplate="Delayed: <b>%{y}</b><extra></extra>",
+            ), secondary_y=True)
+            fig.update_layout(
+                height=300, paper_bgcolor=CARD, plot_bgcolor=CARD,
+                margin=dict(l=12, r=12, t=36, b=12),
+                showlegend=True,
+                legend=dict(orientation="h", x=0, y=1.12,
+                            font=dict(color=MUTED, size=10, family="Space Mono")),
+                xaxis=dict(gridcolor="rgba(0,0,0,0)", linecolor=BORDER),
+                yaxis=dict(gridcolor=BORDER, linecolor=BORDER),
+                yaxis2=dict(gridcolor="rgba(0,0,0,0)", linecolor=BORDER),
+            )
+            return fig
+        render(cached_fig("trend", trend, VOL, DLY), "trend")
 
     with c6:
         card_title("Transport Mode vs Avg Delay", "AIR vs SEA COMPARISON")
-        fig = base_fig(300)
-        fig.add_trace(go.Bar(
-            y=["Sea", "Air"], x=[1.12, 0.62], orientation='h',
-            marker_color=[BLUE, ACCENT], marker_line_width=0,
-            text=["1.12d", "0.62d"],
-            textposition="outside", textfont=dict(color=TEXT, size=12),
-            hovertemplate="%{y}: <b>%{x}d</b><extra></extra>",
-        ))
-        fig.update_layout(
-            xaxis=dict(range=[0, 1.5], gridcolor=BORDER),
-            yaxis=dict(tickfont=dict(color=TEXT, size=13),
-                       gridcolor="rgba(0,0,0,0)"),
-        )
-        render(fig, "mode_bar")
+        def mode_bar():
+            fig = base_fig(300)
+            fig.add_trace(go.Bar(
+                y=MODE_LABELS, x=MODE_DELAYS, orientation='h',
+                marker_color=MODE_COLORS, marker_line_width=0,
+                text=[f"{v}d" for v in MODE_DELAYS],
+                textposition="outside", textfont=dict(color=TEXT, size=12),
+                hovertemplate="%{y}: <b>%{x}d</b><extra></extra>",
+            ))
+            fig.update_layout(
+                xaxis=dict(range=[0, max(MODE_DELAYS) * 1.35], gridcolor=BORDER),
+                yaxis=dict(tickfont=dict(color=TEXT, size=13),
+                           gridcolor="rgba(0,0,0,0)"),
+            )
+            return fig
+        render(cached_fig("mode_bar", mode_bar,
+                          MODE_LABELS, MODE_DELAYS, MODE_COLORS),
+               xf_key["mode"], select=IDX is not None)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PAGE 2 — RISK PREDICTOR
 # ══════════════════════════════════════════════════════════════════════════════
 elif page == "⚡  Risk Predictor":
+    import numpy as np
+    from chainsight import batch, scoring
+
     page_header("Shipment", "Risk Predictor",
                 "POWERED BY XGBOOST  ·  FILL IN DETAILS TO ASSESS DELAY RISK",
                 "● Model Ready", ACCENT)
@@ -478,10 +624,25 @@ elif page == "⚡  Risk Predictor":
             weight = st.number_input("Order Weight (kg)",
                                      min_value=100, value=3000, step=100)
 
+        order_date = st.date_input("Order Date", value=date.today())
+
         st.markdown("</div>", unsafe_allow_html=True)
         st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
         clicked = st.button("⚡  PREDICT DELAY RISK")
 
+    shipment = {
+        "Origin_City": origin, "Destination_City": dest,
+        "Route_Type": route, "Transportation_Mode": mode,
+        "Product_Category": product,
+        "Base_Lead_Time_Days": base_lead,
+        "Scheduled_Lead_Time_Days": sched_lead,
+        "Geopolitical_Risk_Index": geo,
+        "Weather_Severity_Index": weather,
+        "Inflation_Rate_Pct": inflation,
+        "Shipping_Cost_USD": cost, "Order_Weight_Kg": weight,
+        "Order_Date": order_date,
+    }
+
     with col_result:
         if not clicked:
             st.markdown(f"""
@@ -495,64 +656,54 @@ elif page == "⚡  Risk Predictor":
               </div>
             </div>""", unsafe_allow_html=True)
         else:
-            # Heuristic model
-            score = 0.05
-            buffer = sched_lead - base_lead
-            if   buffer <= 1: score += 0.30
-            elif buffer <= 2: score += 0.18
-            elif buffer <= 4: score += 0.08
-            else:             score += 0.01
-            score += ROUTE_RISK.get(route, 0.06)
-            score += 0.06 if mode == "Sea" else 0.02
-            score += 0.08 if geo > 0.7 else 0.04 if geo > 0.5 else 0.01
-            score += 0.07 if weather > 7 else 0.04 if weather > 5 else 0.01
-            score += PROD_RISK.get(product, 0.01)
-            score += ORIGIN_RISK.get(origin, 0.01)
-            score = min(max(score, 0.02), 0.97)
-            pct   = round(score * 100)
-
-            color = ACCENT2 if score > 0.5 else ACCENT3 if score > 0.25 else ACCENT
-            label = ("🔴  HIGH DELAY RISK" if score > 0.5
-                     else "🟡  MODERATE RISK" if score > 0.25
-                     else "🟢  LOW RISK")
+            with timings.timer("inference", "assess"):
+                risk = scoring.assess(shipment)
+            pct   = risk["risk_pct"]
+            level = risk["risk_level"]
+
+            color = {"HIGH": ACCENT2, "MODERATE": ACCENT3}.get(level, ACCENT)
+            label = {"HIGH": "🔴  HIGH DELAY RISK",
+                     "MODERATE": "🟡  MODERATE RISK"}.get(level, "🟢  LOW RISK")
             desc  = (
                 f"{pct}% probability of delay. Tight lead time buffer and "
                 f"high-risk route/origin combination. Consider expedited air freight."
-                if score > 0.5 else
+                if level == "HIGH" else
                 f"{pct}% delay probability. Some risk factors present — monitor "
                 f"geopolitical and weather conditions."
-                if score > 0.25 else
+                if level == "MODERATE" else
                 f"Only {pct}% delay probability. Shipment parameters look healthy. "
                 f"Proceed with standard shipping."
             )
 
             # Gauge
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=pct,
-                number=dict(suffix="%",
-                            font=dict(size=42, color=color, family="Space Mono")),
-                gauge=dict(
-                    axis=dict(range=[0, 100], tickcolor=MUTED,
-                              tickfont=dict(color=MUTED, size=10)),
-                    bar=dict(color=color, thickness=0.28),
-                    bgcolor=DIM,
-                    borderwidth=0,
-                    steps=[
-                        dict(range=[0, 25],   color="rgba(0,255,178,0.08)"),
-                        dict(range=[25, 50],  color="rgba(255,184,0,0.08)"),
-                        dict(range=[50, 100], color="rgba(255,77,109,0.08)"),
-                    ],
-                    threshold=dict(line=dict(color=color, width=3),
-                                   thickness=0.8, value=pct),
-                ),
-            ))
-            fig.update_layout(
-                height=260, paper_bgcolor=CARD, plot_bgcolor=CARD,
-                margin=dict(l=30, r=30, t=20, b=10),
-                font=dict(color=MUTED, family="Space Mono"),
-            )
-            render(fig, "gauge")
+            def gauge():
+                fig = go.Figure(go.Indicator(
+                    mode="gauge+number",
+                    value=pct,
+                    number=dict(suffix="%",
+                                font=dict(size=42, color=color, family="Space Mono")),
+                    gauge=dict(
+                        axis=dict(range=[0, 100], tickcolor=MUTED,
+                                  tickfont=dict(color=MUTED, size=10)),
+                        bar=dict(color=color, thickness=0.28),
+                        bgcolor=DIM,
+                        borderwidth=0,
+                        steps=[
+                            dict(range=[0, 25],   color="rgba(0,255,178,0.08)"),
+                            dict(range=[25, 50],  color="rgba(255,184,0,0.08)"),
+                            dict(range=[50, 100], color="rgba(255,77,109,0.08)"),
+                        ],
+                        threshold=dict(line=dict(color=color, width=3),
+                                       thickness=0.8, value=pct),
+                    ),
+                ))
+                fig.update_layout(
+                    height=260, paper_bgcolor=CARD, plot_bgcolor=CARD,
+                    margin=dict(l=30, r=30, t=20, b=10),
+                    font=dict(color=MUTED, family="Space Mono"),
+                )
+                return fig
+            render(cached_fig("gauge", gauge, pct, color), "gauge")
 
             st.markdown(f"""
             <div style='text-align:center;margin:-4px 0 16px'>
@@ -564,24 +715,16 @@ elif page == "⚡  Risk Predictor":
                 {desc}</div>
             </div>""", unsafe_allow_html=True)
 
-            factors = [
-                ("Lead Time Buffer",
-                 min(90 if buffer<=1 else 60 if buffer<=2
-                     else 30 if buffer<=4 else 10, 100)),
-                ("Route Risk",
-                 round(ROUTE_RISK.get(route, 0.06) / 0.16 * 100)),
-                ("Geopolitical Risk",  round(geo * 100)),
-                ("Weather Severity",   round(weather * 10)),
-                ("Transport Mode",     65 if mode == "Sea" else 25),
-                ("Product Category",
-                 round((PROD_RISK.get(product, 0.01) / 0.05) * 60 + 10)),
-            ]
             st.markdown(f"""
             <div style='font-family:"Space Mono",monospace;font-size:9px;
                         color:{MUTED};letter-spacing:1.5px;margin-bottom:10px'>
-              RISK FACTOR BREAKDOWN</div>""", unsafe_allow_html=True)
-            for fname, fval in factors:
-                bc = ACCENT2 if fval > 70 else ACCENT3 if fval > 40 else ACCENT
+              RISK FACTOR BREAKDOWN  ·  LOG-ODDS vs AVERAGE SHIPMENT</div>""",
+                        unsafe_allow_html=True)
+            top = list(risk["factors"].items())[:6]
+            scale = max(abs(v) for _, v in top) or 1.0
+            for fname, contrib in top:
+                fval = round(abs(contrib) / scale * 100)
+                bc = ACCENT2 if contrib > 0 else ACCENT
                 st.markdown(f"""
                 <div style='background:{SURFACE};border:1px solid {BORDER};
                             border-radius:8px;padding:8px 14px;margin-bottom:6px;
@@ -595,9 +738,143 @@ elif page == "⚡  Risk Predictor":
                   </div>
                   <div style='min-width:34px;text-align:right;
                               font-family:"Space Mono",monospace;
-                              font-size:11px;color:{MUTED}'>{fval}%</div>
+                              font-size:11px;color:{MUTED}'>{contrib:+.2f}</div>
                 </div>""", unsafe_allow_html=True)
 
+    if clicked:
+        with timings.timer("inference", "sweep"):
+            grid = scoring.sweep(shipment)
+        rows = [f"{r} · {m}" for r in grid["routes"] for m in grid["modes"]]
+        z = np.round(grid["probability"].reshape(len(rows), -1) * 100, 1)
+        best = grid["cheapest_low"]
+        st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
+        card_title("What-If Sensitivity",
+                   f"ROUTE × MODE × SCHEDULED LEAD TIME  ·  {z.size:,} VARIANTS "
+                   f"SCORED IN {grid['seconds'] * 1e3:.0f} MS")
+
+        def whatif():
+            fig = base_fig(380)
+            fig.add_trace(go.Heatmap(
+                z=z, x=grid["leads"], y=rows, zmin=0, zmax=100,
+                colorscale=[[0, "rgba(0,255,178,0.12)"],
+                            [0.25, "rgba(0,255,178,0.55)"],
+                            [0.25, "rgba(255,184,0,0.35)"],
+                            [0.5, "rgba(255,184,0,0.75)"],
+                            [0.5, "rgba(255,77,109,0.40)"],
+                            [1, "rgba(255,77,109,0.95)"]],
+                colorbar=dict(ticksuffix="%", thickness=10, outlinewidth=0,
+                              tickfont=dict(color=MUTED, size=10)),
+                hovertemplate="%{y}<br>Scheduled %{x} d<br>"
+                              "Delay risk <b>%{z}%</b><extra></extra>",
+            ))
+            fig.add_trace(go.Scatter(
+                x=[sched_lead], y=[f"{route} · {mode}"], mode="markers",
+                marker=dict(symbol="circle-open", size=13, color=TEXT,
+                            line=dict(width=2)),
+                hovertemplate="Current plan<extra></extra>"))
+            if best is not None:
+                fig.add_trace(go.Scatter(
+                    x=[best["scheduled_lead"]],
+                    y=[f"{best['route']} · {best['mode']}"], mode="markers",
+                    marker=dict(symbol="star", size=15, color=ACCENT,
+                                line=dict(width=1, color=CARD)),
+                    hovertemplate="Cheapest LOW-risk option<extra></extra>"))
+            fig.update_layout(
+                margin=dict(l=12, r=12, t=12, b=12),
+                xaxis=dict(title="Scheduled lead time (days)",
+                           gridcolor=BORDER, linecolor=BORDER),
+                yaxis=dict(autorange="reversed", tickfont=dict(color=TEXT)))
+            return fig
+        render(cached_fig("whatif", whatif, z.tolist(), grid["leads"],
+                          sched_lead, route, mode, best), "whatif")
+
+        if best is None:
+            verdict = (f"No route, mode or scheduled lead time up to "
+                       f"{scoring.MAX_LEAD} days brings this shipment to LOW "
+                       f"risk.")
+            vcolor = ACCENT2
+        else:
+            verdict = (f"Cheapest LOW-risk option: {best['mode']} via "
+                       f"{best['route']} with a {best['scheduled_lead']}-day "
+                       f"scheduled lead time "
+                       f"({best['delay_probability']:.0%} delay probability).")
+            vcolor = ACCENT
+        st.markdown(f"""
+        <div style='background:{SURFACE};border:1px solid {BORDER};
+                    border-left:3px solid {vcolor};border-radius:8px;
+                    padding:10px 16px;font-size:13px;color:{TEXT};
+                    font-family:Syne,sans-serif'>{verdict}</div>""",
+                    unsafe_allow_html=True)
+
+    st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
+    card_title("Batch Scoring",
+               "UPLOAD A CSV OF PENDING SHIPMENTS  ·  SAFE_COLS + ORDER_DATE")
+    upload = st.file_uploader("Shipments CSV", type="csv",
+                              label_visibility="collapsed")
+    if upload is not None:
+        # Score each uploaded file once; reruns reuse the cached result.
+        cached = st.session_state.get("batch_result")
+        if cached is None or cached[0] != upload.file_id:
+            try:
+                with timings.timer("inference", "batch"):
+                    scored = batch.score_frame(batch.read_shipments(upload),
+                                               explain=True)
+            except ValueError as exc:
+                st.error(f"Could not score file: {exc}")
+                scored = None
+            cached = (upload.file_id, scored,
+                      None if scored is None
+                      else scored.to_csv(index=False).encode())
+            st.session_state["batch_result"] = cached
+        _, scored, csv_bytes = cached
+
+        if scored is not None:
+            levels = scored["Risk_Level"].value_counts()
+            b1, b2, b3, b4 = st.columns(4)
+            with b1: kpi("ROWS SCORED", f"{len(scored):,}",
+                         upload.name, ACCENT)
+            with b2: kpi("MEAN RISK",
+                         f"{scored['Delay_Probability'].mean():.1%}",
+                         "Average delay probability", BLUE)
+            with b3: kpi("HIGH RISK", f"{levels.get('HIGH', 0):,}",
+                         "Probability > 50%", ACCENT2)
+            with b4: kpi("MODERATE", f"{levels.get('MODERATE', 0):,}",
+                         "Probability 25–50%", ACCENT3)
+            st.markdown("<div style='height:12px'></div>",
+                        unsafe_allow_html=True)
+            st.download_button("⬇  DOWNLOAD PREDICTIONS", csv_bytes,
+                               file_name="chainsight_predictions.csv",
+                               mime="text/csv")
+
+    with st.expander("Stream a large file from the server data directory"):
+        files = sorted(p.name for p in config.DATA_DIR.glob("*.csv*"))
+        if not files:
+            st.markdown(f"""
+            <div style='font-family:"Space Mono",monospace;font-size:10px;
+                        color:{MUTED}'>No CSV files in {config.DATA_DIR}</div>""",
+                        unsafe_allow_html=True)
+        else:
+            sa, sb = st.columns([3, 1])
+            with sa:
+                src_name = st.selectbox("Input file", files)
+            with sb:
+                chunksize = st.number_input("Chunk size (rows)",
+                                            min_value=1_000, value=100_000,
+                                            step=10_000)
+            if st.button("⇣  STREAM SCORE FILE"):
+                out_dir = config.DATA_DIR / "scored"
+                out_dir.mkdir(exist_ok=True)
+                dst = out_dir / (src_name.split(".")[0] + "_scored.csv")
+                status = st.empty()
+                try:
+                    rows = batch.score_csv(
+                        config.DATA_DIR / src_name, dst, int(chunksize),
+                        on_chunk=lambda n: status.markdown(
+                            f"`{n:,}` rows scored…"))
+                    status.success(f"Scored {rows:,} rows → {dst}")
+                except ValueError as exc:
+                    status.error(f"Could not score file: {exc}")
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PAGE 3 — EDA INSIGHTS
@@ -605,15 +882,20 @@ elif page == "⚡  Risk Predictor":
 elif page == "∿  EDA Insights":
     page_header("Exploratory Data", "Analysis",
                 "KEY PATTERNS  ·  CORRELATIONS  ·  RISK DRIVERS",
-                "10K Shipments", BLUE)
+                f"{N_SHIPMENTS / 1000:,.0f}K Shipments", BLUE)
 
     chips_data = [
-        ("DATASET SIZE",     "10,000",  "Shipment records",     ACCENT),
+        ("DATASET SIZE",     f"{N_SHIPMENTS:,}", "Shipment records", ACCENT),
         ("FEATURES USED",    "16",      "Non-leaky predictors", BLUE),
-        ("DELAY RATE",       "12.5%",   "Class imbalance ~1:7", ACCENT2),
-        ("MAX DELAY",        "20 days", "Days observed",        ACCENT3),
-        ("COST CORRELATION", "~0.01",   "No effect on delay",   MUTED),
-        ("ROUTES COVERED",   "5",       "Pacific, Suez, Atl…",  ACCENT),
+        ("DELAY RATE",       f"{DELAY_RATE:.1%}",
+         f"Class imbalance ~1:{(1 - DELAY_RATE) / max(DELAY_RATE, 1e-9):.0f}",
+         ACCENT2),
+        ("MAX DELAY",        f"{MAX_DELAY:.0f} days", "Days observed", ACCENT3),
+        ("COST CORRELATION",
+         f"~{dict(zip(CORR_NAMES, CORR_VALS)).get('Shipping_Cost', 0):.2f}",
+         "No effect on delay",   MUTED),
+        ("ROUTES COVERED",   f"{len(ROUTE_LABELS)}",
+         ", ".join(ROUTE_LABELS)[:18] + "…",  ACCENT),
     ]
     for col, (lbl, val, sub, color) in zip(st.columns(6), chips_data):
         with col:
@@ -635,33 +917,38 @@ elif page == "∿  EDA Insights":
         card_title("Delay Day Distribution", "HISTOGRAM OF DELAY DAYS")
         hist_colors = [ACCENT if b == 0 else ACCENT3 if b < 5
                        else ACCENT2 for b in DELAY_BINS]
-        fig = base_fig(310)
-        fig.add_trace(go.Bar(
-            x=[str(b) for b in DELAY_BINS], y=DELAY_CNTS,
-            marker_color=hist_colors, marker_line_width=0,
-            hovertemplate="Day %{x}: <b>%{y:,}</b> shipments<extra></extra>",
-        ))
-        fig.update_layout(
-            xaxis=dict(title="Delay Days", gridcolor="rgba(0,0,0,0)"),
-            yaxis=dict(gridcolor=BORDER),
-        )
-        render(fig, "hist")
+        def hist():
+            fig = base_fig(310)
+            fig.add_trace(go.Bar(
+                x=[str(b) for b in DELAY_BINS], y=DELAY_CNTS,
+                marker_color=hist_colors, marker_line_width=0,
+                hovertemplate="Day %{x}: <b>%{y:,}</b> shipments<extra></extra>",
+            ))
+            fig.update_layout(
+                xaxis=dict(title="Delay Days", gridcolor="rgba(0,0,0,0)"),
+                yaxis=dict(gridcolor=BORDER),
+            )
+            return fig
+        render(cached_fig("hist", hist, DELAY_CNTS), "hist")
 
     with e2:
         card_title("Feature Correlation to Delay Days", "NUMERIC FEATURES RANKED")
-        fig = base_fig(310)
-        fig.add_trace(go.Bar(
-            y=CORR_NAMES, x=CORR_VALS, orientation='h',
-            marker_color=CORR_COLS, marker_line_width=0,
-            text=[f"{v:.2f}" for v in CORR_VALS],
-            textposition="outside", textfont=dict(color=TEXT, size=10),
-            hovertemplate="%{y}: <b>%{x:.2f}</b><extra></extra>",
-        ))
-        fig.update_layout(
-            xaxis=dict(range=[0, 1.0], gridcolor=BORDER),
-            yaxis=dict(autorange="reversed", gridcolor="rgba(0,0,0,0)"),
-        )
-        render(fig, "corr")
+        def corr():
+            fig = base_fig(310)
+            fig.add_trace(go.Bar(
+                y=CORR_NAMES, x=CORR_VALS, orientation='h',
+                marker_color=CORR_COLS, marker_line_width=0,
+                text=[f"{v:.2f}" for v in CORR_VALS],
+                textposition="outside", textfont=dict(color=TEXT, size=10),
+                hovertemplate="%{y}: <b>%{x:.2f}</b><extra></extra>",
+            ))
+            fig.update_layout(
+                xaxis=dict(range=[min(0, min(CORR_VALS) * 1.2), 1.0],
+                           gridcolor=BORDER),
+                yaxis=dict(autorange="reversed", gridcolor="rgba(0,0,0,0)"),
+            )
+            return fig
+        render(cached_fig("corr", corr, CORR_NAMES, CORR_VALS), "corr")
 
     card_title("Key EDA Findings", "ANALYST NOTES FROM EXPLORATION")
     findings = [
@@ -672,7 +959,8 @@ elif page == "∿  EDA Insights":
         ("Shipping cost has near-zero correlation", "Shipping_Cost_USD",   "LOW",   BLUE),
         ("Weather severity weakly correlates",      "Weather_Severity",    "LOW",   BLUE),
         ("Port Congestion is most common event",    "Disruption_Event",    "HIGH",  ACCENT2),
-        ("Class imbalance: 87.5% vs 12.5%",         "Delivery_Status",     "NOTE",  MUTED),
+        (f"Class imbalance: {1 - DELAY_RATE:.1%} vs {DELAY_RATE:.1%}",
+                                                    "Delivery_Status",     "NOTE",  MUTED),
     ]
     rows_html = "".join(f"""
     <div style='display:grid;grid-template-columns:2fr 1.2fr 80px;
@@ -699,36 +987,52 @@ elif page == "∿  EDA Insights":
     </div>""", unsafe_allow_html=True)
 
     card_title("Disruption Event Frequency", "COUNT PER EVENT TYPE")
-    fig = base_fig(260)
-    fig.add_trace(go.Bar(
-        x=DISRUPT_LABELS, y=DISRUPT_CNTS,
-        marker_color=DISRUPT_COLORS, marker_line_width=0,
-        text=[f"{v:,}" for v in DISRUPT_CNTS],
-        textposition="outside", textfont=dict(color=TEXT, size=11),
-        hovertemplate="%{x}: <b>%{y:,}</b><extra></extra>",
-    ))
-    fig.update_layout(
-        yaxis=dict(range=[0, max(DISRUPT_CNTS) * 1.2], gridcolor=BORDER),
-        xaxis=dict(gridcolor="rgba(0,0,0,0)"),
-    )
-    render(fig, "disrupt")
+    def disrupt():
+        fig = base_fig(260)
+        fig.add_trace(go.Bar(
+            x=DISRUPT_LABELS, y=DISRUPT_CNTS,
+            marker_color=DISRUPT_COLORS, marker_line_width=0,
+            text=[f"{v:,}" for v in DISRUPT_CNTS],
+            textposition="outside", textfont=dict(color=TEXT, size=11),
+            hovertemplate="%{x}: <b>%{y:,}</b><extra></extra>",
+        ))
+        fig.update_layout(
+            yaxis=dict(range=[0, max(DISRUPT_CNTS) * 1.2], gridcolor=BORDER),
+            xaxis=dict(gridcolor="rgba(0,0,0,0)"),
+        )
+        return fig
+    render(cached_fig("disrupt", disrupt,
+                      DISRUPT_LABELS, DISRUPT_CNTS),
+           "disrupt")
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PAGE 4 — MODEL COMPARISON
 # ══════════════════════════════════════════════════════════════════════════════
 elif page == "▤  Model Comparison":
+    from chainsight import modelbench
+
+    MODELS_DATA = modelbench.load_results() or MODELS_DATA
+    BEST_MODEL  = next(m for m in MODELS_DATA if m["best"])
+
     page_header("Model", "Comparison",
-                "5 CLASSIFIERS  ·  ACCURACY & ROC-AUC BENCHMARKS",
-                "XGBoost Winner", ACCENT)
+                f"{len(MODELS_DATA)} CLASSIFIERS  ·  ACCURACY & ROC-AUC BENCHMARKS",
+                f"{BEST_MODEL['name']} Winner", ACCENT)
 
-    for col, m in zip(st.columns(5), MODELS_DATA):
+    for col, m in zip(st.columns(len(MODELS_DATA)), MODELS_DATA):
         border = f"2px solid {ACCENT}" if m["best"] else f"1px solid {BORDER}"
         vc = ACCENT if m["best"] else TEXT
         ac = ACCENT if m["best"] else BLUE
         badge = (f"<div style='font-family:\"Space Mono\",monospace;font-size:8px;"
                  f"color:{ACCENT};text-align:right;letter-spacing:1px;"
                  f"margin-bottom:6px'>★ BEST</div>") if m["best"] else ""
+        cost = ""
+        if "fit_seconds" in m:
+            cost = (f"<div style='font-family:\"Space Mono\",monospace;font-size:8px;"
+                    f"color:{MUTED};letter-spacing:1px;margin-top:10px;"
+                    f"line-height:1.7'>FIT {m['fit_seconds']:.2f} S<br>"
+                    f"1-ROW {m['latency_ms']:.2f} MS<br>"
+                    f"PEAK {m['peak_mb'] or 0:.0f} MB</div>")
         with col:
             st.markdown(f"""
             <div style='background:{CARD};border:{border};
@@ -746,6 +1050,7 @@ elif page == "▤  Model Comparison":
                           color:{MUTED};letter-spacing:1px;margin-top:8px'>ROC-AUC</div>
               <div style='font-size:20px;font-weight:800;color:{ac};
                           font-family:Syne,sans-serif'>{m["auc"]:.3f}</div>
+              {cost}
             </div>""", unsafe_allow_html=True)
 
     st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
@@ -753,51 +1058,63 @@ elif page == "▤  Model Comparison":
     m_names = [m["name"].split()[0] for m in MODELS_DATA]
     mc_cols = st.columns(2)
     with mc_cols[0]:
-        card_title("Accuracy Comparison", "ALL 5 MODELS · TEST SET")
-        fig = base_fig(300)
-        fig.add_trace(go.Bar(
-            x=m_names, y=[m["acc"] for m in MODELS_DATA],
-            marker_color=[ACCENT if m["best"] else DIM for m in MODELS_DATA],
-            marker_line_width=0,
-            text=[f"{m['acc']}%" for m in MODELS_DATA],
-            textposition="outside", textfont=dict(color=TEXT, size=10),
-            hovertemplate="%{x}: <b>%{y}%</b><extra></extra>",
-        ))
-        fig.update_layout(yaxis=dict(range=[75, 98], gridcolor=BORDER),
-                          xaxis=dict(gridcolor="rgba(0,0,0,0)"))
-        render(fig, "acc_chart")
+        card_title("Accuracy Comparison",
+                   f"ALL {len(MODELS_DATA)} MODELS · TEST SET")
+        def acc_chart():
+            fig = base_fig(300)
+            fig.add_trace(go.Bar(
+                x=m_names, y=[m["acc"] for m in MODELS_DATA],
+                marker_color=[ACCENT if m["best"] else DIM for m in MODELS_DATA],
+                marker_line_width=0,
+                text=[f"{m['acc']}%" for m in MODELS_DATA],
+                textposition="outside", textfont=dict(color=TEXT, size=10),
+                hovertemplate="%{x}: <b>%{y}%</b><extra></extra>",
+            ))
+            accs = [m["acc"] for m in MODELS_DATA]
+            fig.update_layout(yaxis=dict(range=[max(min(accs) - 7, 0),
+                                                min(max(accs) + 6, 100)],
+                                         gridcolor=BORDER),
+                              xaxis=dict(gridcolor="rgba(0,0,0,0)"))
+            return fig
+        render(cached_fig("acc_chart", acc_chart, MODELS_DATA), "acc_chart")
 
     with mc_cols[1]:
         card_title("ROC-AUC Comparison", "HIGHER IS BETTER · MAX 1.0")
-        fig = base_fig(300)
-        fig.add_trace(go.Bar(
-            x=m_names, y=[m["auc"] for m in MODELS_DATA],
-            marker_color=[ACCENT if m["best"] else BLUE for m in MODELS_DATA],
-            marker_line_width=0,
-            text=[f"{m['auc']:.3f}" for m in MODELS_DATA],
-            textposition="outside", textfont=dict(color=TEXT, size=10),
-            hovertemplate="%{x}: <b>%{y:.3f}</b><extra></extra>",
-        ))
-        fig.update_layout(yaxis=dict(range=[0.75, 1.0], gridcolor=BORDER),
-                          xaxis=dict(gridcolor="rgba(0,0,0,0)"))
-        render(fig, "auc_chart")
+        def auc_chart():
+            fig = base_fig(300)
+            fig.add_trace(go.Bar(
+                x=m_names, y=[m["auc"] for m in MODELS_DATA],
+                marker_color=[ACCENT if m["best"] else BLUE for m in MODELS_DATA],
+                marker_line_width=0,
+                text=[f"{m['auc']:.3f}" for m in MODELS_DATA],
+                textposition="outside", textfont=dict(color=TEXT, size=10),
+                hovertemplate="%{x}: <b>%{y:.3f}</b><extra></extra>",
+            ))
+            aucs = [m["auc"] for m in MODELS_DATA]
+            fig.update_layout(yaxis=dict(range=[max(min(aucs) - 0.09, 0), 1.0],
+                                         gridcolor=BORDER),
+                              xaxis=dict(gridcolor="rgba(0,0,0,0)"))
+            return fig
+        render(cached_fig("auc_chart", auc_chart, MODELS_DATA), "auc_chart")
 
     card_title("XGBoost — Top Feature Importances",
                "WHICH FEATURES DRIVE PREDICTIONS MOST")
     fc_colors = [ACCENT if v > 0.15 else ACCENT3 if v > 0.08
                  else BLUE for v in FEAT_VALS]
-    fig = base_fig(320)
-    fig.add_trace(go.Bar(
-        y=FEAT_NAMES, x=FEAT_VALS, orientation='h',
-        marker_color=fc_colors, marker_line_width=0,
-        text=[f"{v:.2f}" for v in FEAT_VALS],
-        textposition="outside", textfont=dict(color=TEXT, size=10),
-        hovertemplate="%{y}: <b>%{x:.2f}</b><extra></extra>",
-    ))
-    fig.update_layout(xaxis=dict(range=[0, 0.38], gridcolor=BORDER),
-                      yaxis=dict(autorange="reversed",
-                                 gridcolor="rgba(0,0,0,0)"))
-    render(fig, "feat_imp")
+    def feat_imp():
+        fig = base_fig(320)
+        fig.add_trace(go.Bar(
+            y=FEAT_NAMES, x=FEAT_VALS, orientation='h',
+            marker_color=fc_colors, marker_line_width=0,
+            text=[f"{v:.2f}" for v in FEAT_VALS],
+            textposition="outside", textfont=dict(color=TEXT, size=10),
+            hovertemplate="%{y}: <b>%{x:.2f}</b><extra></extra>",
+        ))
+        fig.update_layout(xaxis=dict(range=[0, 0.38], gridcolor=BORDER),
+                          yaxis=dict(autorange="reversed",
+                                     gridcolor="rgba(0,0,0,0)"))
+        return fig
+    render(cached_fig("feat_imp", feat_imp, FEAT_NAMES, FEAT_VALS), "feat_imp")
 
     card_title("XGBoost — Confusion Matrix",
                "PREDICTED vs ACTUAL · TEST SET")
@@ -811,21 +1128,226 @@ elif page == "▤  Model Comparison":
              font=dict(color=TEXT, size=14, family="Space Mono"))
         for i in range(2) for j in range(2)
     ]
-    fig = go.Figure(go.Heatmap(
-        z=[[1720, 78], [124, 78]],
-        x=xl, y=yl,
-        colorscale=[[0, "rgba(255,77,109,0.25)"],
-                    [1, "rgba(0,255,178,0.5)"]],
-        showscale=False,
-        hovertemplate="%{x}<br>%{y}<br>Count: <b>%{z}</b><extra></extra>",
-    ))
-    fig.update_layout(
-        height=300, paper_bgcolor=CARD, plot_bgcolor=CARD,
-        margin=dict(l=12, r=12, t=12, b=12),
-        annotations=anns,
-        xaxis=dict(side="bottom",
-                   tickfont=dict(color=TEXT, size=11), linecolor=BORDER),
-        yaxis=dict(tickfont=dict(color=TEXT, size=11), linecolor=BORDER),
-        font=dict(family="Space Mono", color=MUTED),
-    )
-    render(fig, "cm")
+    def cm():
+        fig = go.Figure(go.Heatmap(
+            z=[[1720, 78], [124, 78]],
+            x=xl, y=yl,
+            colorscale=[[0, "rgba(255,77,109,0.25)"],
+                        [1, "rgba(0,255,178,0.5)"]],
+            showscale=False,
+            hovertemplate="%{x}<br>%{y}<br>Count: <b>%{z}</b><extra></extra>",
+        ))
+        fig.update_layout(
+            height=300, paper_bgcolor=CARD, plot_bgcolor=CARD,
+            margin=dict(l=12, r=12, t=12, b=12),
+            annotations=anns,
+            xaxis=dict(side="bottom",
+                       tickfont=dict(color=TEXT, size=11), linecolor=BORDER),
+            yaxis=dict(tickfont=dict(color=TEXT, size=11), linecolor=BORDER),
+            font=dict(family="Space Mono", color=MUTED),
+        )
+        return fig
+    render(cached_fig("cm", cm), "cm")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PAGE 5 — DRIFT MONITOR
+# ══════════════════════════════════════════════════════════════════════════════
+elif page == "≋  Drift Monitor":
+    from chainsight import drift, serving
+
+    live, processes = drift.collect()
+    reference = serving.get_drift_reference()
+    page_header("Input", "Drift",
+                "LIVE SCORING INPUTS VS TRAINING DATA  ·  STREAMING SKETCHES",
+                f"{live.rows:,} Shipments Sketched", BLUE)
+
+    if reference is None:
+        st.markdown(f"""
+        <div style='background:{CARD};border:1px solid {BORDER};
+                    border-radius:14px;padding:40px 30px;text-align:center;
+                    font-family:"Space Mono",monospace;font-size:11px;
+                    color:{MUTED};line-height:1.9'>
+          No training reference yet. Sketch the data the model was trained on:<br>
+          <span style='color:{TEXT}'>python -m chainsight.drift data/shipments</span>
+        </div>""", unsafe_allow_html=True)
+    else:
+        rows = drift.compare(live, reference)
+        scored = [r for r in rows if r["psi"] is not None]
+        worst = scored[0] if scored else None
+        drifting = sum(r["status"] == "drift" for r in scored)
+        status_color = {"drift": ACCENT2, "moderate": ACCENT3, "stable": ACCENT}
+        k1, k2, k3, k4 = st.columns(4)
+        with k1: kpi("SHIPMENTS", f"{live.rows:,}",
+                     f"{processes} PROCESS{'ES' if processes > 1 else ''} "
+                     f"MERGED", BLUE)
+        with k2: kpi("WORST PSI", f"{worst['psi']:.3f}" if worst else "—",
+                     worst["feature"] if worst else "NOTHING SCORED YET",
+                     status_color.get(worst["status"], MUTED) if worst else MUTED)
+        with k3: kpi("DRIFTING", f"{drifting}",
+                     f"PSI > {drift.PSI_ALERT}  ·  OF {len(rows)} FEATURES",
+                     ACCENT2 if drifting else ACCENT)
+        with k4: kpi("TRAINING ROWS", f"{reference.rows:,}",
+                     "REFERENCE SKETCH", MUTED)
+
+        st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
+
+        dr_cols = st.columns(2)
+        with dr_cols[0]:
+            card_title("Population Stability Index",
+                       f"PER FEATURE  ·  {drift.PSI_WARN} MODERATE  ·  "
+                       f"{drift.PSI_ALERT} DRIFT")
+            fig = base_fig(320)
+            fig.add_trace(go.Bar(
+                y=[r["feature"] for r in rows],
+                x=[r["psi"] or 0.0 for r in rows], orientation="h",
+                marker_color=[status_color.get(r["status"], DIM) for r in rows],
+                marker_line_width=0,
+                text=[r["status"] for r in rows], textposition="outside",
+                textfont=dict(color=TEXT, size=10),
+                hovertemplate="%{y}: <b>PSI %{x:.4f}</b><extra></extra>",
+            ))
+            for bound in (drift.PSI_WARN, drift.PSI_ALERT):
+                fig.add_vline(x=bound, line_dash="dot", line_color=MUTED)
+            fig.update_layout(yaxis=dict(autorange="reversed",
+                                         gridcolor="rgba(0,0,0,0)"))
+            render(fig, "drift_psi")
+
+        with dr_cols[1]:
+            card_title("Live vs Training", "SHARE OF SHIPMENTS PER BIN / LABEL")
+            pick = st.selectbox("feature", [r["feature"] for r in rows],
+                                label_visibility="collapsed")
+            if pick in reference.numeric:
+                ref, cur = reference.numeric[pick], live.numeric[pick]
+                keep = [i for i, (a, b) in enumerate(zip(ref.counts, cur.counts))
+                        if a or b]
+                bounds = [f"≤ {b:g}" for b in ref.bounds] + ["more"]
+                x = [bounds[i] for i in keep]
+                train = [ref.counts[i] / max(ref.count, 1) for i in keep]
+                now = [cur.counts[i] / max(cur.count, 1) for i in keep]
+            else:
+                ref, cur = reference.labels[pick], live.labels[pick]
+                x = sorted(set(ref) | set(cur))
+                train = [ref.get(k, 0) / max(sum(ref.values()), 1) for k in x]
+                now = [cur.get(k, 0) / max(sum(cur.values()), 1) for k in x]
+            fig = base_fig(252)
+            for name, share, color in (("Training", train, DIM),
+                                       ("Live", now, BLUE)):
+                fig.add_trace(go.Bar(
+                    x=x, y=share, name=name, marker_color=color,
+                    marker_line_width=0,
+                    hovertemplate="%{x}: <b>%{y:.1%}</b><extra></extra>",
+                ))
+            fig.update_layout(barmode="group", showlegend=True,
+                              legend=dict(orientation="h", y=1.12, x=0),
+                              xaxis=dict(type="category", gridcolor="rgba(0,0,0,0)"),
+                              yaxis=dict(tickformat=".0%"))
+            render(fig, "drift_dist")
+
+        card_title("All Features",
+                   "KS = LARGEST GAP BETWEEN CDFS  ·  QUANTILES FROM BINS")
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        st.caption("Sketches cover every shipment scored since each process "
+                   "started." + (f" Other processes write theirs to "
+                                 f"{config.DRIFT_DIR} every "
+                                 f"{drift.EXPORT_EVERY:.0f} s."
+                                 if config.DRIFT_DIR else
+                                 " Set CHAINSIGHT_DRIFT_DIR to include the API "
+                                 "and batch jobs."))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PAGE 6 — PERFORMANCE (hidden, ?perf=1)
+# ══════════════════════════════════════════════════════════════════════════════
+elif page == "◷  Performance":
+    rows = timings.summary()
+    page_rows = [r for r in rows if r["stage"] == "page"]
+    reruns = sum(r["count"] for r in page_rows)
+    page_header("Rerun", "Performance",
+                "IN-PROCESS LATENCY HISTOGRAMS  ·  THIS SERVER PROCESS SINCE START",
+                f"{reruns:,} Reruns Timed", BLUE)
+
+    hist = timings.histograms()
+    all_pages = perf.Histogram()
+    for (stage, _), h in hist.items():
+        if stage == "page":
+            all_pages.merge(h)
+    fc = figcache.figures
+    lookups = fc.hits + fc.misses
+    k1, k2, k3, k4 = st.columns(4)
+    with k1: kpi("RERUN P50", f"{all_pages.quantile(0.5) * 1e3:.0f} ms",
+                 "ALL PAGES", ACCENT)
+    with k2: kpi("RERUN P95", f"{all_pages.quantile(0.95) * 1e3:.0f} ms",
+                 "ALL PAGES", ACCENT3)
+    with k3: kpi("FIGURE CACHE", f"{fc.hits / lookups:.0%}" if lookups else "—",
+                 f"{fc.hits:,} HITS · {fc.misses:,} BUILDS", BLUE)
+    with k4: kpi("SERIES", f"{len(rows)}",
+                 "STAGE × PAGE / CHART", MUTED)
+
+    st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
+
+    pf_cols = st.columns(2)
+    with pf_cols[0]:
+        card_title("Where Rerun Time Goes",
+                   "TOTAL SECONDS PER STAGE  ·  PAGE = WHOLE RERUN")
+        stages = {}
+        for r in rows:
+            stages[r["stage"]] = stages.get(r["stage"], 0.0) + r["total_s"]
+        fig = base_fig(300)
+        fig.add_trace(go.Bar(
+            y=list(stages), x=list(stages.values()), orientation="h",
+            marker_color=[DIM if s == "page" else BLUE for s in stages],
+            marker_line_width=0,
+            text=[f"{v:.2f} s" for v in stages.values()],
+            textposition="outside", textfont=dict(color=TEXT, size=10),
+            hovertemplate="%{y}: <b>%{x:.3f} s</b><extra></extra>",
+        ))
+        fig.update_layout(yaxis=dict(autorange="reversed",
+                                     gridcolor="rgba(0,0,0,0)"))
+        render(fig, "perf_stages")
+
+    with pf_cols[1]:
+        card_title("Latency Histogram", "CALLS PER BUCKET  ·  UPPER BOUND")
+        series = [f"{stage} · {name}" for stage, name in hist] or ["—"]
+        pick = st.selectbox("series", series, label_visibility="collapsed")
+        h = hist.get(tuple(pick.split(" · ", 1)), perf.Histogram())
+        bounds = [f"{b * 1e3:g} ms" for b in perf.BUCKETS] + ["+Inf"]
+        fig = base_fig(252)
+        fig.add_trace(go.Bar(
+            x=bounds, y=h.counts, marker_color=ACCENT, marker_line_width=0,
+            hovertemplate="≤ %{x}: <b>%{y}</b><extra></extra>",
+        ))
+        fig.update_layout(xaxis=dict(type="category", gridcolor="rgba(0,0,0,0)"))
+        render(fig, "perf_hist")
+
+    card_title("All Series", "MILLISECONDS UNLESS NOTED  ·  PERCENTILES FROM BUCKETS")
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    st.download_button("Download Prometheus metrics", timings.prometheus(),
+                       file_name="chainsight_metrics.prom", mime="text/plain")
+    if config.METRICS_FILE:
+        st.caption(f"Also written to {config.METRICS_FILE} every "
+                   f"{perf.EXPORT_EVERY:.0f} s.")
+
+
+# ─── MODEL STATUS ─────────────────────────────────────────────────────────────
+# Load time and footprint once some page has loaded the model; never loads it,
+# nor imports chainsight.serving (and numpy) on pages that do not score.
+serving = sys.modules.get("chainsight.serving")
+loaded = None if serving is None else serving.peek_scorer()
+model_status.markdown(f"""
+<hr style='border-color:{BORDER};margin:18px 0 12px'>
+<div style='display:flex;align-items:center;gap:8px'>
+  <div style='width:8px;height:8px;border-radius:50%;background:{ACCENT};
+              box-shadow:0 0 6px {ACCENT}'></div>
+  <span style='font-family:"Space Mono",monospace;font-size:9px;
+               color:{MUTED};letter-spacing:1.5px'>MODEL LIVE · XGB v1.0</span>
+</div>
+<div style='font-family:"Space Mono",monospace;font-size:8px;color:{DIM};
+            letter-spacing:1px;margin:6px 0 0 16px'>
+  {"LOADS ON FIRST PREDICTION" if loaded is None else
+   f"LOADED IN {loaded.load_seconds * 1000:.0f} MS · "
+   f"{loaded.memory_bytes / 2**20:.1f} MB"}</div>""", unsafe_allow_html=True)
+
+timings.observe("page", page.split(maxsplit=1)[1],
+                time.perf_counter() - RUN_STARTED)
+timings.export()
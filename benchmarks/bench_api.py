@@ -0,0 +1,133 @@
+"""
+Load test for the scoring API: p50/p99 latency and throughput.
+
+Starts `python -m chainsight.api` on a free local port (or targets --url)
+and drives it from keep-alive connections with a plain asyncio HTTP/1.1
+client, so no extra dependencies are needed.
+
+    python benchmarks/bench_api.py --concurrency 32 --requests 5000
+    python benchmarks/bench_api.py --batch 100          # POST /score/batch
+    python benchmarks/bench_api.py --no-factors         # probabilities only
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_batch import random_shipments                # noqa: E402
+
+
+def payloads(n, batch, seed=0):
+    rows = random_shipments(max(n, 1) * max(batch, 1), seed).to_dict("records")
+    rows = [{k: (v.item() if hasattr(v, "item") else v) for k, v in r.items()}
+            for r in rows]
+    if not batch:
+        return "/score", [json.dumps(r).encode() for r in rows]
+    return "/score/batch", [json.dumps({"shipments": rows[i:i + batch]}).encode()
+                            for i in range(0, len(rows), batch)]
+
+
+async def _client(host, port, path, bodies, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            t0 = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = next(int(line.split(b":", 1)[1])
+                          for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length:"))
+            await reader.readexactly(length)
+            if status != 200:
+                raise RuntimeError(f"HTTP {status} from {path}")
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def run(host, port, path, bodies, concurrency):
+    latencies = []
+    shards = [bodies[i::concurrency] for i in range(concurrency)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, path, shard, latencies)
+                           for shard in shards if shard))
+    return np.array(latencies), time.perf_counter() - t0
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workers):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "chainsight.api", "--port", str(port),
+         "--workers", str(workers)], cwd=ROOT)
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("API server did not come up")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", help="existing server; default starts one locally")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--batch", type=int, default=0,
+                    help="shipments per request (0 = single /score calls)")
+    ap.add_argument("--no-factors", action="store_true",
+                    help="request ?factors=0 (no factor breakdown)")
+    args = ap.parse_args()
+
+    proc = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        proc = start_server(port, args.workers)
+    try:
+        path, bodies = payloads(args.requests, args.batch)
+        if args.no_factors:
+            path += "?factors=0"
+        asyncio.run(run(host, port, path, bodies[:args.concurrency * 4],
+                        args.concurrency))                    # warm-up
+        lat, wall = asyncio.run(run(host, port, path, bodies, args.concurrency))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    rows = len(lat) * max(args.batch, 1)
+    p50, p99 = np.percentile(lat, [50, 99]) * 1e3
+    print(f"{path}  concurrency={args.concurrency}  requests={len(lat):,}")
+    print(f"  p50 {p50:.2f} ms   p99 {p99:.2f} ms")
+    print(f"  {len(lat) / wall:,.0f} req/s   {rows / wall:,.0f} shipments/s")
+
+
+if __name__ == "__main__":
+    main()
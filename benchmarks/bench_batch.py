@@ -0,0 +1,58 @@
+"""
+Throughput of the batch scoring path (encode + predict) on one core.
+
+    python benchmarks/bench_batch.py --rows 200000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chainsight import batch, serving                   # noqa: E402
+from chainsight.features import VOCAB                   # noqa: E402
+
+
+def random_shipments(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(vals, n) for col, vals in VOCAB.items()})
+    base = rng.integers(2, 36, n)
+    df["Base_Lead_Time_Days"] = base
+    df["Scheduled_Lead_Time_Days"] = base + rng.integers(1, 4, n)
+    df["Geopolitical_Risk_Index"] = rng.uniform(0.1, 0.9, n).round(2)
+    df["Weather_Severity_Index"] = rng.uniform(0, 10, n).round(1)
+    df["Inflation_Rate_Pct"] = rng.normal(3.5, 1.2, n).round(2)
+    df["Shipping_Cost_USD"] = rng.lognormal(8.5, 1.0, n).round(2)
+    df["Order_Weight_Kg"] = rng.integers(100, 10000, n)
+    days = rng.integers(0, 730, n)
+    df["Order_Date"] = (pd.Timestamp("2024-01-01")
+                        + pd.to_timedelta(days, unit="D")).strftime("%m/%d/%Y")
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = random_shipments(args.rows)
+    serving.get_model().obj.set_params(n_jobs=1)
+    batch.score_frame(df.head(100))                      # warm-up
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        batch.score_frame(df)
+        best = min(best, time.perf_counter() - t0)
+    print(f"{args.rows:,} rows in {best:.3f} s  ->  "
+          f"{args.rows / best:,.0f} rows/s (1 thread)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Latency of Overview cross-filter re-aggregation on a synthetic index.
+
+    python benchmarks/bench_crossfilter.py --rows 5000000
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chainsight.colindex import ShipmentIndex         # noqa: E402
+from chainsight.features import VOCAB                 # noqa: E402
+
+DIMS = {"route": "Route_Type", "product": "Product_Category",
+        "origin": "Origin_City", "mode": "Transportation_Mode"}
+
+
+def synthetic_index(n, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = {dim: VOCAB[col] for dim, col in DIMS.items()}
+    codes = {dim: rng.integers(0, len(vals), n) for dim, vals in labels.items()}
+    late = rng.random(n) < 0.125
+    delay = np.where(late, rng.integers(1, 21, n), 0)
+    return ShipmentIndex(codes, labels, delay, rng.integers(0, 12, n))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    idx = synthetic_index(args.rows)
+    print(f"built index over {args.rows:,} rows in "
+          f"{time.perf_counter() - t0:.2f} s")
+
+    # Every combination of "no filter" / first category per dimension.
+    options = [[None, idx.labels[d][0]] for d in DIMS]
+    timings = []
+    for combo in itertools.product(*options):
+        filters = dict(zip(DIMS, combo))
+        t0 = time.perf_counter()
+        idx.crossfilter(filters)
+        timings.append(time.perf_counter() - t0)
+    t = np.array(timings) * 1e3
+    print(f"{len(t)} filter combinations: median {np.median(t):.1f} ms, "
+          f"max {t.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
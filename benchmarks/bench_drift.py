@@ -0,0 +1,61 @@
+"""
+Cost of the drift sketches (chainsight.drift) on the scoring path: one
+shipment at a time as the Risk Predictor and the API add them, whole
+batches as batch scoring does, and merging the sketches of many workers.
+
+    python benchmarks/bench_drift.py --rows 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chainsight import drift, serving, synth                  # noqa: E402
+from chainsight.features import SAFE_COLS                     # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--single", type=int, default=100_000,
+                    help="rows added one at a time")
+    ap.add_argument("--workers", type=int, default=64,
+                    help="sketches merged")
+    args = ap.parse_args()
+
+    pre = serving.get_preprocessor()
+    X = pre.transform(synth.generate(args.rows).frame(SAFE_COLS))
+    rows = X[:args.single].tolist()
+
+    sketch = drift.Sketch()
+    t0 = time.perf_counter()
+    for row in rows:
+        sketch.observe_row(row, pre)
+    t = time.perf_counter() - t0
+    print(f"one at a time: {t / len(rows) * 1e6:6.2f} µs per shipment")
+
+    t0 = time.perf_counter()
+    sketch.observe(X, pre)
+    t = time.perf_counter() - t0
+    print(f"batch:         {args.rows / t:,.0f} shipments/s "
+          f"({t * 1e3:.1f} ms for {args.rows:,})")
+
+    t0 = time.perf_counter()
+    merged = drift.Sketch()
+    for _ in range(args.workers):
+        merged.merge(sketch)
+    t = time.perf_counter() - t0
+    print(f"merge:         {t / args.workers * 1e6:6.1f} µs per sketch")
+
+    ref = drift.Sketch()
+    ref.observe(X[::2], pre)
+    t0 = time.perf_counter()
+    drift.compare(sketch, ref)
+    print(f"compare:       {(time.perf_counter() - t0) * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
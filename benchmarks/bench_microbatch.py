@@ -0,0 +1,73 @@
+"""
+Throughput/latency curve of the micro-batcher in front of the model.
+
+Closed-loop clients each submit one shipment at a time to a MicroBatcher
+and await the result, for every (max wait, max batch) setting.  max_batch=1
+is the no-coalescing baseline: one predict_proba call per request.
+
+    python benchmarks/bench_microbatch.py --clients 64 --requests 4000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chainsight import serving                          # noqa: E402
+from chainsight.microbatch import MicroBatcher          # noqa: E402
+from bench_batch import random_shipments                # noqa: E402
+
+
+async def run(rows, clients, max_wait_ms, max_batch):
+    batcher = MicroBatcher(max_wait_ms=max_wait_ms, max_batch=max_batch)
+    batcher.start()
+    latencies = []
+
+    async def client(shard):
+        for row in shard:
+            t0 = time.perf_counter()
+            await batcher.submit(row)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(rows[i::clients]) for i in range(clients)))
+    wall = time.perf_counter() - t0
+    await batcher.stop()
+    return np.array(latencies), wall, batcher.mean_batch
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=64)
+    ap.add_argument("--requests", type=int, default=4000)
+    ap.add_argument("--waits", default="0,1,2,5,10",
+                    help="max wait settings in ms, comma separated")
+    ap.add_argument("--batches", default="1,32,256",
+                    help="max batch settings, comma separated")
+    args = ap.parse_args()
+
+    X = serving.get_preprocessor().transform(random_shipments(args.requests))
+    rows = list(X)
+    serving.predict_proba(X[:100])                       # warm-up
+
+    print(f"{args.clients} clients, {args.requests:,} single-shipment requests")
+    print(f"{'wait ms':>8} {'batch':>6} {'req/s':>9} {'p50 ms':>8} "
+          f"{'p99 ms':>8} {'mean batch':>11}")
+    for max_batch in (int(b) for b in args.batches.split(",")):
+        waits = [0.0] if max_batch == 1 else [float(w) for w in
+                                              args.waits.split(",")]
+        for wait in waits:
+            lat, wall, mean = asyncio.run(run(rows, args.clients, wait,
+                                              max_batch))
+            p50, p99 = np.percentile(lat, [50, 99]) * 1e3
+            print(f"{wait:>8g} {max_batch:>6} {len(lat) / wall:>9,.0f} "
+                  f"{p50:>8.2f} {p99:>8.2f} {mean:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
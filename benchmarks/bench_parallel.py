@@ -0,0 +1,53 @@
+"""
+Scaling of multi-core batch scoring (chainsight.parallel) with the number
+of worker processes, on synthetic shipments.
+
+    python benchmarks/bench_parallel.py --rows 4000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chainsight import parallel, serving, synth               # noqa: E402
+from chainsight.features import SAFE_COLS                     # noqa: E402
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--workers", type=int, nargs="+",
+                    default=sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))))
+    args = ap.parse_args()
+
+    df = synth.generate(args.rows).frame(SAFE_COLS)
+    X = serving.get_preprocessor().transform(df)
+    serving.get_model().obj.set_params(n_jobs=1)
+    serving.predict_proba(X[:100])                        # warm-up
+
+    t0 = time.perf_counter()
+    ref = serving.predict_proba(X)
+    serial = time.perf_counter() - t0
+    print(f"{args.rows:,} rows, {cpus} CPUs; one predict call on one core: "
+          f"{serial:.2f} s ({args.rows / serial:,.0f} rows/s)")
+    print(f"{'workers':>7} {'seconds':>8} {'rows/s':>12} {'speedup':>8} "
+          f"{'efficiency':>10}")
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        prob = parallel.predict_proba(X, workers=workers)
+        t = time.perf_counter() - t0
+        if not np.array_equal(prob, ref):
+            raise SystemExit(f"{workers} workers: probabilities differ")
+        print(f"{workers:>7} {t:>8.2f} {args.rows / t:>12,.0f} "
+              f"{serial / t:>8.2f} {serial / t / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
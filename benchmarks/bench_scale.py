@@ -0,0 +1,109 @@
+"""
+End-to-end throughput at scale on synthetic shipments (chainsight.synth):
+generating the column store, reading the training matrix, the dashboard
+aggregates, the cross-filter index, batch scoring and XGBoost training.
+
+    python benchmarks/bench_scale.py --rows 10000000
+    python benchmarks/bench_scale.py --rows 2000000 --stages score,train
+"""
+
+import argparse
+import itertools
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from chainsight import (aggregates, batch, colindex, dataset,   # noqa: E402
+                        synth, training)
+from chainsight.features import SAFE_COLS                       # noqa: E402
+
+STAGES = ["generate", "load", "aggregate", "crossfilter", "score", "train"]
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def report(stage, seconds, rows, note=""):
+    print(f"{stage:<12} {rows:>12,} rows {seconds:>8.2f} s "
+          f"{rows / seconds:>14,.0f} rows/s  {note}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--store", help="column store to build (default: a "
+                                    "temporary directory, removed afterwards)")
+    ap.add_argument("--stages", default=",".join(STAGES),
+                    help=f"comma-separated subset of {','.join(STAGES)}")
+    ap.add_argument("--train-rows", type=int, default=1_000_000,
+                    help="rows the training stage uses at most")
+    args = ap.parse_args()
+    stages = args.stages.split(",")
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    store = Path(args.store or tempfile.mkdtemp(prefix="chainsight_")) / "shipments"
+    try:
+        _, t = timed(synth.write_store, store, args.rows, args.seed)
+        if "generate" in stages:
+            report("generate", t, args.rows, f"-> {store}")
+
+        X = y = None
+        if {"load", "score", "train"} & set(stages):
+            (_, X, y), t = timed(training.load_xy, store)
+            if "load" in stages:
+                report("load", t, args.rows, "training matrix")
+
+        if "aggregate" in stages:
+            df, t_read = timed(dataset.read, store, aggregates.USECOLS)
+            agg, t = timed(aggregates.compute, df)
+            report("aggregate", t_read + t, args.rows,
+                   f"read {t_read:.2f} s, delay rate "
+                   f"{int(agg['delayed']) / int(agg['n']):.1%}")
+
+        if "crossfilter" in stages:
+            idx, t = timed(colindex.ShipmentIndex.from_store,
+                           dataset.ColumnStore(store))
+            options = [[None, idx.labels[d][0]] for d in colindex.GROUPS]
+            lat = []
+            for combo in itertools.product(*options):
+                _, dt = timed(idx.crossfilter, dict(zip(colindex.GROUPS, combo)))
+                lat.append(dt * 1e3)
+            report("crossfilter", t, args.rows,
+                   f"index build; {len(lat)} filters median "
+                   f"{np.median(lat):.1f} ms, max {max(lat):.1f} ms")
+
+        if "score" in stages:
+            df = dataset.read(store, SAFE_COLS)
+            batch.score_frame(df.head(100))                  # warm-up
+            _, t = timed(batch.score_frame, df)
+            report("score", t, args.rows, "encode + predict")
+
+        if "train" in stages:
+            from sklearn.metrics import roc_auc_score
+
+            n = min(args.train_rows, args.rows)
+            x_train, x_test, y_train, y_test = training.split(X[:n], y[:n])
+            factory, _ = training.MODELS["XGBoost"]
+            model = factory(-1)
+            _, t = timed(model.fit, x_train, y_train)
+            auc = roc_auc_score(y_test, model.predict_proba(x_test)[:, 1])
+            report("train", t, len(x_train), f"XGBoost, holdout AUC {auc:.3f}")
+    finally:
+        if not args.store:
+            shutil.rmtree(store.parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Dashboard cold start and rerun time per page.
+
+Every page is opened in a fresh interpreter (run with -X importtime), so the
+cold-start figure covers interpreter start, imports and the first full
+script run up to the last element being sent, as a newly scaled-up
+container would see it.  The same process then reruns the page to time a
+warm rerun, and reports which heavy libraries the page pulled in and the
+slowest top-level imports:
+
+    python benchmarks/bench_startup.py --reruns 20
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ["▦  Overview", "⚡  Risk Predictor", "∿  EDA Insights",
+         "▤  Model Comparison", "≋  Drift Monitor"]
+HEAVY = ["numpy", "pandas", "joblib", "sklearn", "xgboost", "scipy"]
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def child(page, reruns):
+    """Runs inside the fresh interpreter; prints one JSON line."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    at.session_state["page"] = page
+    at.run()
+    painted = time.time()
+    if at.exception:
+        raise SystemExit(f"{page}: {at.exception[0].message}")
+    warm = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - t0)
+    print(json.dumps({"painted": painted, "warm": warm,
+                      "heavy": [m for m in HEAVY if m in sys.modules]}))
+
+
+def top_imports(stderr, n):
+    """Slowest top-level imports (cumulative µs) from -X importtime output."""
+    out = []
+    for line in stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m and not m.group(3):
+            out.append((int(m.group(2)), m.group(4)))
+    return sorted(out, reverse=True)[:n]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reruns", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=3,
+                    help="cold starts per page; the fastest is reported")
+    ap.add_argument("--top", type=int, default=5,
+                    help="slowest top-level imports to list per page")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(args.child, args.reruns)
+
+    for page in PAGES:
+        runs = []
+        for _ in range(args.repeat):
+            t0 = time.time()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", __file__, "--child", page,
+                 "--reruns", str(args.reruns)],
+                capture_output=True, text=True, cwd=ROOT)
+            if proc.returncode:
+                raise SystemExit(proc.stderr.strip().splitlines()[-1])
+            res = json.loads(proc.stdout.strip().splitlines()[-1])
+            runs.append((res["painted"] - t0, res, proc.stderr))
+        cold, res, stderr = min(runs, key=lambda r: r[0])
+        warm = statistics.median(res["warm"]) * 1e3 if res["warm"] else 0.0
+        print(f"{page.split(maxsplit=1)[1]:<17} cold start {cold:5.2f} s   "
+              f"rerun {warm:6.1f} ms   "
+              f"loads: {', '.join(res['heavy']) or '-'}")
+        for us, name in top_imports(stderr, args.top):
+            print(f"    {us / 1e3:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
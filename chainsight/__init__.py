@@ -0,0 +1,3 @@
+"""
+ChainSight — model serving, scoring and data helpers used by app.py.
+"""
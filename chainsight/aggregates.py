@@ -0,0 +1,315 @@
+"""
+Precomputed dashboard aggregates.
+
+The Overview and EDA pages need a few dozen numbers (mean delay per route,
+product, origin and transport mode, monthly volume, the delay histogram,
+disruption counts and feature correlations).  This job computes them from
+the shipment dataset with one bincount per chart and writes them as a
+directory of .npy files that app.py memory-maps at startup:
+
+    python -m chainsight.aggregates global_supply_chain_disruption_v1.csv
+
+Means are stored as sums and counts, and correlations as co-moments, so a
+new batch of shipments is folded in with work proportional to the batch:
+
+    python -m chainsight.aggregates new_shipments.csv --update
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:                                 # Windows
+    fcntl = None
+
+import numpy as np
+
+from . import dataset
+from .config import AGG_DIR
+from .filecache import cached
+
+GROUPS = {                      # store prefix -> dataset column
+    "route":   "Route_Type",
+    "product": "Product_Category",
+    "origin":  "Origin_City",
+    "mode":    "Transportation_Mode",
+}
+
+# Numeric columns correlated against Delay_Days (kept last), with the short
+# names the EDA page shows.
+CORR_COLUMNS = {
+    "Actual_Lead_Time_Days":    "Actual_Lead_Time",
+    "Scheduled_Lead_Time_Days": "Sched_Lead_Time",
+    "Base_Lead_Time_Days":      "Base_Lead_Time",
+    "Weather_Severity_Index":   "Weather_Severity",
+    "Geopolitical_Risk_Index":  "Geo_Risk_Index",
+    "Inflation_Rate_Pct":       "Inflation_Rate",
+    "Shipping_Cost_USD":        "Shipping_Cost",
+    "Delay_Days":               "Delay_Days",
+}
+
+HIST_BINS = 16                  # delay days 0..14, last bin holds 15+
+NO_EVENT  = "No Event"
+
+USECOLS = (["Order_Month", "Disruption_Event"] + list(GROUPS.values())
+           + list(CORR_COLUMNS))
+
+
+def _grouped(values, delay):
+    import pandas as pd
+
+    codes, labels = pd.factorize(values, sort=True)
+    return (np.asarray(labels, dtype=str),
+            np.bincount(codes, weights=delay, minlength=len(labels)),
+            np.bincount(codes, minlength=len(labels)).astype(np.int64))
+
+
+def compute(df):
+    """Aggregate a raw shipments frame into a dict of NumPy arrays."""
+    import pandas as pd
+
+    delay = df["Delay_Days"].to_numpy(dtype=np.float64)
+    late = delay > 0
+    store = {
+        "n":           np.array(len(df), dtype=np.int64),
+        "delayed":     np.array(late.sum(), dtype=np.int64),
+        "delay_sum":   np.array(delay.sum()),
+        "delay_max":   np.array(delay.max() if len(df) else 0.0),
+    }
+    for prefix, col in GROUPS.items():
+        labels, sums, cnts = _grouped(df[col], delay)
+        store[f"{prefix}_labels"] = labels
+        store[f"{prefix}_sum"] = sums
+        store[f"{prefix}_cnt"] = cnts
+
+    if "Order_Month" in df:
+        month = df["Order_Month"]
+    else:
+        month = pd.to_datetime(df["Order_Date"], errors="coerce").dt.month
+    month = month.fillna(0).to_numpy(dtype=np.int64)
+    store["month_cnt"] = np.bincount(month, minlength=13)[1:13]
+    store["month_delayed"] = np.bincount(month, weights=late,
+                                         minlength=13)[1:13].astype(np.int64)
+
+    bins = np.clip(delay, 0, HIST_BINS - 1).astype(np.int64)
+    store["delay_hist"] = np.bincount(bins, minlength=HIST_BINS)
+
+    events = df["Disruption_Event"]
+    if events.dtype == "category":          # labels must stay sorted for merge()
+        events = events.cat.set_categories(
+            sorted(set(events.cat.categories) | {NO_EVENT}))
+    events = events.fillna(NO_EVENT)
+    labels, _, cnts = _grouped(events, delay)
+    store["disrupt_labels"], store["disrupt_cnt"] = labels, cnts
+
+    X = df[list(CORR_COLUMNS)].to_numpy(dtype=np.float64)
+    mean = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+    D = X - mean
+    store["moment_mean"] = mean
+    store["moment_c"] = D.T @ D
+    return store
+
+
+# ─── incremental maintenance ─────────────────────────────────────────────────
+def _merge_grouped(a_labels, a_vals, b_labels, b_vals):
+    labels = np.union1d(a_labels, b_labels)
+    out = np.zeros(len(labels), dtype=np.result_type(a_vals, b_vals))
+    out[np.searchsorted(labels, a_labels)] += a_vals
+    out[np.searchsorted(labels, b_labels)] += b_vals
+    return labels, out
+
+
+def merge(a, b):
+    """Combine two stores as if their shipments had been aggregated together.
+
+    Group sums/counts are aligned on their labels, histograms and counters
+    are added, and the co-moments are combined with Chan's parallel update,
+    so the cost depends on the number of categories, not on row counts.
+    """
+    na, nb = int(a["n"]), int(b["n"])
+    if nb == 0:
+        return {k: np.array(v) for k, v in a.items()}
+    if na == 0:
+        return {k: np.array(v) for k, v in b.items()}
+    n = na + nb
+    out = {
+        "n":         np.array(n, dtype=np.int64),
+        "delayed":   np.array(int(a["delayed"]) + int(b["delayed"]),
+                              dtype=np.int64),
+        "delay_sum": np.array(float(a["delay_sum"]) + float(b["delay_sum"])),
+        "delay_max": np.array(max(float(a["delay_max"]),
+                                  float(b["delay_max"]))),
+    }
+    for prefix in list(GROUPS) + ["disrupt"]:
+        labels = None
+        for field in ("sum", "cnt"):
+            key = f"{prefix}_{field}"
+            if key not in a:
+                continue
+            labels, out[key] = _merge_grouped(a[f"{prefix}_labels"], a[key],
+                                              b[f"{prefix}_labels"], b[key])
+        out[f"{prefix}_labels"] = labels
+    for key in ("month_cnt", "month_delayed", "delay_hist"):
+        out[key] = np.asarray(a[key]) + np.asarray(b[key])
+
+    ma, mb = np.asarray(a["moment_mean"]), np.asarray(b["moment_mean"])
+    delta = mb - ma
+    out["moment_mean"] = ma + delta * (nb / n)
+    out["moment_c"] = (np.asarray(a["moment_c"]) + np.asarray(b["moment_c"])
+                       + np.outer(delta, delta) * (na * nb / n))
+    return out
+
+
+@contextlib.contextmanager
+def _locked(path):
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / ".lock", "w") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+
+def update(df, path=AGG_DIR, source=""):
+    """Fold a batch of new shipments into the store at `path`.
+
+    Creates the store if it does not exist yet.  Concurrent updates are
+    serialized with a lock file.  Returns the new meta.
+    """
+    path = Path(path)
+    batch = compute(df)
+    with _locked(path):
+        if (path / "meta.json").exists():
+            batch = merge(load(path, mmap=False)[0], batch)
+        return save(batch, path, source=source)
+
+
+# ─── store I/O ───────────────────────────────────────────────────────────────
+def save(store, path=AGG_DIR, source=""):
+    """Write the store; each file is replaced atomically, meta.json last."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    meta_file = path / "meta.json"
+    version = 0
+    if meta_file.exists():
+        version = json.loads(meta_file.read_text()).get("version", 0)
+    for name, arr in store.items():
+        tmp = path / f".{name}.npy.tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.asarray(arr), allow_pickle=False)
+        os.replace(tmp, path / f"{name}.npy")
+    meta = {"version": version + 1, "rows": int(store["n"]),
+            "built_at": time.time(), "source": str(source),
+            "arrays": sorted(store)}
+    tmp = path / ".meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, meta_file)
+    return meta
+
+
+def load(path=AGG_DIR, mmap=True):
+    """Memory-map every array of the store; returns (store, meta)."""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    mode = "r" if mmap else None
+    store = {name: np.load(path / f"{name}.npy", mmap_mode=mode,
+                           allow_pickle=False)
+             for name in meta["arrays"]}
+    return store, meta
+
+
+# ─── dashboard view ──────────────────────────────────────────────────────────
+def ranked_means(labels, sums, cnts):
+    """Labels and mean delays (2 dp), highest mean first."""
+    labels = list(labels)
+    cnt = np.asarray(cnts, dtype=np.float64)
+    means = np.divide(sums, cnt, out=np.zeros_like(cnt), where=cnt > 0)
+    order = np.argsort(-means, kind="stable")
+    return [labels[i] for i in order], [round(float(means[i]), 2) for i in order]
+
+
+def correlations(store):
+    """Pearson r of each CORR_COLUMNS feature with Delay_Days."""
+    c = np.asarray(store["moment_c"])
+    var = np.diag(c)
+    denom = np.sqrt(var[:-1] * var[-1])
+    return np.divide(c[:-1, -1], denom, out=np.zeros_like(denom),
+                     where=denom > 0)
+
+
+def view(store):
+    """The literal lists app.py used to hard-code, derived from the store."""
+    n = int(store["n"])
+    delayed = int(store["delayed"])
+    month_cnt = np.asarray(store["month_cnt"])
+    month_dly = np.divide(100.0 * np.asarray(store["month_delayed"]), month_cnt,
+                          out=np.zeros(12), where=month_cnt > 0)
+
+    corr = correlations(store)
+    corr_names = list(CORR_COLUMNS.values())[:-1]
+    order = np.argsort(-np.abs(corr), kind="stable")
+
+    events = store["disrupt_labels"].tolist()
+    counts = np.asarray(store["disrupt_cnt"]).tolist()
+    pairs = sorted(zip(events, counts), key=lambda p: (p[0] == NO_EVENT, -p[1]))
+
+    v = {
+        "N":              n,
+        "DELAYED":        delayed,
+        "DELAY_RATE":     delayed / n if n else 0.0,
+        "AVG_DELAY":      float(store["delay_sum"]) / n if n else 0.0,
+        "MAX_DELAY":      float(store["delay_max"]),
+        "VOL":            month_cnt.tolist(),
+        "DLY":            [int(round(x)) for x in month_dly],
+        "DELAY_CNTS":     np.asarray(store["delay_hist"]).tolist(),
+        "CORR_NAMES":     [corr_names[i] for i in order],
+        "CORR_VALS":      [round(float(corr[i]), 2) for i in order],
+        "DISRUPT_LABELS": [p[0] for p in pairs],
+        "DISRUPT_CNTS":   [int(p[1]) for p in pairs],
+    }
+    for prefix in GROUPS:
+        key = prefix.upper()
+        v[f"{key}_LABELS"], v[f"{key}_DELAYS"] = ranked_means(
+            store[f"{prefix}_labels"].tolist(), store[f"{prefix}_sum"],
+            store[f"{prefix}_cnt"])
+    return v
+
+
+def load_view(path=AGG_DIR):
+    """view() of the store at `path`, cached per process until it is rebuilt.
+
+    Returns None when no store has been built yet.
+    """
+    meta_file = Path(path) / "meta.json"
+    if not meta_file.exists():
+        return None
+    return cached(meta_file, lambda f: view(load(Path(f).parent)[0])).obj
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.aggregates",
+        description="Build the dashboard aggregate store from shipment data.")
+    ap.add_argument("data", help="raw shipments CSV or column store")
+    ap.add_argument("--out", default=str(AGG_DIR))
+    ap.add_argument("--update", action="store_true",
+                    help="merge the file into the existing store")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    df = dataset.read(args.data, USECOLS)
+    if args.update:
+        meta = update(df, args.out, source=args.data)
+    else:
+        meta = save(compute(df), args.out, source=args.data)
+    print(f"aggregated {len(df):,} shipments ({meta['rows']:,} total) in "
+          f"{time.perf_counter() - t0:.2f} s -> {args.out} "
+          f"(version {meta['version']})")
+
+
+if __name__ == "__main__":
+    main()
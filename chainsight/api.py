@@ -0,0 +1,183 @@
+"""
+Headless HTTP API for the Risk Predictor.
+
+Exposes the same scoring as the dashboard page — delay probability, risk
+level and factor breakdown — for systems that cannot click a button:
+
+    python -m chainsight.api --port 8600
+
+    POST /score          one shipment object          -> one assessment
+    POST /score/batch    {"shipments": [...]}          -> {"results": [...]}
+    POST /score/approx   one shipment object          -> probability and risk
+                         level from the lane risk table (chainsight.risktable)
+    GET  /health         model file version and load time
+
+Both POST routes accept ?factors=0 to skip the factor breakdown, which
+costs several times more than the probability.
+
+The app is ASGI (Starlette on uvicorn).  Scoring runs in the worker thread
+pool so the event loop keeps accepting connections, and the model comes from
+chainsight.serving, so it is loaded once per process and hot-reloaded when
+chainsight_model.pkl is replaced, exactly as in the dashboard.  Concurrent
+single-shipment requests are coalesced into one predict call by a
+chainsight.microbatch.MicroBatcher (--max-wait-ms / --max-batch); repeats
+of a shipment already scored by the current model are answered from the
+prediction cache without reaching it.  Factor breakdowns are batched the
+same way by a second MicroBatcher in front of serving.explain.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from . import drift, scoring, serving
+from .microbatch import MicroBatcher
+
+MAX_BATCH = 10_000
+
+
+def _error(status, message):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def _body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def health(request):
+    loaded = serving.get_scorer()
+    return JSONResponse({
+        "status": "ok",
+        "model": loaded.path,
+        "model_version": list(loaded.version),
+        "loaded_at": loaded.loaded_at,
+        "load_seconds": round(loaded.load_seconds, 4),
+        "batches": batcher.batches,
+        "mean_batch": round(batcher.mean_batch, 2),
+        "prediction_cache": serving.predictions.stats(),
+    })
+
+
+def _want_factors(request):
+    return request.query_params.get("factors", "1").lower() not in (
+        "0", "false", "no")
+
+
+async def score(request):
+    shipment = await _body(request)
+    if not isinstance(shipment, dict):
+        return _error(400, "expected a JSON object describing one shipment")
+    try:
+        row = scoring.encode(shipment)
+    except ValueError as exc:
+        return _error(422, str(exc))
+    drift.record([row])
+    version = serving.model_version()
+    prob, = serving.predictions.get_many([row], version)
+    contrib = (asyncio.ensure_future(explainer.submit(row))
+               if _want_factors(request) else None)
+    if prob is None:
+        prob = await batcher.submit(row)
+        serving.predictions.put_many([row], [prob], version)
+    if contrib is not None:
+        contrib = await contrib
+    return JSONResponse(scoring.result(prob, contrib))
+
+
+async def score_batch(request):
+    body = await _body(request)
+    shipments = body.get("shipments") if isinstance(body, dict) else None
+    if not isinstance(shipments, list) or not all(
+            isinstance(s, dict) for s in shipments):
+        return _error(400, 'expected {"shipments": [<shipment>, ...]}')
+    if len(shipments) > MAX_BATCH:
+        return _error(413, f"at most {MAX_BATCH:,} shipments per request")
+    try:
+        results = await run_in_threadpool(scoring.assess_many, shipments,
+                                          _want_factors(request))
+    except ValueError as exc:
+        return _error(422, str(exc))
+    return JSONResponse({"results": results})
+
+
+async def score_approx(request):
+    shipment = await _body(request)
+    if not isinstance(shipment, dict):
+        return _error(400, "expected a JSON object describing one shipment")
+    table = serving.get_risk_table()
+    if table is None:
+        return _error(503, "no risk table for the current model; run "
+                           "python -m chainsight.risktable")
+    try:
+        row = scoring.encode(shipment)
+    except ValueError as exc:
+        return _error(422, str(exc))
+    drift.record([row])
+    prob = table.obj.predict_row(row)
+    if prob != prob:
+        return _error(422, "shipment is outside the risk table's lanes")
+    return JSONResponse(dict(scoring.result(prob), approximate=True))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    serving.get_scorer()                # load before the first request
+    serving.get_explainer()
+    batcher.start()
+    explainer.start()
+    yield
+    await batcher.stop()
+    await explainer.stop()
+
+
+batcher = MicroBatcher()
+explainer = MicroBatcher(predict=serving.explain)
+
+
+app = Starlette(routes=[
+    Route("/health", health, methods=["GET"]),
+    Route("/score", score, methods=["POST"]),
+    Route("/score/batch", score_batch, methods=["POST"]),
+    Route("/score/approx", score_approx, methods=["POST"]),
+], lifespan=lifespan)
+
+
+def main(argv=None):
+    import uvicorn
+
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.api",
+        description="Serve the Risk Predictor as a JSON HTTP API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    ap.add_argument("--workers", type=int, default=1,
+                    help="server processes (each holds its own model copy)")
+    ap.add_argument("--max-wait-ms", type=float,
+                    help="longest a request waits for others to batch with")
+    ap.add_argument("--max-batch", type=int,
+                    help="most single-shipment requests scored together")
+    args = ap.parse_args(argv)
+    if args.max_wait_ms is not None:
+        batcher.max_wait = explainer.max_wait = args.max_wait_ms / 1e3
+        os.environ["CHAINSIGHT_BATCH_WAIT_MS"] = str(args.max_wait_ms)
+    if args.max_batch is not None:
+        batcher.max_batch = explainer.max_batch = max(args.max_batch, 1)
+        os.environ["CHAINSIGHT_BATCH_MAX_ROWS"] = str(args.max_batch)
+    # Worker processes re-import the module and read the settings from the
+    # environment; a single server runs this module's app directly.
+    target = "chainsight.api:app" if args.workers > 1 else app
+    uvicorn.run(target, host=args.host, port=args.port,
+                workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
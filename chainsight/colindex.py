@@ -0,0 +1,173 @@
+"""
+In-memory columnar index of the shipment table for Overview cross-filtering.
+
+Each sliceable column is dictionary-encoded to small integer codes and gets
+one row bitmap per category; order month and the delay flag get bitmaps too,
+and Delay_Days is stored bit-sliced (one bitmap per bit of the value).  A
+filter combination is an AND of bitmaps, counts are popcounts of further
+ANDs, and delay sums are popcounts of the slices weighted by 2**bit, so
+re-aggregating never touches individual rows.
+
+Charts follow the usual cross-filter convention: a chart is filtered by the
+selections made on the *other* charts, so the clicked chart keeps showing all
+of its bars.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from . import dataset
+from .aggregates import GROUPS, ranked_means
+from .config import DATASET_PATH, DATASET_STORE
+from .filecache import cached
+
+USECOLS = ["Order_Month", "Delay_Days"] + list(GROUPS.values())
+
+_POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _pack(bits):
+    """Pack booleans along the last axis into uint64 words (zero padded)."""
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    pad = (-packed.shape[-1]) % 8
+    if pad:
+        packed = np.pad(packed, [(0, 0)] * (packed.ndim - 1) + [(0, pad)])
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def _popcount(words):
+    """Set bits along the last axis."""
+    if hasattr(np, "bitwise_count"):                    # NumPy >= 2.0
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _POP8[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class ShipmentIndex:
+
+    def __init__(self, codes, labels, delay, month):
+        """`codes[dim]` index into `labels[dim]`; `month` is 0..11 (-1 when
+        unknown); `delay` is Delay_Days per row, rounded to whole days."""
+        self.n = len(delay)
+        self.labels = {dim: list(vals) for dim, vals in labels.items()}
+        self.codes = {dim: np.asarray(c, dtype=np.min_scalar_type(
+                          max(len(labels[dim]) - 1, 0)))
+                      for dim, c in codes.items()}
+        self._pos = {dim: {v: i for i, v in enumerate(vals)}
+                     for dim, vals in self.labels.items()}
+        self.bitmaps = {dim: _pack(self.codes[dim][None, :] == np.arange(
+                                   len(self.labels[dim]))[:, None])
+                        for dim in self.codes}
+
+        month = np.asarray(month)
+        self.month_bitmaps = _pack(month[None, :] == np.arange(12)[:, None])
+
+        delay = np.clip(np.rint(np.asarray(delay, dtype=np.float64)),
+                        0, None).astype(np.int64)
+        nbits = max(int(delay.max()).bit_length() if self.n else 0, 1)
+        self.delay_slices = _pack(
+            (delay[None, :] >> np.arange(nbits)[:, None]) & 1 == 1)
+        self.late = np.bitwise_or.reduce(self.delay_slices, axis=0)
+        self.all = _pack(np.ones(self.n, dtype=bool))
+
+    @classmethod
+    def from_frame(cls, df):
+        import pandas as pd
+
+        codes, labels = {}, {}
+        for dim, col in GROUPS.items():
+            codes[dim], labels[dim] = pd.factorize(df[col], sort=True)
+        if "Order_Month" in df:
+            month = df["Order_Month"]
+        else:
+            month = pd.to_datetime(df["Order_Date"], errors="coerce").dt.month
+        month = month.fillna(0).to_numpy(dtype=np.int64) - 1
+        return cls(codes, labels, df["Delay_Days"].to_numpy(), month)
+
+    @classmethod
+    def from_store(cls, store):
+        """From a chainsight.dataset ColumnStore, reusing its codes."""
+        codes = {dim: store.array(col) for dim, col in GROUPS.items()}
+        labels = {dim: store.labels(col).tolist() for dim, col in GROUPS.items()}
+        month = np.nan_to_num(store.array("Order_Month").astype(np.float64))
+        return cls(codes, labels, store.array("Delay_Days"),
+                   month.astype(np.int64) - 1)
+
+    # ─── bitmap arithmetic ───────────────────────────────────────────────────
+    def mask(self, filters, skip=None):
+        """Bitmap of rows matching `filters` ({dim: label}), ignoring the
+        `skip` dimension."""
+        m = self.all
+        for dim, label in filters.items():
+            if dim == skip or label is None:
+                continue
+            code = self._pos[dim].get(label)
+            if code is None:
+                return np.zeros_like(self.all)
+            m = m & self.bitmaps[dim][code]
+        return m
+
+    def _delay_sum(self, masks):
+        """Sum of Delay_Days under each mask (masks: (..., words))."""
+        weights = 1 << np.arange(len(self.delay_slices), dtype=np.int64)
+        counts = _popcount(masks[..., None, :] & self.delay_slices)
+        return counts @ weights
+
+    def _delay_max(self, m):
+        best = 0
+        for bit in range(len(self.delay_slices) - 1, -1, -1):
+            narrowed = m & self.delay_slices[bit]
+            if narrowed.any():
+                m, best = narrowed, best | (1 << bit)
+        return best
+
+    # ─── slicing ─────────────────────────────────────────────────────────────
+    def crossfilter(self, filters):
+        """Re-aggregate the Overview for `filters`.
+
+        Returns a dict with the same keys as aggregates.view() for the KPIs,
+        monthly trend and per-dimension bars.
+        """
+        m = self.mask(filters)
+        n = int(_popcount(m))
+        delayed = int(_popcount(m & self.late))
+        by_month = m & self.month_bitmaps
+        vol = _popcount(by_month)
+        dly = _popcount(by_month & self.late)
+        v = {
+            "N":          n,
+            "DELAYED":    delayed,
+            "DELAY_RATE": delayed / n if n else 0.0,
+            "AVG_DELAY":  float(self._delay_sum(m)) / n if n else 0.0,
+            "MAX_DELAY":  float(self._delay_max(m)),
+            "VOL":        vol.tolist(),
+            "DLY":        [int(round(x)) for x in
+                           np.divide(100.0 * dly, vol, out=np.zeros(12),
+                                     where=vol > 0)],
+        }
+        for dim, bitmaps in self.bitmaps.items():
+            cells = self.mask(filters, skip=dim) & bitmaps
+            key = dim.upper()
+            v[f"{key}_LABELS"], v[f"{key}_DELAYS"] = ranked_means(
+                self.labels[dim], self._delay_sum(cells), _popcount(cells))
+        return v
+
+
+def _read_index(path):
+    return ShipmentIndex.from_frame(dataset.read(path, USECOLS))
+
+
+def _store_index(meta_file):
+    return ShipmentIndex.from_store(dataset.ColumnStore(Path(meta_file).parent))
+
+
+def load_index(path=DATASET_PATH, store=DATASET_STORE):
+    """ShipmentIndex over the dataset, built once per process and rebuilt
+    when it changes: from the column store at `store` when there is one,
+    else from the CSV at `path`.  None when there is neither."""
+    try:
+        if dataset.is_store(store):
+            return cached(Path(store) / "meta.json", _store_index).obj
+        return cached(path, _read_index).obj
+    except FileNotFoundError:
+        return None
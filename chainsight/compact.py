@@ -0,0 +1,343 @@
+"""
+Compact, optionally quantized and pruned, copy of the compiled model.
+
+Every Streamlit or API worker holds its own copy of the model.  CompactEnsemble
+keeps the node arrays of chainsight.trees in the smallest types that still
+score the same way:
+
+  * thresholds as uint16 codes into a float32 table of the distinct split
+    values (hist-built boosters reuse a few hundred bin edges), so splits
+    are exact — a float16 threshold would move rows across splits;
+  * split features and child ids in the smallest unsigned integer type;
+  * leaf values as float32, float16 or int8 with a per-tree scale
+    (--leaf-bits 32/16/8);
+  * node cover (for chainsight.explain) as float16, relative to the root;
+  * optionally without the lowest-gain trees (--prune 0.1 drops 10%).
+
+The report compares the pickle, the float32 compiled file and each variant
+on array size, resident memory of a fresh worker, largest and mean
+probability change and, with --data, test ROC-AUC on the notebook's split:
+
+    python -m chainsight.compact --report --data global_supply_chain_disruption_v1.csv
+    python -m chainsight.compact --leaf-bits 8        # writes chainsight_trees.npz
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .config import MODEL_PATH, ROOT, TREES_PATH
+from .trees import (BLOCK_ROWS, TreeEnsemble, compile_model, compiled_path,
+                    file_digest, probe_rows)
+
+LEAF_BITS = (32, 16, 8)
+PRUNE_LEVELS = (0.1, 0.25, 0.5)
+
+
+def _uint(n):
+    """Smallest unsigned dtype holding 0..n-1."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.int64
+
+
+class CompactEnsemble:
+
+    def __init__(self, feature, thr_code, thresholds, children, default_left,
+                 value, leaf_scale, roots, depth, base_margin, leaf_bits=32,
+                 source_digest="", tree_gain=None, cover=None,
+                 n_features=None):
+        self.feature = np.ascontiguousarray(feature)
+        self.thr_code = np.ascontiguousarray(thr_code)
+        self.thresholds = np.ascontiguousarray(thresholds, dtype=np.float32)
+        self.children = np.ascontiguousarray(children)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value)
+        self.leaf_scale = np.ascontiguousarray(leaf_scale, dtype=np.float32)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.base_margin = float(base_margin)
+        self.leaf_bits = int(leaf_bits)
+        self.source_digest = str(source_digest)
+        self.tree_gain = (np.zeros(len(self.roots)) if tree_gain is None
+                          else np.asarray(tree_gain, dtype=np.float64))
+        self.cover = (np.ones(len(self.value), dtype=np.float16)
+                      if cover is None
+                      else np.ascontiguousarray(cover, dtype=np.float16))
+        self.n_features = int(self.feature.max() + 1 if n_features is None
+                              else n_features)
+
+    # ─── construction ────────────────────────────────────────────────────────
+    @classmethod
+    def from_ensemble(cls, ens, leaf_bits=32, prune=0.0):
+        """Compact copy of a TreeEnsemble, without the `prune` fraction of
+        trees with the least total split gain.  Each dropped tree's expected
+        value is folded into the base margin, so pruning removes its
+        variation but not its bias."""
+        if leaf_bits not in LEAF_BITS:
+            raise ValueError(f"leaf_bits must be one of {LEAF_BITS}")
+        if not 0 <= prune < 1:
+            raise ValueError("prune must be in [0, 1)")
+        bounds = np.append(ens.roots, len(ens.value))
+        n_drop = int(round(prune * ens.n_trees))
+        order = np.argsort(ens.tree_gain, kind="stable")
+        keep = np.sort(order[n_drop:])
+        base_margin = ens.base_margin + float(
+            ens.expected_value()[order[:n_drop]].sum())
+
+        # Renumber the nodes of the kept trees contiguously.
+        sizes = bounds[keep + 1] - bounds[keep]
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        old = np.concatenate([np.arange(bounds[t], bounds[t + 1]) for t in keep])
+        shift = np.repeat(roots - bounds[keep], sizes)
+        left, right = ens.left[old] + shift, ens.right[old] + shift
+
+        internal = left != old + shift
+        thresholds, thr_code = np.unique(
+            np.where(internal, ens.threshold[old], 0), return_inverse=True)
+        value = ens.value[old]
+        tree_of = np.repeat(np.arange(len(keep)), sizes)
+        cover = ens.cover[old] / ens.cover[bounds[keep]][tree_of]
+        leaf_scale = np.ones(len(keep), dtype=np.float32)
+        if leaf_bits == 8:
+            peak = np.maximum.reduceat(np.abs(value), roots)
+            leaf_scale = np.where(peak > 0, peak / 127, 1).astype(np.float32)
+            value = np.rint(value / leaf_scale[tree_of]).astype(np.int8)
+        elif leaf_bits == 16:
+            value = value.astype(np.float16)
+
+        node_type = _uint(len(old))
+        return cls(feature=ens.feature[old].astype(_uint(ens.feature.max() + 1)),
+                   thr_code=thr_code.astype(_uint(len(thresholds))),
+                   thresholds=thresholds,
+                   children=np.column_stack([right, left]).ravel()
+                   .astype(node_type),
+                   default_left=ens.default_left[old], value=value,
+                   leaf_scale=leaf_scale, roots=roots, depth=ens.depth,
+                   base_margin=base_margin, leaf_bits=leaf_bits,
+                   source_digest=ens.source_digest,
+                   tree_gain=ens.tree_gain[keep], cover=cover,
+                   n_features=ens.n_features)
+
+    def to_ensemble(self):
+        """The equivalent float32 TreeEnsemble."""
+        node = np.arange(len(self.value))
+        tree_of = np.searchsorted(self.roots, node, side="right") - 1
+        children = self.children.astype(np.int32).reshape(-1, 2)
+        value = self.value.astype(np.float32)
+        if self.leaf_bits == 8:
+            value = value * self.leaf_scale[tree_of]
+        return TreeEnsemble(feature=self.feature,
+                            threshold=self.thresholds[self.thr_code],
+                            left=children[:, 1], right=children[:, 0],
+                            default_left=self.default_left, value=value,
+                            roots=self.roots, depth=self.depth,
+                            base_margin=self.base_margin,
+                            source_digest=self.source_digest,
+                            tree_gain=self.tree_gain, cover=self.cover,
+                            n_features=self.n_features)
+
+    # ─── persistence ─────────────────────────────────────────────────────────
+    def save(self, path=TREES_PATH):
+        """Write the arrays; the file is replaced atomically."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "wb") as fh:
+            np.savez(fh, feature=self.feature, thr_code=self.thr_code,
+                     thresholds=self.thresholds, children=self.children,
+                     default_left=self.default_left, value=self.value,
+                     leaf_scale=self.leaf_scale, roots=self.roots,
+                     depth=self.depth, base_margin=self.base_margin,
+                     leaf_bits=self.leaf_bits,
+                     source_digest=self.source_digest,
+                     tree_gain=self.tree_gain, cover=self.cover,
+                     n_features=self.n_features)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=TREES_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(**{k: npz[k] for k in npz.files})
+
+    # ─── evaluation ──────────────────────────────────────────────────────────
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        """Memory held by the node arrays."""
+        return sum(a.nbytes for a in (self.feature, self.thr_code,
+                                      self.thresholds, self.children,
+                                      self.default_left, self.value,
+                                      self.leaf_scale, self.cover,
+                                      self.roots))
+
+    def leaves(self, X):
+        """Leaf node id reached by every row in every tree, shape (n, trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        flat = X.ravel()
+        row_start = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        missing = bool(np.isnan(flat).any())
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.depth):
+            x = flat[row_start + self.feature[node]]
+            go_left = x < self.thresholds[self.thr_code[node]]
+            if missing:
+                go_left |= np.isnan(x) & self.default_left[node]
+            # int32 so 2 * node cannot wrap in the narrow child dtype
+            node = self.children[np.multiply(node, 2, dtype=np.int32) + go_left]
+        return node
+
+    def margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        out = np.empty(len(X))
+        for i in range(0, len(X), BLOCK_ROWS):
+            leaf = self.value[self.leaves(X[i:i + BLOCK_ROWS])]
+            if self.leaf_bits == 8:
+                leaf = leaf * self.leaf_scale
+            out[i:i + BLOCK_ROWS] = leaf.sum(axis=1, dtype=np.float64)
+        return out + self.base_margin
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities, like XGBClassifier.predict_proba."""
+        p = 1.0 / (1.0 + np.exp(-self.margin(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+# ─── report ──────────────────────────────────────────────────────────────────
+_RSS_PROBE = """
+import sys
+import numpy as np
+from chainsight import filecache, trees
+path, n_features = sys.argv[1], int(sys.argv[2])
+before = filecache._rss_bytes()
+if path.endswith(".npz"):
+    model = trees.load(path)
+else:
+    import joblib
+    model = joblib.load(path)
+model.predict_proba(np.zeros((1, n_features), dtype=np.float32))
+print(filecache._rss_bytes() - before)
+"""
+
+
+def worker_rss(path, n_features):
+    """RSS a fresh process gains by loading `path` and scoring one row."""
+    out = subprocess.run([sys.executable, "-c", _RSS_PROBE, str(path),
+                          str(n_features)], cwd=ROOT, check=True,
+                         capture_output=True, text=True)
+    return int(out.stdout.split()[-1])
+
+
+def variants(ens):
+    """(label, ensemble) for the float32 file and each compact variant."""
+    out = [("compiled float32", ens)]
+    for bits in LEAF_BITS:
+        out.append((f"compact, {bits}-bit leaves",
+                    CompactEnsemble.from_ensemble(ens, bits)))
+    for frac in PRUNE_LEVELS:
+        out.append((f"8-bit, prune {frac:.0%}",
+                    CompactEnsemble.from_ensemble(ens, 8, frac)))
+    return out
+
+
+def report(model_path=MODEL_PATH, data=None, probe=20_000):
+    """One dict per variant: trees, bytes, worker RSS, max/mean |Δp| and, with
+    `data`, test accuracy and ROC-AUC."""
+    import joblib
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    model = joblib.load(model_path)
+    ens = TreeEnsemble.from_model(model)
+    ens.source_digest = file_digest(model_path)
+    n_features = model.n_features_in_
+    X_probe = probe_rows(ens, n_features, probe)
+    p_probe = model.predict_proba(X_probe)[:, 1]
+    if data is not None:
+        from . import serving
+        from .training import load_xy, split
+        _, X, y = load_xy(data, pre=serving.get_preprocessor())
+        _, x_test, _, y_test = split(X, y)
+
+    def scores(m):
+        if data is None:
+            return {}
+        prob = m.predict_proba(x_test)[:, 1]
+        return {"accuracy": float(accuracy_score(y_test, prob > 0.5)),
+                "auc": float(roc_auc_score(y_test, prob))}
+
+    rows = [{"variant": "xgboost pickle", "trees": ens.n_trees,
+             "bytes": os.path.getsize(model_path),
+             "rss": worker_rss(model_path, n_features), "max_diff": 0.0,
+             "mean_diff": 0.0, **scores(model)}]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (label, m) in enumerate(variants(ens)):
+            path = Path(tmp) / f"v{i}.npz"
+            m.save(path)
+            diff = np.abs(m.predict_proba(X_probe)[:, 1] - p_probe)
+            rows.append({"variant": label, "trees": m.n_trees,
+                         "bytes": m.nbytes, "rss": worker_rss(path, n_features),
+                         "max_diff": float(diff.max()),
+                         "mean_diff": float(diff.mean()), **scores(m)})
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.compact",
+        description="Write a compact copy of the compiled model, or compare "
+                    "the variants.")
+    ap.add_argument("--model", default=str(MODEL_PATH))
+    ap.add_argument("--report", action="store_true",
+                    help="compare size and accuracy of every variant")
+    ap.add_argument("--data", help="raw shipments CSV for test ROC-AUC")
+    ap.add_argument("--leaf-bits", type=int, choices=LEAF_BITS, default=8)
+    ap.add_argument("--prune", type=float, default=0.0,
+                    help="fraction of lowest-gain trees to drop")
+    ap.add_argument("--max-diff", type=float, default=0.01,
+                    help="refuse to write a variant whose probabilities move "
+                         "more than this on the probe rows")
+    ap.add_argument("--out", help="default: chainsight_trees.npz next to the model")
+    args = ap.parse_args(argv)
+
+    if args.report:
+        rows = report(args.model, args.data)
+        print(f"{'variant':<24} {'trees':>5} {'KB':>8} {'worker MB':>10} "
+              f"{'max |dp|':>9} {'mean |dp|':>9} {'acc':>7} {'auc':>7}")
+        for r in rows:
+            print(f"{r['variant']:<24} {r['trees']:>5} {r['bytes'] / 1024:>8.1f} "
+                  f"{r['rss'] / 2**20:>10.1f} {r['max_diff']:>9.1e} "
+                  f"{r['mean_diff']:>9.1e} "
+                  f"{r.get('accuracy', float('nan')):>7.4f} "
+                  f"{r.get('auc', float('nan')):>7.4f}")
+        return
+
+    out = args.out or compiled_path(args.model)
+    with tempfile.TemporaryDirectory() as tmp:
+        ens, model = compile_model(args.model, Path(tmp) / "trees.npz")
+    compact = CompactEnsemble.from_ensemble(ens, args.leaf_bits, args.prune)
+    X = probe_rows(ens, model.n_features_in_, 20_000)
+    diff = float(np.abs(compact.predict_proba(X)[:, 1]
+                        - model.predict_proba(X)[:, 1]).max())
+    if diff > args.max_diff:
+        raise SystemExit(f"variant moves probabilities by up to {diff:.2e} "
+                         f"(limit {args.max_diff:.0e}); nothing written")
+    compact.save(out)
+    print(f"{compact.n_trees} trees, {compact.nbytes / 1024:.1f} KB "
+          f"(float32: {ens.nbytes / 1024:.1f} KB); max |diff| {diff:.1e} "
+          f"-> {out}")
+
+
+if __name__ == "__main__":
+    main()
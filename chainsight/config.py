@@ -0,0 +1,77 @@
+"""
+Filesystem locations shared by the dashboard, the CLIs and the offline jobs.
+Each one can be overridden through an environment variable so containers can
+mount models and data outside the repo.
+"""
+
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODEL_PATH = Path(os.environ.get("CHAINSIGHT_MODEL",
+                                 ROOT / "chainsight_model.pkl"))
+PREPROCESS_PATH = Path(os.environ.get("CHAINSIGHT_PREPROCESS",
+                                      MODEL_PATH.with_name("chainsight_preprocess.npz")))
+
+# The same model compiled to NumPy arrays by `python -m chainsight.trees`.
+TREES_PATH = Path(os.environ.get("CHAINSIGHT_TREES",
+                                 MODEL_PATH.with_name("chainsight_trees.npz")))
+# Batches up to this size use the compiled trees; larger ones go to xgboost,
+# whose multithreaded predictor wins once the per-call overhead is amortized.
+COMPILED_MAX_ROWS = int(os.environ.get("CHAINSIGHT_COMPILED_MAX_ROWS", 8))
+
+# Approximate risk per lane and binned lead time / risk indices, precomputed
+# from the same model by `python -m chainsight.risktable`.
+RISK_TABLE_PATH = Path(os.environ.get(
+    "CHAINSIGHT_RISK_TABLE", MODEL_PATH.with_name("chainsight_risktable.npz")))
+
+# One JSON line per `python -m chainsight.retrain` run: mode, rows, holdout
+# AUCs and wall time per stage.
+RETRAIN_LOG = Path(os.environ.get("CHAINSIGHT_RETRAIN_LOG",
+                                  MODEL_PATH.with_name("retrain_log.jsonl")))
+
+# Model Comparison results written by `python -m chainsight.modelbench`.
+MODEL_RESULTS_PATH = Path(os.environ.get("CHAINSIGHT_MODEL_RESULTS",
+                                         ROOT / "model_results.json"))
+
+# Dashboard aggregate store written by `python -m chainsight.aggregates`.
+AGG_DIR = Path(os.environ.get("CHAINSIGHT_AGGREGATES",
+                              ROOT / "chainsight_aggregates"))
+
+# Server-side shipment files the dashboard may stream-score; outputs are
+# written to its "scored" subdirectory.
+DATA_DIR = Path(os.environ.get("CHAINSIGHT_DATA_DIR", ROOT / "data"))
+
+# Row-level shipment table used for interactive slicing.
+DATASET_PATH = Path(os.environ.get(
+    "CHAINSIGHT_DATASET", DATA_DIR / "global_supply_chain_disruption_v1.csv"))
+# The same table converted by `python -m chainsight.dataset`; preferred over
+# the CSV when present.
+DATASET_STORE = Path(os.environ.get("CHAINSIGHT_DATASET_STORE",
+                                    DATA_DIR / "shipments"))
+
+# Online request coalescing in the scoring API (chainsight.microbatch): how
+# long the first request of a batch may wait, and the largest batch scored.
+BATCH_WAIT_MS = float(os.environ.get("CHAINSIGHT_BATCH_WAIT_MS", 2.0))
+BATCH_MAX_ROWS = int(os.environ.get("CHAINSIGHT_BATCH_MAX_ROWS", 256))
+
+# Prediction cache in front of the model (chainsight.predcache): entries kept
+# and their lifetime in seconds.
+PREDICTION_CACHE_SIZE = int(os.environ.get("CHAINSIGHT_PREDICTION_CACHE", 65536))
+PREDICTION_CACHE_TTL = float(os.environ.get("CHAINSIGHT_PREDICTION_TTL", 3600))
+
+# Training-time distributions of the scored features, written by
+# `python -m chainsight.drift <dataset>`, the directory where every
+# scoring process writes its live sketch for the Drift Monitor page, and the
+# age in seconds past which a sketch there is left out and deleted (its
+# process has exited, or scored nothing for that long).
+DRIFT_REFERENCE_PATH = Path(os.environ.get(
+    "CHAINSIGHT_DRIFT_REFERENCE",
+    MODEL_PATH.with_name("chainsight_drift_reference.json")))
+DRIFT_DIR = os.environ.get("CHAINSIGHT_DRIFT_DIR")
+DRIFT_MAX_AGE = float(os.environ.get("CHAINSIGHT_DRIFT_MAX_AGE", 3600))
+
+# Dashboard latency histograms (chainsight.perf) in the Prometheus text
+# format, rewritten periodically for node_exporter's textfile collector.
+METRICS_FILE = os.environ.get("CHAINSIGHT_METRICS_FILE")
@@ -0,0 +1,368 @@
+"""
+Columnar on-disk copy of the shipment table.
+
+Parsing the raw CSV (and Order_Date in particular) dominates every job that
+reads it.  `ingest` converts it once, in fixed-size chunks, into a directory
+with one memory-mappable .npy file per column plus meta.json:
+
+  - text columns are dictionary-encoded: sorted labels in <col>.labels.npy
+    and the smallest signed integer codes in <col>.npy (-1 = missing);
+    near-unique text such as Order_ID is kept as fixed-width bytes instead;
+  - numeric columns get the narrowest type that holds them exactly (int8 up
+    to int64 when there are no missing values, else float32 or float64);
+  - Order_Date is stored as datetime64[D], with the model's date features
+    (DATE_COLS) precomputed next to it.
+
+Newly labeled shipments are added with `append` (--append), which rewrites
+the store with them at the end; meta.json lists each appended batch.
+
+read() gives the training, aggregation and dashboard loaders a DataFrame of
+just the columns they ask for, from a store or, unchanged, from a CSV:
+
+    python -m chainsight.dataset global_supply_chain_disruption_v1.csv
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .config import DATASET_STORE
+from .features import DATE_COLS
+
+DATE_COLUMN = "Order_Date"
+CHUNK_ROWS = 500_000
+SNIFF_ROWS = 10_000
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def date_columns(order_date):
+    """DATE_COLS derived from a raw Order_Date column, as the Preprocessor
+    derives them (NaN where the date does not parse)."""
+    import pandas as pd
+
+    dt = pd.to_datetime(order_date, errors="coerce").dt
+    return dict(zip(DATE_COLS, (dt.year, dt.month, dt.day, dt.dayofweek)))
+
+
+def _smallest_int(lo, hi):
+    return next(t for t in INT_TYPES
+                if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max)
+
+
+# ─── ingestion ───────────────────────────────────────────────────────────────
+def _kinds(sample):
+    """Storage kind of every column, judged from the first rows."""
+    kinds = {}
+    for col in sample.columns:
+        values = sample[col]
+        if col == DATE_COLUMN:
+            kinds[col] = "date"
+        elif values.dtype.kind in "biuf" and values.notna().any():
+            kinds[col] = "num"
+        elif values.nunique() > max(1000, len(values) // 2):
+            kinds[col] = "str"
+        else:
+            kinds[col] = "cat"
+    for col in DATE_COLS:
+        kinds.setdefault(col, "num")
+    return kinds
+
+
+class _Column:
+    """Chunks of one column written as part files, and what the final type
+    needs to know about them."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.parts = []
+        self.vocab = {}                     # cat: label -> first-seen id
+        self.width = 1                      # str: longest value in bytes
+        self.lo, self.hi = np.inf, -np.inf  # num: range of finite values
+        self.integral = self.f32 = True
+        self.missing = False
+
+    def add(self, values, tmp, name):
+        if self.kind == "cat":
+            local, uniques = values.factorize()
+            ids = np.array([self.vocab.setdefault(str(u), len(self.vocab))
+                            for u in uniques] + [-1], dtype=np.int32)
+            arr = ids[local]                # local -1 picks the trailing -1
+        elif self.kind == "str":
+            arr = np.char.encode(values.fillna("").to_numpy(dtype=str), "utf-8")
+            self.width = max(self.width, arr.dtype.itemsize)
+        elif self.kind == "date":
+            arr = values.to_numpy().astype("datetime64[D]")
+        else:
+            arr = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            finite = arr[np.isfinite(arr)]
+            self.missing |= len(finite) < len(arr)
+            if len(finite):
+                self.lo = min(self.lo, finite.min())
+                self.hi = max(self.hi, finite.max())
+                self.integral &= bool(np.all(finite == np.round(finite)))
+                self.f32 &= bool(np.all(finite.astype(np.float32) == finite))
+        path = tmp / f"{name}.{len(self.parts)}.part.npy"
+        np.save(path, arr, allow_pickle=False)
+        self.parts.append(path)
+
+    def finish(self, tmp, name, rows):
+        """Concatenate the parts into <name>.npy; returns the meta entry."""
+        labels, remap = None, None
+        if self.kind == "cat":
+            first_seen = np.array(list(self.vocab), dtype=str)
+            order = np.argsort(first_seen, kind="stable")
+            labels = first_seen[order]
+            remap = np.empty(len(order) + 1, dtype=np.int64)
+            remap[order] = np.arange(len(order))
+            remap[-1] = -1
+            dtype = _smallest_int(-1, len(labels) - 1)
+        elif self.kind == "str":
+            dtype = np.dtype(f"S{self.width}")
+        elif self.kind == "date":
+            dtype = np.dtype("datetime64[D]")
+        elif self.integral and not self.missing and self.lo <= self.hi:
+            dtype = _smallest_int(self.lo, self.hi)
+        else:
+            dtype = np.float32 if self.f32 else np.float64
+
+        out = np.lib.format.open_memmap(tmp / f"{name}.npy", mode="w+",
+                                        dtype=dtype, shape=(rows,))
+        start = 0
+        for part in self.parts:
+            arr = np.load(part, allow_pickle=False)
+            if remap is not None:
+                arr = remap[arr]
+            out[start:start + len(arr)] = arr
+            start += len(arr)
+            part.unlink()
+        out.flush()
+        del out
+        entry = {"kind": self.kind, "dtype": np.dtype(dtype).str}
+        if labels is not None:
+            np.save(tmp / f"{name}.labels.npy", labels, allow_pickle=False)
+            entry["labels"] = len(labels)
+        return entry
+
+
+def staging(out):
+    """Empty build directory next to the store at `out`; publish() it."""
+    out = Path(out)
+    tmp = out.with_name(f".{out.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    return tmp
+
+
+def publish(tmp, out, meta):
+    """Write meta.json into the build directory `tmp` and swap it in for
+    the store at `out`, so readers never see a partial store."""
+    out = Path(out)
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+    old = out.with_name(f".{out.name}.old")
+    if out.exists():
+        os.replace(out, old)
+    os.replace(tmp, out)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def ingest(src, out=DATASET_STORE, chunksize=CHUNK_ROWS, on_chunk=None,
+           kinds=None):
+    """Convert the CSV at `src` into a column store at `out`.
+
+    The store is built next to `out` and swapped in when complete.
+    `on_chunk(rows_done)` is called after every chunk.  `kinds` ({column:
+    kind}) overrides what would be judged from the first rows.  Returns the
+    meta.
+    """
+    import pandas as pd
+
+    tmp = staging(out)
+
+    kinds = kinds or _kinds(pd.read_csv(src, nrows=SNIFF_ROWS))
+    text = {col: str for col, kind in kinds.items()
+            if kind in ("cat", "str", "date") and col not in DATE_COLS}
+    columns = {col: _Column(kind) for col, kind in kinds.items()}
+    rows = 0
+    for chunk in pd.read_csv(src, chunksize=chunksize, dtype=text):
+        chunk[DATE_COLUMN] = pd.to_datetime(chunk[DATE_COLUMN], errors="coerce")
+        for col, values in date_columns(chunk[DATE_COLUMN]).items():
+            chunk[col] = values
+        for col, column in columns.items():
+            column.add(chunk[col], tmp, col)
+        rows += len(chunk)
+        if on_chunk is not None:
+            on_chunk(rows)
+
+    meta = {"rows": rows, "built_at": time.time(), "source": str(src),
+            "columns": {col: column.finish(tmp, col, rows)
+                        for col, column in columns.items()}}
+    publish(tmp, out, meta)
+    return meta
+
+
+def append(src, out=DATASET_STORE, chunksize=CHUNK_ROWS, on_chunk=None):
+    """Add the shipments in the CSV at `src` to the end of the store at `out`
+    (ingest() when there is none yet).
+
+    The new rows are ingested with the store's column kinds, then the store
+    is rewritten with them appended and swapped in: dictionary-encoded
+    columns get the sorted union of both label sets, other columns the wider
+    of the two types.  meta["batches"] records the first row of every
+    appended file.  Returns the meta.
+    """
+    if not is_store(out):
+        return ingest(src, out, chunksize, on_chunk)
+    out = Path(out)
+    old = ColumnStore(out)
+    new_path = out.with_name(f".{out.name}.new")
+    try:
+        ingest(src, new_path, chunksize, on_chunk,
+               kinds={col: old.kind(col) for col in old.columns})
+        new = ColumnStore(new_path)
+        if new.columns != old.columns:
+            raise ValueError(f"{src} does not have the store's columns")
+        tmp = staging(out)
+        rows = len(old) + len(new)
+        columns = {}
+        for col in old.columns:
+            entry = old.meta["columns"][col]
+            parts = [(old.array(col), None), (new.array(col), None)]
+            if entry["kind"] == "cat":
+                labels = np.union1d(old.labels(col), new.labels(col))
+                parts = [(arr, np.append(np.searchsorted(labels, store.labels(col)),
+                                         -1))    # code -1 maps to the last slot
+                         for (arr, _), store in zip(parts, (old, new))]
+                dtype = _smallest_int(-1, len(labels) - 1)
+                np.save(tmp / f"{col}.labels.npy", labels, allow_pickle=False)
+                entry = dict(entry, labels=len(labels))
+            else:
+                dtype = np.result_type(old.array(col).dtype,
+                                       new.array(col).dtype)
+            dest = np.lib.format.open_memmap(tmp / f"{col}.npy", mode="w+",
+                                             dtype=dtype, shape=(rows,))
+            start = 0
+            for arr, remap in parts:
+                for i in range(0, len(arr), chunksize):
+                    block = np.asarray(arr[i:i + chunksize])
+                    dest[start + i:start + i + len(block)] = (
+                        block if remap is None else remap[block])
+                start += len(arr)
+            dest.flush()
+            del dest
+            columns[col] = dict(entry, dtype=np.dtype(dtype).str)
+        meta = dict(old.meta, rows=rows, columns=columns,
+                    batches=old.meta.get("batches", []) + [
+                        {"start": len(old), "rows": len(new),
+                         "source": str(src), "added_at": time.time()}])
+        publish(tmp, out, meta)
+    finally:
+        shutil.rmtree(new_path, ignore_errors=True)
+    return meta
+
+
+# ─── reading ─────────────────────────────────────────────────────────────────
+class ColumnStore:
+
+    def __init__(self, path=DATASET_STORE):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.columns = list(self.meta["columns"])
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def kind(self, col):
+        return self.meta["columns"][col]["kind"]
+
+    def array(self, col):
+        """Memory-mapped values (codes for dictionary-encoded columns)."""
+        if col not in self.meta["columns"]:
+            raise KeyError(f"{col!r} is not in the store at {self.path}")
+        return np.load(self.path / f"{col}.npy", mmap_mode="r",
+                       allow_pickle=False)
+
+    def labels(self, col):
+        return np.load(self.path / f"{col}.labels.npy", allow_pickle=False)
+
+    def frame(self, columns=None, rows=None):
+        """DataFrame of `columns` (default: all) for `rows` (a slice or index
+        array; default: all); text columns come back as pandas Categoricals
+        over the stored codes, so no strings are built."""
+        import pandas as pd
+
+        data = {}
+        for col in columns or self.columns:
+            arr, kind = self.array(col), self.kind(col)
+            if rows is not None:
+                arr = arr[rows]
+            if kind == "cat":
+                data[col] = pd.Categorical.from_codes(np.asarray(arr),
+                                                      self.labels(col))
+            elif kind == "str":
+                data[col] = np.char.decode(arr, "utf-8")
+            else:
+                data[col] = np.asarray(arr)
+        return pd.DataFrame(data, copy=False)
+
+
+def is_store(path):
+    return (Path(path) / "meta.json").is_file()
+
+
+def read(source, columns=None, rows=None):
+    """Shipments DataFrame with `columns` (default: all) from a column store
+    or a CSV, for `rows` (a slice or index array; default: all).  DATE_COLS
+    can be asked of either; a CSV derives them from Order_Date."""
+    if is_store(source):
+        return ColumnStore(source).frame(columns, rows)
+
+    import pandas as pd
+
+    if rows is not None:
+        df = read(source, columns)
+        return df.iloc[rows].reset_index(drop=True)
+    if columns is None:
+        return pd.read_csv(source)
+    derived = [c for c in columns if c in DATE_COLS]
+    usecols = [c for c in columns if c not in DATE_COLS]
+    if derived and DATE_COLUMN not in usecols:
+        usecols.append(DATE_COLUMN)
+    df = pd.read_csv(source, usecols=usecols)
+    if derived:
+        parts = date_columns(df[DATE_COLUMN])
+        for col in derived:
+            df[col] = parts[col]
+    return df[list(columns)]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.dataset",
+        description="Convert the raw shipments CSV into the column store.")
+    ap.add_argument("src", help="raw shipments CSV (may be compressed)")
+    ap.add_argument("--out", default=str(DATASET_STORE))
+    ap.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--append", action="store_true",
+                    help="add the rows of src to the end of an existing store")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    meta = (append if args.append else ingest)(
+        args.src, args.out, args.chunksize,
+        on_chunk=lambda n: print(f"\r{n:,} rows", end="", flush=True))
+    elapsed = time.perf_counter() - t0
+    size = sum(f.stat().st_size for f in Path(args.out).iterdir())
+    print(f"\r{meta['rows']:,} rows, {len(meta['columns'])} columns in "
+          f"{elapsed:.2f} s -> {args.out} ({size / 2**20:.1f} MB)")
+    for col, entry in meta["columns"].items():
+        extra = f", {entry['labels']} labels" if "labels" in entry else ""
+        print(f"  {col:<26} {entry['kind']:<4} {entry['dtype']}{extra}")
+
+
+if __name__ == "__main__":
+    main()
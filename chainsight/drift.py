@@ -0,0 +1,459 @@
+"""
+Streaming sketches of the shipments sent for scoring, compared with the
+training data to catch input drift.
+
+The EDA page shows the training distributions as frozen figures; nothing
+says whether today's shipments still look like them.  Every live scoring
+path (the Risk Predictor, batch uploads and order-book rescoring, the HTTP
+API) passes the rows it encoded to record(), which adds them to `monitor`:
+
+  - each numeric feature in BOUNDS (the lead times and the two risk
+    indices) keeps counts over fixed bins, like chainsight.perf's latency
+    histograms, from which quantiles are interpolated;
+  - each categorical column keeps a count per label, with one slot for
+    values outside the model's vocabulary.
+
+Memory stays constant, a shipment costs a bisect or a dict increment per
+feature (about 5 µs; a batch is one bincount per column), and sketches over
+the same bins merge by adding counts.  With CHAINSIGHT_DRIFT_DIR set, each
+process writes its sketch there at most every EXPORT_EVERY seconds and the
+Drift Monitor page adds them up.  Sketches last written more than
+CHAINSIGHT_DRIFT_MAX_AGE seconds ago (an hour by default) are left out and
+deleted, so processes that exited long ago, or a pid reused by a new one,
+do not keep counting; a process that is still scoring writes its file again.
+
+The training side is the same sketch of the dataset, written once:
+
+    python -m chainsight.drift data/shipments
+
+compare() scores live against it with the population stability index (PSI,
+over PSI_BINS bins of equal training mass) and, for numeric features, the
+Kolmogorov–Smirnov distance read off the bins.
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+import numpy as np
+
+from .config import DRIFT_DIR, DRIFT_MAX_AGE, DRIFT_REFERENCE_PATH
+from .features import CAT_COLS
+
+
+def _steps(step, stop):
+    return tuple(round(step * i, 6) for i in range(1, round(stop / step) + 1))
+
+
+# Upper bounds of each numeric feature's bins ("le"); larger values land in a
+# last overflow bin.  Whole days get a bin each up to two months.
+_DAYS = tuple(range(0, 61)) + (70, 80, 90, 120, 180)
+BOUNDS = {
+    "Base_Lead_Time_Days":      _DAYS,
+    "Scheduled_Lead_Time_Days": _DAYS,
+    "Geopolitical_Risk_Index":  _steps(0.02, 1.0),
+    "Weather_Severity_Index":   _steps(0.2, 10.0),
+}
+UNKNOWN = "(unknown)"           # label outside the preprocessor's vocabulary
+
+PSI_BINS = 10
+PSI_FLOOR = 1e-4                # share assumed for a bin one side never saw
+PSI_WARN = 0.1                  # usual rule of thumb: < 0.1 stable,
+PSI_ALERT = 0.25                # 0.1–0.25 moderate shift, > 0.25 drift
+EXPORT_EVERY = 15.0
+
+
+class Bins:
+
+    __slots__ = ("bounds", "counts", "missing", "lo", "hi")
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)   # last is the overflow
+        self.missing = 0
+        self.lo = math.inf
+        self.hi = -math.inf
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        if value != value:
+            self.missing += 1
+            return
+        self.counts[bisect_left(self.bounds, value)] += 1
+        if value < self.lo:
+            self.lo = value
+        if value > self.hi:
+            self.hi = value
+
+    def observe_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        known = values[~np.isnan(values)]
+        self.missing += len(values) - len(known)
+        if len(known) == 0:
+            return
+        per_bin = np.bincount(np.searchsorted(self.bounds, known, side="left"),
+                              minlength=len(self.counts))
+        self.counts = [a + int(b) for a, b in zip(self.counts, per_bin)]
+        self.lo = min(self.lo, float(known.min()))
+        self.hi = max(self.hi, float(known.max()))
+
+    def merge(self, other):
+        if other.bounds != self.bounds:
+            raise ValueError("cannot merge sketches over different bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.missing += other.missing
+        self.lo = min(self.lo, other.lo)
+        self.hi = max(self.hi, other.hi)
+
+    def quantile(self, q):
+        """Estimate interpolated linearly inside the bin, clipped to the
+        smallest and largest value seen."""
+        n = self.count
+        if n == 0:
+            return math.nan
+        rank, seen = q * n, 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.bounds[i - 1] if i else self.lo
+                hi = self.bounds[i] if i < len(self.bounds) else self.hi
+                value = lo + (hi - lo) * (rank - seen) / c
+                return min(max(value, self.lo), self.hi)
+            seen += c
+        return self.hi
+
+    def to_dict(self):
+        finite = self.count > 0
+        return {"bounds": list(self.bounds), "counts": self.counts,
+                "missing": self.missing,
+                "min": self.lo if finite else None,
+                "max": self.hi if finite else None}
+
+    @classmethod
+    def from_dict(cls, d):
+        bins = cls(d["bounds"])
+        bins.counts = list(d["counts"])
+        bins.missing = d["missing"]
+        if d["min"] is not None:
+            bins.lo, bins.hi = d["min"], d["max"]
+        return bins
+
+
+class Sketch:
+    """Constant-memory summary of encoded shipment rows."""
+
+    def __init__(self, bounds=BOUNDS, categorical=CAT_COLS):
+        self.rows = 0
+        self.numeric = {col: Bins(b) for col, b in bounds.items()}
+        self.labels = {col: {} for col in categorical}    # col -> label -> n
+        self._lock = threading.Lock()
+        self._layout = (None, None, None)
+        self._exported = 0.0
+
+    def _columns(self, pre):
+        """(numeric (index, Bins), categorical (index, vocabulary, counts))
+        for the column order of Preprocessor `pre`."""
+        if self._layout[0] is not pre:
+            self._layout = (
+                pre,
+                [(pre.columns.index(col), bins)
+                 for col, bins in self.numeric.items()],
+                [(pre.columns.index(col), pre.vocab[col].tolist(), counts)
+                 for col, counts in self.labels.items()])
+        return self._layout[1:]
+
+    def observe_row(self, row, pre):
+        """Add one encoded row (Preprocessor.transform_row)."""
+        with self._lock:
+            numeric, categorical = self._columns(pre)
+            self.rows += 1
+            for j, bins in numeric:
+                bins.observe(row[j])
+            for j, vocab, counts in categorical:
+                code = row[j]
+                label = UNKNOWN if code != code else vocab[int(code)]
+                counts[label] = counts.get(label, 0) + 1
+
+    def observe(self, X, pre):
+        """Add a matrix of encoded rows (Preprocessor.transform)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) == 0:
+            return
+        numeric, categorical = self._columns(pre)
+        per_label = []
+        for j, vocab, counts in categorical:
+            codes = X[:, j]
+            known = ~np.isnan(codes)
+            n = np.bincount(codes[known].astype(np.intp), minlength=len(vocab))
+            per_label.append((counts, vocab, n, len(codes) - int(known.sum())))
+        with self._lock:
+            self.rows += len(X)
+            for j, bins in numeric:
+                bins.observe_many(X[:, j])
+            for counts, vocab, n, unknown in per_label:
+                for i in np.flatnonzero(n):
+                    counts[vocab[i]] = counts.get(vocab[i], 0) + int(n[i])
+                if unknown:
+                    counts[UNKNOWN] = counts.get(UNKNOWN, 0) + unknown
+
+    def merge(self, other):
+        """Add another sketch over the same bins (e.g. from another worker)."""
+        theirs = other.to_dict()
+        for col, d in theirs["numeric"].items():
+            if col in self.numeric and tuple(d["bounds"]) != \
+                    self.numeric[col].bounds:
+                raise ValueError(f"{col}: cannot merge sketches over "
+                                 f"different bins")
+        with self._lock:
+            self.rows += theirs["rows"]
+            for col, d in theirs["numeric"].items():
+                self.numeric.setdefault(col, Bins(d["bounds"])).merge(
+                    Bins.from_dict(d))
+            for col, d in theirs["categorical"].items():
+                counts = self.labels.setdefault(col, {})
+                for label, n in d.items():
+                    counts[label] = counts.get(label, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.numeric = {col: Bins(bins.bounds)
+                            for col, bins in self.numeric.items()}
+            self.labels = {col: {} for col in self.labels}
+            self._layout = (None, None, None)
+
+    # ─── persistence ─────────────────────────────────────────────────────────
+    def to_dict(self):
+        with self._lock:
+            return {"rows": self.rows,
+                    "numeric": {col: bins.to_dict()
+                                for col, bins in self.numeric.items()},
+                    "categorical": {col: dict(counts)
+                                    for col, counts in self.labels.items()}}
+
+    @classmethod
+    def from_dict(cls, d):
+        sketch = cls(bounds={}, categorical=())
+        sketch.rows = d["rows"]
+        sketch.numeric = {col: Bins.from_dict(b)
+                          for col, b in d["numeric"].items()}
+        sketch.labels = {col: dict(c) for col, c in d["categorical"].items()}
+        return sketch
+
+    def save(self, path):
+        """Write the sketch as JSON; the file is replaced atomically."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(dict(self.to_dict(), written_at=time.time())))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    def export(self, directory=DRIFT_DIR, every=EXPORT_EVERY):
+        """save() into `directory` under this process's name unless it was
+        written less than `every` seconds ago; a no-op when no drift
+        directory is configured."""
+        now = time.monotonic()
+        if not directory or now - self._exported < every:
+            return False
+        self._exported = now
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.save(_snapshot_path(directory))
+        return True
+
+
+def _snapshot_path(directory):
+    return Path(directory) / f"{socket.gethostname()}-{os.getpid()}.json"
+
+
+monitor = Sketch()
+
+
+def record(rows, pre=None):
+    """Add shipments being scored, as encoded rows, to `monitor`."""
+    if pre is None:
+        from . import serving
+
+        pre = serving.get_preprocessor()
+    if len(rows) == 1:
+        monitor.observe_row(rows[0], pre)
+    else:
+        monitor.observe(rows, pre)
+    monitor.export()
+
+
+def collect(directory=DRIFT_DIR, local=monitor, max_age=DRIFT_MAX_AGE):
+    """(merged sketch, processes): `local` plus the snapshots the other
+    processes wrote into `directory` in the last `max_age` seconds; older
+    ones are deleted."""
+    merged = Sketch()
+    merged.merge(local)
+    processes = 1
+    if directory and os.path.isdir(directory):
+        own = _snapshot_path(directory)
+        now = time.time()
+        for path in sorted(Path(directory).glob("*.json")):
+            if path == own:
+                continue
+            try:
+                d = json.loads(path.read_text())
+                if now - d.get("written_at", 0) > max_age:
+                    path.unlink(missing_ok=True)
+                    continue
+                merged.merge(Sketch.from_dict(d))
+            except (OSError, ValueError, KeyError):
+                continue                # being replaced, or other bins
+            processes += 1
+    return merged, processes
+
+
+# ─── comparison ──────────────────────────────────────────────────────────────
+def psi(expected, actual):
+    """Population stability index of `actual` against `expected` counts
+    over the same bins; None when either side is empty."""
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    if e.sum() == 0 or a.sum() == 0:
+        return None
+    e = np.maximum(e / e.sum(), PSI_FLOOR)
+    a = np.maximum(a / a.sum(), PSI_FLOOR)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks(expected, actual):
+    """Largest gap between the two empirical CDFs at the bin bounds."""
+    e = np.cumsum(expected, dtype=np.float64)
+    a = np.cumsum(actual, dtype=np.float64)
+    if e[-1] == 0 or a[-1] == 0:
+        return None
+    return float(np.max(np.abs(a / a[-1] - e / e[-1])))
+
+
+def psi_groups(counts, bins=PSI_BINS):
+    """Group index of every fine bin, so that each of `bins` groups holds
+    about the same share of `counts` (the reference's)."""
+    counts = np.asarray(counts, dtype=np.float64)
+    if counts.sum() == 0:
+        return np.zeros(len(counts), dtype=np.intp)
+    mid = (np.cumsum(counts) - counts / 2) / counts.sum()
+    return np.minimum((mid * bins).astype(np.intp), bins - 1)
+
+
+def status(value):
+    if value is None:
+        return "—"
+    return ("drift" if value > PSI_ALERT else
+            "moderate" if value > PSI_WARN else "stable")
+
+
+def compare(live, reference):
+    """One dict per feature: PSI, KS (numeric only), live and training
+    medians and p95s (or top label), rows and status, worst PSI first."""
+    out = []
+    for col, ref in reference.numeric.items():
+        cur = live.numeric.get(col)
+        if cur is None:
+            continue
+        group = psi_groups(ref.counts)
+        e = np.append(np.bincount(group, ref.counts), ref.missing)
+        a = np.append(np.bincount(group, cur.counts), cur.missing)
+        p = psi(e, a)
+        k = ks(ref.counts, cur.counts)
+        out.append({"feature": col, "kind": "numeric", "rows": cur.count,
+                    "psi": None if p is None else round(p, 4),
+                    "ks": None if k is None else round(k, 4),
+                    "live_p50": round(cur.quantile(0.5), 3),
+                    "train_p50": round(ref.quantile(0.5), 3),
+                    "live_p95": round(cur.quantile(0.95), 3),
+                    "train_p95": round(ref.quantile(0.95), 3),
+                    "status": status(p)})
+    for col, ref in reference.labels.items():
+        cur = live.labels.get(col)
+        if cur is None:
+            continue
+        labels = sorted(set(ref) | set(cur))
+        e = [ref.get(label, 0) for label in labels]
+        a = [cur.get(label, 0) for label in labels]
+        p = psi(e, a)
+        out.append({"feature": col, "kind": "categorical", "rows": sum(a),
+                    "psi": None if p is None else round(p, 4), "ks": None,
+                    "live_top": max(cur, key=cur.get) if cur else None,
+                    "train_top": max(ref, key=ref.get) if ref else None,
+                    "status": status(p)})
+    return sorted(out, key=lambda r: -(r["psi"] or 0.0))
+
+
+# ─── training reference ──────────────────────────────────────────────────────
+def reference_sketch(source, pre=None, chunk_rows=None):
+    """Sketch of every shipment in a column store or CSV, encoded with the
+    serving preprocessor unless `pre` is given."""
+    from . import dataset, serving
+    from .features import SAFE_COLS
+
+    pre = pre or serving.get_preprocessor()
+    chunk_rows = chunk_rows or dataset.CHUNK_ROWS
+    sketch = Sketch()
+    if dataset.is_store(source):
+        n = len(dataset.ColumnStore(source))
+        parts = [slice(i, i + chunk_rows) for i in range(0, n, chunk_rows)]
+    else:
+        parts = [None]
+    for rows in parts:
+        sketch.observe(pre.transform(dataset.read(source, SAFE_COLS, rows)),
+                       pre)
+    return sketch
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.drift",
+        description="Sketch the training data for drift monitoring, or "
+                    "compare the live sketches with it.")
+    ap.add_argument("data", nargs="?",
+                    help="column store or shipments CSV the model was "
+                         "trained on")
+    ap.add_argument("--out", default=str(DRIFT_REFERENCE_PATH))
+    ap.add_argument("--report", action="store_true",
+                    help="print PSI/KS of the sketches in the drift "
+                         "directory against the reference")
+    ap.add_argument("--dir", default=DRIFT_DIR,
+                    help="drift directory (default: $CHAINSIGHT_DRIFT_DIR)")
+    ap.add_argument("--max-age", type=float, default=DRIFT_MAX_AGE,
+                    help="seconds after which a sketch in the drift "
+                         "directory is dropped")
+    args = ap.parse_args(argv)
+
+    if args.report:
+        if not Path(args.out).exists():
+            raise SystemExit(f"no reference sketch at {args.out}")
+        live, processes = collect(args.dir, Sketch(), args.max_age)
+        print(f"{live.rows:,} shipments from {processes - 1} processes")
+        for r in compare(live, Sketch.load(args.out)):
+            psi_ = "-" if r["psi"] is None else f"{r['psi']:.4f}"
+            ks_ = "" if r["ks"] is None else f"  KS {r['ks']:.4f}"
+            print(f"  {r['feature']:<26} PSI {psi_:>7}{ks_:<11}  {r['status']}")
+        return
+    if not args.data:
+        ap.error("give the training data, or --report")
+
+    t0 = time.perf_counter()
+    sketch = reference_sketch(args.data)
+    sketch.save(args.out)
+    print(f"sketched {sketch.rows:,} shipments in "
+          f"{time.perf_counter() - t0:.2f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
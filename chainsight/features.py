@@ -0,0 +1,51 @@
+"""
+Feature schema of the shipped XGBoost model.
+
+Mirrors the notebook: the 16 `safe_cols` in training order, with the five
+categorical columns label-encoded and Order_Date split into year, month,
+day and day-of-week.  The encoding itself lives in chainsight.preprocess.
+"""
+
+from datetime import date, datetime
+
+SAFE_COLS = [
+    "Origin_City", "Destination_City", "Route_Type", "Transportation_Mode",
+    "Product_Category", "Base_Lead_Time_Days", "Scheduled_Lead_Time_Days",
+    "Geopolitical_Risk_Index", "Weather_Severity_Index", "Inflation_Rate_Pct",
+    "Shipping_Cost_USD", "Order_Weight_Kg",
+    "Order_Year", "Order_Month", "Order_Day", "Order_DayOfweek",
+]
+
+CAT_COLS = ["Origin_City", "Destination_City", "Route_Type",
+            "Transportation_Mode", "Product_Category"]
+
+DATE_COLS = ["Order_Year", "Order_Month", "Order_Day", "Order_DayOfweek"]
+
+# LabelEncoder sorts the categories it is fitted on, so the integer the model
+# saw for a value is that value's position in the sorted training vocabulary.
+VOCAB = {
+    "Origin_City":         ["Hamburg, DE", "Mumbai, IN", "Santos, BR",
+                            "Shanghai, CN", "Shenzhen, CN", "Tokyo, JP"],
+    "Destination_City":    ["Felixstowe, UK", "Los Angeles, US", "New York, US",
+                            "Rotterdam, NL", "Shanghai, CN", "Singapore, SG"],
+    "Route_Type":          ["Atlantic", "Commodity", "Intra-Asia",
+                            "Pacific", "Suez"],
+    "Transportation_Mode": ["Air", "Sea"],
+    "Product_Category":    ["Automotive", "Consumer Electronics", "Perishables",
+                            "Pharmaceuticals", "Raw Materials",
+                            "Semiconductors", "Textiles"],
+}
+
+
+def date_parts(order_date):
+    """Order_Year, Order_Month, Order_Day, Order_DayOfweek (Monday = 0) of a
+    date or a date string; ValueError for anything else."""
+    if isinstance(order_date, str):
+        try:
+            order_date = datetime.fromisoformat(order_date)
+        except ValueError:                      # the dataset's 4/5/2024 form
+            order_date = datetime.strptime(order_date, "%m/%d/%Y")
+    if not isinstance(order_date, (date, datetime)):
+        raise ValueError(f"expected a date, not {type(order_date).__name__}")
+    return [order_date.year, order_date.month, order_date.day,
+            order_date.weekday()]
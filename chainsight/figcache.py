@@ -0,0 +1,64 @@
+"""
+Process-wide cache of built Plotly figures.
+
+Building a go.Figure through base_fig/add_trace/update_layout costs ~10 ms
+per chart.  Figures here are built once per (chart key, data version),
+where the version is a digest of the values the chart is drawn from, so a
+rebuilt aggregate store or a new cross-filter slice gets a fresh figure while
+unchanged charts are reused by every rerun and every session.  Superseded
+versions are never hit again and age out of the bounded LRU.  Only the
+construction is cached: st.plotly_chart still serializes the figure on
+every rerun.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 128
+
+
+def data_version(data):
+    """Stable digest of the values a chart is drawn from."""
+    return hashlib.blake2b(repr(data).encode(), digest_size=12).hexdigest()
+
+
+class FigureCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, data, build):
+        """Figure for chart `key` drawn from `data`, calling `build()` on a miss.
+
+        The returned figure is shared and must not be mutated.
+        """
+        entry = (key, data_version(data))
+        with self._lock:
+            fig = self._entries.get(entry)
+            if fig is not None:
+                self._entries.move_to_end(entry)
+                self.hits += 1
+                return fig
+            self.misses += 1
+
+        fig = build()
+        with self._lock:
+            self._entries[entry] = fig
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+figures = FigureCache()
@@ -0,0 +1,99 @@
+"""
+Process-wide cache of objects loaded from files, reloaded when the file
+changes.
+
+chainsight.serving keeps the model and its artifacts here, and the
+dashboard's aggregates, cross-filter index and model results use it too.
+It has no dependencies beyond the standard library, so a page that only
+needs a JSON file does not import numpy for it.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Loaded:
+    obj: object
+    path: str
+    version: tuple          # (mtime_ns, size) of the file when loaded
+    load_seconds: float
+    memory_bytes: int       # RSS growth caused by the load
+    loaded_at: float
+
+
+_lock = threading.Lock()
+_current = {}               # (path, loader) -> Loaded
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load(path, version, loader):
+    rss0 = _rss_bytes()
+    t0 = time.perf_counter()
+    obj = loader(path)
+    elapsed = time.perf_counter() - t0
+    loaded = Loaded(obj=obj, path=path, version=version,
+                    load_seconds=elapsed,
+                    memory_bytes=max(_rss_bytes() - rss0, 0),
+                    loaded_at=time.time())
+    log.info("loaded %s in %.0f ms (+%.1f MB RSS)", path, elapsed * 1e3,
+             loaded.memory_bytes / 2**20)
+    return loaded
+
+
+def _slot(path, loader):
+    return (str(path), loader.__module__, loader.__qualname__)
+
+
+def peek(path, loader):
+    """The entry cached() last returned for (path, loader), or None; never
+    loads or even stats the file."""
+    return _current.get(_slot(path, loader))
+
+
+def cached(path, loader):
+    """Return the Loaded entry for `loader(path)`, reloading if the file changed.
+
+    Entries are kept per (path, loader), so one file can back several views.
+    A failed reload (e.g. the file is still being copied in) keeps serving
+    the previous version and is retried on the next call.
+    """
+    path = str(path)
+    slot = _slot(path, loader)
+    version = _signature(path)
+    cur = _current.get(slot)
+    if cur is not None and cur.version == version:
+        return cur
+    with _lock:
+        cur = _current.get(slot)
+        if cur is not None and cur.version == version:
+            return cur
+        try:
+            cur = _current[slot] = _load(path, version, loader)
+        except Exception:
+            if cur is None:
+                raise
+            log.exception("reload of %s failed, keeping previous version", path)
+    return cur
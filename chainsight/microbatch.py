@@ -0,0 +1,111 @@
+"""
+Request coalescing for online predictions.
+
+Scoring one shipment costs nearly as much as scoring a few hundred: most of
+a predict_proba call is fixed overhead.  A MicroBatcher sits in front of the
+model inside an asyncio server.  Callers submit a single encoded row and
+await its probability; a background task collects rows until `max_batch`
+are waiting or `max_wait_ms` has passed since the first one arrived, scores
+them with one predict call in a worker thread, and resolves every caller's
+future.  While a batch is being scored new rows keep queueing, so under load
+batches grow on their own and the wait is only paid when traffic is light.
+
+    python benchmarks/bench_microbatch.py      # throughput/latency curve
+"""
+
+import asyncio
+
+import numpy as np
+
+from . import serving
+from .config import BATCH_MAX_ROWS, BATCH_WAIT_MS
+
+
+class MicroBatcher:
+
+    def __init__(self, predict=None, max_wait_ms=BATCH_WAIT_MS,
+                 max_batch=BATCH_MAX_ROWS):
+        """`predict(X)` maps a float32 matrix to one result per row and
+        defaults to serving.predict_proba."""
+        self.predict = predict or serving.predict_proba
+        self.max_wait = max_wait_ms / 1e3
+        self.max_batch = max(int(max_batch), 1)
+        self.batches = self.rows = 0
+        self._queue = None
+        self._task = None
+
+    # ─── lifecycle ───────────────────────────────────────────────────────────
+    def start(self):
+        """Start the collector on the running event loop, or restart it if
+        it has ended."""
+        if self._task is None or self._task.done():
+            if self._queue is None:         # a restart keeps queued requests
+                self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            _, fut = self._queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("batcher stopped"))
+        self._queue = None
+
+    async def submit(self, row):
+        """`predict` result (by default the delay probability) for one
+        encoded feature row."""
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, fut))
+        return await fut
+
+    @property
+    def mean_batch(self):
+        return self.rows / self.batches if self.batches else 0.0
+
+    # ─── collector ───────────────────────────────────────────────────────────
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        pending = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(pending) < self.max_batch:
+            if not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(self._queue.get(),
+                                                      timeout))
+            except asyncio.TimeoutError:
+                break
+        return [(row, fut) for row, fut in pending if not fut.done()]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = []
+            try:
+                pending = await self._collect()
+                if not pending:
+                    continue
+                X = np.asarray([row for row, _ in pending], dtype=np.float32)
+                probs = await loop.run_in_executor(None, self.predict, X)
+                self.batches += 1
+                self.rows += len(pending)
+                for (_, fut), p in zip(pending, probs):
+                    if not fut.done():
+                        fut.set_result(p)
+            except Exception as exc:
+                # Fail this batch only; the collector keeps serving.
+                for _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(exc)
@@ -0,0 +1,161 @@
+"""
+Parallel benchmark of the five notebook classifiers.
+
+Trains LR, Random Forest, XGBoost, SVM and KNN on the notebook's split in
+separate worker processes, so a full comparison takes as long as the
+slowest model instead of the sum of all five.  Each worker also records fit
+time, predict latency and peak memory, and the results are written to
+model_results.json, which the Model Comparison page reads:
+
+    python -m chainsight.modelbench global_supply_chain_disruption_v1.csv
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from . import filecache
+from .config import MODEL_RESULTS_PATH
+
+LATENCY_CALLS = 50          # single-row predict_proba calls timed per model
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:                                 # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _evaluate(name, data_dir, n_jobs):
+    """Fit and score one model; runs in its own worker process."""
+    import numpy as np
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    from .training import MODELS
+
+    factory, scaled = MODELS[name]
+    prefix = "xs" if scaled else "x"
+    data = {key: np.load(Path(data_dir) / f"{key}.npy", mmap_mode="r")
+            for key in (f"{prefix}_train", f"{prefix}_test",
+                        "y_train", "y_test")}
+    x_train, x_test = data[f"{prefix}_train"], data[f"{prefix}_test"]
+    y_train, y_test = data["y_train"], data["y_test"]
+
+    rss0 = _peak_rss_mb()
+    model = factory(n_jobs)
+    t0 = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    prob = model.predict_proba(x_test)[:, 1]
+    batch_seconds = time.perf_counter() - t0
+    pred = model.predict(x_test)
+
+    single = []
+    for i in range(min(LATENCY_CALLS, len(x_test))):
+        t0 = time.perf_counter()
+        model.predict_proba(x_test[i:i + 1])
+        single.append(time.perf_counter() - t0)
+    rss1 = _peak_rss_mb()
+
+    return {
+        "name":            name,
+        "acc":             round(100 * float(accuracy_score(y_test, pred)), 1),
+        "auc":             round(float(roc_auc_score(y_test, prob)), 3),
+        "fit_seconds":     round(fit_seconds, 3),
+        "predict_us_row":  round(1e6 * batch_seconds / max(len(x_test), 1), 2),
+        "latency_ms":      round(1e3 * float(np.median(single)), 3),
+        "peak_mb":         None if rss0 is None else round(rss1 - rss0, 1),
+    }
+
+
+def run(data, workers=None, models=None):
+    """Benchmark `models` (default: all of MODELS) on the CSV at `data`."""
+    import numpy as np
+
+    from .training import MODELS, load_xy, split
+
+    names = list(models or MODELS)
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    n_jobs = max((os.cpu_count() or 1) // workers, 1)
+
+    pre, X, y = load_xy(data)
+    x_train, x_test, y_train, y_test = split(X, y)
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        arrays = {"x_train": x_train, "x_test": x_test,
+                  "xs_train": pre.scale(x_train), "xs_test": pre.scale(x_test),
+                  "y_train": y_train, "y_test": y_test}
+        for key, arr in arrays.items():
+            np.save(Path(tmp) / f"{key}.npy", arr)
+        # One fresh process per model, so its peak RSS is its own.
+        with ProcessPoolExecutor(max_workers=workers,
+                                 max_tasks_per_child=1) as pool:
+            futures = [pool.submit(_evaluate, name, tmp, n_jobs)
+                       for name in names]
+            results = [f.result() for f in as_completed(futures)]
+    wall = time.perf_counter() - t0
+
+    results.sort(key=lambda r: -r["auc"])
+    for i, r in enumerate(results):
+        r["best"] = i == 0
+    return {"generated_at": time.time(), "data": str(data),
+            "rows": int(len(y)), "workers": workers,
+            "wall_seconds": round(wall, 3),
+            "serial_fit_seconds": round(sum(r["fit_seconds"]
+                                            for r in results), 3),
+            "models": results}
+
+
+def save(results, path=MODEL_RESULTS_PATH):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(results, indent=2))
+    os.replace(tmp, path)
+
+
+def load_results(path=MODEL_RESULTS_PATH):
+    """MODELS_DATA-shaped list from the results file, or None if absent."""
+    if not Path(path).exists():
+        return None
+    return filecache.cached(
+        path, lambda p: json.loads(Path(p).read_text())["models"]).obj
+
+
+def main(argv=None):
+    from .training import MODELS
+
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.modelbench",
+        description="Train and evaluate the five classifiers in parallel.")
+    ap.add_argument("data", help="raw shipments CSV or column store")
+    ap.add_argument("--out", default=str(MODEL_RESULTS_PATH))
+    ap.add_argument("--workers", type=int,
+                    help="worker processes (default: one per model, up to "
+                         "the CPU count)")
+    ap.add_argument("--models", nargs="+", choices=list(MODELS),
+                    metavar="NAME", help="subset of models to run")
+    args = ap.parse_args(argv)
+
+    results = run(args.data, args.workers, args.models)
+    save(results, args.out)
+    print(f"{'model':<20} {'acc %':>6} {'auc':>6} {'fit s':>8} "
+          f"{'us/row':>8} {'1-row ms':>9} {'peak MB':>8}")
+    for r in results["models"]:
+        print(f"{r['name']:<20} {r['acc']:>6.1f} {r['auc']:>6.3f} "
+              f"{r['fit_seconds']:>8.2f} {r['predict_us_row']:>8.2f} "
+              f"{r['latency_ms']:>9.3f} {r['peak_mb'] or 0:>8.1f}")
+    print(f"{results['rows']:,} rows, {results['workers']} workers: "
+          f"{results['wall_seconds']:.1f} s wall vs "
+          f"{results['serial_fit_seconds']:.1f} s of fitting -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
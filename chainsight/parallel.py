@@ -0,0 +1,158 @@
+"""
+Multi-core batch scoring for rescoring the whole order book.
+
+serving.predict_proba scores a batch in one call on one core.  Here the
+encoded feature matrix is written once to a .npy in shared memory (/dev/shm
+when the system has it), and a pool of worker processes memory-maps it,
+each holding its own copy of the model.  Workers take BLOCK_ROWS row ranges
+from a shared queue and write probabilities straight into a shared output
+array, so only (start, stop) pairs cross process boundaries and throughput
+grows with the number of cores:
+
+    python -m chainsight.parallel data/shipments scores.csv --workers 8
+"""
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .config import MODEL_PATH
+
+BLOCK_ROWS = 65_536         # rows per task: large enough to amortize a call
+SHM_DIR = "/dev/shm"
+
+_worker = {}                # per worker process: X, out, model path
+
+
+def _init(x_file, out_file, path, threads):
+    from . import serving
+
+    _worker["X"] = np.load(x_file, mmap_mode="r")
+    _worker["out"] = np.load(out_file, mmap_mode="r+")
+    _worker["path"] = path
+    if importlib.util.find_spec("xgboost") is not None:
+        serving.get_model(path).obj.set_params(n_jobs=threads)
+
+
+def _score(start, stop):
+    from . import serving
+
+    X, out = _worker["X"], _worker["out"]
+    # A short tail block must not switch to the compiled trees: every block
+    # is scored as serving.predict_proba would score the whole batch.
+    out[start:stop] = serving.predict_proba(X[start:stop], _worker["path"],
+                                            compiled=False)
+
+
+def scratch():
+    """Temporary directory for arrays shared between processes, in shared
+    memory when the system has it."""
+    shm = SHM_DIR if os.path.isdir(SHM_DIR) else None
+    return tempfile.TemporaryDirectory(prefix="chainsight_", dir=shm)
+
+
+def predict_proba(X, workers=None, path=MODEL_PATH, block_rows=BLOCK_ROWS,
+                  threads=1):
+    """serving.predict_proba over `workers` processes (default: one per
+    CPU), each running `threads` predictor threads.
+
+    `X` is an encoded matrix or the path of one saved with np.save, which
+    the workers then map as is.  Small batches are scored in-process.
+    """
+    from . import serving
+
+    workers = workers or os.cpu_count() or 1
+    x_file = X if isinstance(X, (str, Path)) else None
+    n = len(np.load(x_file, mmap_mode="r")) if x_file else len(X)
+    if workers == 1 or n <= block_rows:
+        if x_file:
+            X = np.load(x_file, mmap_mode="r")
+        return serving.predict_proba(X, path)
+
+    with scratch() as tmp:
+        if x_file is None:
+            x_file = Path(tmp) / "X.npy"
+            np.save(x_file, np.asarray(X, dtype=np.float32))
+        out_file = Path(tmp) / "prob.npy"
+        out = np.lib.format.open_memmap(out_file, mode="w+",
+                                        dtype=np.float32, shape=(n,))
+        starts = range(0, n, block_rows)
+        # Spawned, not forked: a process that has already run xgboost's
+        # OpenMP predictor can deadlock in a forked child.
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init,
+                initargs=(str(x_file), str(out_file), str(path),
+                          threads)) as pool:
+            list(pool.map(_score, starts,
+                          [min(s + block_rows, n) for s in starts]))
+        prob = np.array(out)
+        del out
+    return prob
+
+
+def score(source, workers=None, path=MODEL_PATH):
+    """(frame of Order_ID when present, probabilities) for every shipment
+    in a column store or CSV."""
+    from . import dataset, drift, serving
+    from .features import SAFE_COLS
+
+    columns = SAFE_COLS + (["Order_ID"] if _has_ids(source) else [])
+    df = dataset.read(source, columns)
+    pre = serving.get_preprocessor()
+    X = pre.transform(df)
+    drift.record(X, pre)
+    return df[columns[len(SAFE_COLS):]], predict_proba(X, workers, path)
+
+
+def _has_ids(source):
+    from . import dataset
+
+    if dataset.is_store(source):
+        return "Order_ID" in dataset.ColumnStore(source).columns
+    import pandas as pd
+
+    return "Order_ID" in pd.read_csv(source, nrows=0).columns
+
+
+def main(argv=None):
+    from . import drift
+    from .batch import risk_levels
+
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.parallel",
+        description="Score every shipment of a table on all cores.")
+    ap.add_argument("src", help="column store or shipments CSV")
+    ap.add_argument("dst", help="output .csv (Order_ID, Delay_Probability, "
+                                "Risk_Level) or .npy (probabilities)")
+    ap.add_argument("--workers", type=int,
+                    help="worker processes (default: one per CPU)")
+    ap.add_argument("--model", default=str(MODEL_PATH))
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    ids, prob = score(args.src, args.workers, args.model)
+    elapsed = time.perf_counter() - t0
+    drift.monitor.export(every=0)
+    if args.dst.endswith(".npy"):
+        np.save(args.dst, prob)
+    else:
+        out = ids.copy()
+        out["Delay_Probability"] = np.round(prob, 4)
+        out["Risk_Level"] = risk_levels(prob)
+        out.to_csv(args.dst, index=False)
+    print(f"scored {len(prob):,} rows in {elapsed:.1f} s "
+          f"({len(prob) / max(elapsed, 1e-9):,.0f} rows/s, "
+          f"{args.workers or os.cpu_count()} workers) -> {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+In-process latency histograms for the dashboard's hot path.
+
+app.py times each stage of a rerun: the global CSS, the page_header/kpi/
+card_title HTML, figure construction, render() (st.plotly_chart
+serialization), model inference and the page as a whole.  Every (stage,
+name) pair keeps a fixed-bucket histogram with Prometheus's bucket bounds,
+so memory stays constant however long the server runs, histograms from
+several processes add up bucket by bucket, and percentiles are read off the
+buckets.  Recording costs a perf_counter() pair, a bisect and a locked
+increment, 2–4 µs per timed call.
+
+The hidden Performance page (open the dashboard with `?perf=1`) shows them,
+and prometheus() renders the text exposition format; with
+CHAINSIGHT_METRICS_FILE set, export() writes it there at most every
+EXPORT_EVERY seconds for node_exporter's textfile collector.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from .config import METRICS_FILE
+
+# Upper bounds in seconds ("le"); anything slower lands in +Inf.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_EVERY = 15.0
+
+
+class Histogram:
+
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # per bucket, last is +Inf
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate interpolated linearly inside the bucket, as Prometheus's
+        histogram_quantile() does."""
+        n = self.count
+        if n == 0:
+            return 0.0
+        rank, seen = q * n, 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                if i == len(BUCKETS):
+                    return self.max
+                lo = BUCKETS[i - 1] if i else 0.0
+                return min(lo + (BUCKETS[i] - lo) * (rank - seen) / c, self.max)
+            seen += c
+        return self.max
+
+
+class Timings:
+
+    def __init__(self, metric="chainsight_ui_seconds",
+                 description="Dashboard rerun latency by stage."):
+        self.metric = metric
+        self.description = description
+        self._hist = {}                     # (stage, name) -> Histogram
+        self._lock = threading.Lock()
+        self._exported = 0.0
+
+    def observe(self, stage, name, seconds):
+        key = (stage, name)
+        with self._lock:
+            hist = self._hist.get(key)
+            if hist is None:
+                hist = self._hist[key] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage, name=""):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, name, time.perf_counter() - t0)
+
+    def timed(self, stage, name=None):
+        """Decorator timing every call; `name` defaults to the function's."""
+        def wrap(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(stage, label, time.perf_counter() - t0)
+            return inner
+        return wrap
+
+    def merge(self, other):
+        """Add another Timings' histograms (e.g. from another worker)."""
+        theirs = other.histograms()
+        with self._lock:
+            for key, hist in theirs.items():
+                self._hist.setdefault(key, Histogram()).merge(hist)
+
+    def histograms(self):
+        """Copy of {(stage, name): Histogram}, sorted by stage and name."""
+        with self._lock:
+            out = {}
+            for key in sorted(self._hist):
+                h = out[key] = Histogram()
+                h.merge(self._hist[key])
+            return out
+
+    def summary(self):
+        """One dict per (stage, name): count, mean/p50/p95/max ms, total s."""
+        rows = []
+        for (stage, name), h in self.histograms().items():
+            n = h.count
+            rows.append({"stage": stage, "name": name, "count": n,
+                         "mean_ms": round(h.total / n * 1e3, 3) if n else 0.0,
+                         "p50_ms": round(h.quantile(0.5) * 1e3, 3),
+                         "p95_ms": round(h.quantile(0.95) * 1e3, 3),
+                         "max_ms": round(h.max * 1e3, 3),
+                         "total_s": round(h.total, 4)})
+        return rows
+
+    def prometheus(self):
+        """All histograms in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.metric} {self.description}",
+                 f"# TYPE {self.metric} histogram"]
+        for (stage, name), h in self.histograms().items():
+            labels = f'stage="{_escape(stage)}",name="{_escape(name)}"'
+            cum = 0
+            for bound, c in zip(BUCKETS + ("+Inf",), h.counts):
+                cum += c
+                lines.append(f'{self.metric}_bucket{{{labels},le="{bound}"}} '
+                             f"{cum}")
+            lines.append(f"{self.metric}_sum{{{labels}}} {h.total:.9g}")
+            lines.append(f"{self.metric}_count{{{labels}}} {cum}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Write prometheus() to `path`, replacing it atomically."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(self.prometheus())
+        os.replace(tmp, path)
+
+    def export(self, path=METRICS_FILE, every=EXPORT_EVERY):
+        """write_textfile(path) unless it was written less than `every`
+        seconds ago; a no-op when no metrics file is configured."""
+        now = time.monotonic()
+        if not path or now - self._exported < every:
+            return False
+        self._exported = now
+        self.write_textfile(path)
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+
+
+def _escape(value):
+    return (str(value).replace("\\", r"\\").replace('"', r'\"')
+            .replace("\n", r"\n"))
+
+
+timings = Timings()
@@ -0,0 +1,100 @@
+"""
+Cache of delay probabilities keyed on the encoded feature vector.
+
+Risk Predictor inputs are selectboxes and bounded, stepped numbers, and the
+same lanes are scored over and over by the page and the API.  Rows are keyed
+on their float32 encoding — the exact values the model sees, so "0.55" and
+0.55 or 21 and 21.0 share an entry — and entries live until they are
+least-recently-used out, older than the TTL, or the model file changes.
+A new model version (its (mtime_ns, size) from chainsight.serving) flushes
+the whole cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE,
+                 ttl=PREDICTION_CACHE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()       # key -> (prob, stored_at)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.expired = self.flushes = 0
+
+    @staticmethod
+    def key(row):
+        return np.asarray(row, dtype=np.float32).tobytes()
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.flushes += 1
+            self._entries.clear()
+            self._version = version
+
+    def get_many(self, rows, version):
+        """Cached probability per row, None where there is no fresh entry."""
+        keys = [self.key(r) for r in rows]
+        now = self._clock()
+        out = []
+        with self._lock:
+            self._check_version(version)
+            for k in keys:
+                hit = self._entries.get(k)
+                if hit is not None and now - hit[1] > self.ttl:
+                    del self._entries[k]
+                    self.expired += 1
+                    hit = None
+                if hit is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._entries.move_to_end(k)
+                    self.hits += 1
+                    out.append(hit[0])
+        return out
+
+    def put_many(self, rows, probs, version):
+        now = self._clock()
+        with self._lock:
+            self._check_version(version)
+            for r, p in zip(rows, probs):
+                k = self.key(r)
+                self._entries[k] = (float(p), now)
+                self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def predict(self, rows, version, predict):
+        """Probabilities for `rows`, calling `predict(X)` only on the misses."""
+        rows = np.asarray(rows, dtype=np.float32)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        cached = self.get_many(rows, version)
+        miss = [i for i, p in enumerate(cached) if p is None]
+        out = np.array([np.nan if p is None else p for p in cached])
+        if miss:
+            out[miss] = predict(rows[miss])
+            self.put_many(rows[miss], out[miss], version)
+        return out
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits,
+                "misses": self.misses, "expired": self.expired,
+                "flushes": self.flushes,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
@@ -0,0 +1,199 @@
+"""
+Fitted preprocessing artifact for the shipped model.
+
+The notebook label-encodes each categorical column with a freshly fitted
+LabelEncoder and never saves the mapping, so nothing at serving time knows
+which integer the model saw for "Suez".  A Preprocessor freezes that state —
+sorted category vocabularies, column order and dtypes, and the StandardScaler
+parameters used by LR/SVM/KNN — and is saved as a single .npz next to
+chainsight_model.pkl:
+
+    python -m chainsight.preprocess global_supply_chain_disruption_v1.csv
+"""
+
+import argparse
+import math
+from datetime import date
+
+import numpy as np
+
+from .config import PREPROCESS_PATH
+from .features import CAT_COLS, DATE_COLS, SAFE_COLS, VOCAB, date_parts
+
+# Same split as the notebook, so the scaler sees the same training rows.
+TEST_SIZE    = 0.2
+RANDOM_STATE = 23
+
+
+class Preprocessor:
+    """Frozen encoder/scaler; vocabulary lookups are hash-based, O(1) per value."""
+
+    def __init__(self, vocab, columns=SAFE_COLS, dtypes=None,
+                 scaler_mean=None, scaler_scale=None):
+        self.columns = list(columns)
+        self.vocab = {col: np.asarray(vals, dtype=str)
+                      for col, vals in vocab.items()}
+        self.dtypes = dict(dtypes or {})
+        self.scaler_mean = (None if scaler_mean is None
+                            else np.asarray(scaler_mean, dtype=np.float64))
+        self.scaler_scale = (None if scaler_scale is None
+                             else np.asarray(scaler_scale, dtype=np.float64))
+        self._index = None                  # pd.Index per column, see transform()
+        self._codes = {col: {v: i for i, v in enumerate(vals.tolist())}
+                       for col, vals in self.vocab.items()}
+
+    # ─── construction ────────────────────────────────────────────────────────
+    @classmethod
+    def default(cls):
+        """Vocabulary of the shipped model, without scaler parameters."""
+        return cls(VOCAB)
+
+    @classmethod
+    def fit(cls, df):
+        """Fit on a raw shipments frame the way the notebook does.
+
+        Vocabularies are fitted on every row (as LabelEncoder was); the scaler
+        only on the notebook's 80% training split.
+        """
+        import pandas as pd
+        from sklearn.model_selection import train_test_split
+
+        vocab = {col: np.sort(_labels(df[col])) for col in CAT_COLS}
+        pre = cls(vocab)
+        X = pre.transform(df)
+        pre.dtypes = {col: ("int" if col in CAT_COLS or col in DATE_COLS
+                            or pd.api.types.is_integer_dtype(df[col])
+                            else "float")
+                      for col in pre.columns}
+        x_train, _ = train_test_split(X, test_size=TEST_SIZE,
+                                      random_state=RANDOM_STATE)
+        pre.scaler_mean = x_train.mean(axis=0, dtype=np.float64)
+        std = x_train.std(axis=0, dtype=np.float64)
+        pre.scaler_scale = np.where(std == 0, 1.0, std)
+        return pre
+
+    # ─── persistence ─────────────────────────────────────────────────────────
+    def save(self, path=PREPROCESS_PATH):
+        arrays = {f"vocab__{col}": vals for col, vals in self.vocab.items()}
+        arrays["columns"] = np.asarray(self.columns, dtype=str)
+        arrays["dtypes"] = np.asarray([self.dtypes.get(c, "float")
+                                       for c in self.columns], dtype=str)
+        if self.scaler_mean is not None:
+            arrays["scaler_mean"] = self.scaler_mean
+            arrays["scaler_scale"] = self.scaler_scale
+        with open(path, "wb") as fh:
+            np.savez(fh, **arrays)
+
+    @classmethod
+    def load(cls, path=PREPROCESS_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            columns = npz["columns"].tolist()
+            vocab = {key[len("vocab__"):]: npz[key]
+                     for key in npz.files if key.startswith("vocab__")}
+            return cls(vocab, columns,
+                       dtypes=dict(zip(columns, npz["dtypes"].tolist())),
+                       scaler_mean=npz.get("scaler_mean"),
+                       scaler_scale=npz.get("scaler_scale"))
+
+    # ─── transforms ──────────────────────────────────────────────────────────
+    def transform(self, df):
+        """Encode a shipments frame into a float32 matrix in column order.
+
+        Every step is a whole-column operation.  The date features are taken
+        from the frame when present and derived from Order_Date otherwise;
+        unknown categories and unparseable values become NaN.
+        """
+        import pandas as pd
+
+        raw = [c for c in self.columns if c not in DATE_COLS]
+        missing = [c for c in raw if c not in df.columns]
+        has_dates = set(DATE_COLS) <= set(df.columns)
+        if not has_dates and "Order_Date" not in df.columns:
+            missing.append("Order_Date")
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+
+        if self._index is None:
+            self._index = {col: pd.Index(vals)
+                           for col, vals in self.vocab.items()}
+        X = np.empty((len(df), len(self.columns)), dtype=np.float32)
+        if not has_dates:
+            dt = pd.to_datetime(df["Order_Date"], errors="coerce").dt
+            parts = dict(zip(DATE_COLS, (dt.year, dt.month, dt.day,
+                                         dt.dayofweek)))
+        for j, col in enumerate(self.columns):
+            if col in self._index:
+                values = df[col]
+                if values.dtype == "category":
+                    # One lookup per category instead of one per row.
+                    lut = self._index[col].get_indexer(values.cat.categories)
+                    codes = np.append(lut, -1)[values.cat.codes.to_numpy()]
+                else:
+                    codes = self._index[col].get_indexer(values)
+                X[:, j] = np.where(codes < 0, np.nan, codes)
+            elif col in DATE_COLS and not has_dates:
+                X[:, j] = parts[col]
+            else:
+                X[:, j] = pd.to_numeric(df[col], errors="coerce")
+        return X
+
+    def transform_row(self, shipment):
+        """Encode one shipment dict (raw values plus optional "Order_Date",
+        today when absent).
+
+        Raises KeyError for a missing field and ValueError starting with the
+        field's name for a value that is not a number, label or date.
+        """
+        try:
+            dates = dict(zip(DATE_COLS, date_parts(
+                shipment.get("Order_Date", date.today()))))
+        except ValueError as exc:
+            raise ValueError(f"Order_Date: {exc}") from None
+        row = []
+        for col in self.columns:
+            try:
+                if col in self._codes:
+                    row.append(float(self._codes[col].get(shipment[col],
+                                                          math.nan)))
+                elif col in DATE_COLS:
+                    row.append(float(shipment.get(col, dates[col])))
+                else:
+                    row.append(float(shipment[col]))
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{col}: {exc}") from None
+        return row
+
+    def scale(self, X):
+        """StandardScaler transform for the distance-based models."""
+        if self.scaler_mean is None:
+            raise ValueError("preprocessor was saved without scaler parameters")
+        return (np.asarray(X, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+
+
+def _labels(values):
+    """Distinct non-missing values of a column, as strings."""
+    if values.dtype == "category":
+        return np.asarray(values.cat.remove_unused_categories()
+                          .cat.categories.astype(str))
+    return values.dropna().astype(str).unique()
+
+
+def main(argv=None):
+    from .dataset import read
+
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.preprocess",
+        description="Fit the preprocessing artifact from the shipment dataset.")
+    ap.add_argument("data", help="raw shipments CSV or column store")
+    ap.add_argument("--out", default=str(PREPROCESS_PATH))
+    args = ap.parse_args(argv)
+
+    pre = Preprocessor.fit(read(args.data, SAFE_COLS))
+    pre.save(args.out)
+    for col, vals in pre.vocab.items():
+        print(f"{col:<22} {len(vals)} categories")
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Scripted retraining of the delay model on the column store, in place of
+rerunning chiansight_eda.ipynb.
+
+Newly labeled shipments are appended to the store (--new), then a candidate
+model is trained in one of two modes:
+
+  - warm:   the current booster keeps boosting, --rounds more trees on the
+            rows added since the last accepted retrain;
+  - window: a fresh model with the notebook's XGBoost settings is trained on
+            the orders of the last --window-days.
+
+Either way the most recent --holdout of those rows (by Order_Date) is held
+out, and the candidate replaces the model, atomically and with its compiled
+trees, only if its ROC-AUC there is at most --max-auc-drop below the current
+model's.  The encoding is left as is: the saved Preprocessor is reused.
+
+The held-out rows are then never trained on, and the next warm start begins
+after them.  With --refit, an accepted candidate is fitted again the same way
+(same rounds from the same booster, or the same fresh model) on all the rows,
+holdout included, and that model is published instead, provided its AUC on
+the holdout still clears the gate; otherwise the validated candidate is.
+Every run appends its row counts, AUCs and wall time per stage to
+RETRAIN_LOG, and --log lists them next to the size of the history:
+
+    python -m chainsight.retrain --new labeled_2026_10.csv
+    python -m chainsight.retrain --mode window --window-days 365
+    python -m chainsight.retrain --log
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from .config import DATASET_STORE, MODEL_PATH, PREPROCESS_PATH, RETRAIN_LOG
+
+MODES = ("warm", "window")
+ROUNDS = 50                 # trees added per warm start
+WINDOW_DAYS = 365
+HOLDOUT = 0.2
+MAX_AUC_DROP = 0.005
+
+
+@contextmanager
+def _stage(seconds, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds[name] = round(time.perf_counter() - t0, 3)
+
+
+def history(log_path=RETRAIN_LOG):
+    """Logged runs, oldest first."""
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return []
+    return [json.loads(line) for line in log_path.read_text().splitlines()
+            if line.strip()]
+
+
+def _last_trained(store, log_path):
+    """Store rows covered by the current model: the store size at the last
+    accepted run, else the first row of the last appended batch."""
+    for entry in reversed(history(log_path)):
+        if entry["accepted"] and entry["store"] == str(store.path):
+            return entry["store_rows"]
+    batches = store.meta.get("batches")
+    return batches[-1]["start"] if batches else 0
+
+
+def select_rows(store, mode, since=0, window_days=WINDOW_DAYS):
+    """Indices of the rows a `mode` candidate is trained and checked on."""
+    if mode == "warm":
+        return np.arange(since, len(store))
+    dates = store.array("Order_Date")
+    return np.flatnonzero(dates >= dates.max() - np.timedelta64(window_days, "D"))
+
+
+def split_recent(store, rows, holdout=HOLDOUT):
+    """(fit rows, holdout rows): the latest `holdout` fraction of `rows` by
+    Order_Date is held out."""
+    order = np.argsort(store.array("Order_Date")[rows], kind="stable")
+    n_out = max(math.ceil(len(rows) * holdout), 1)
+    return np.sort(rows[order[:-n_out]]), np.sort(rows[order[-n_out:]])
+
+
+def fit(mode, current, X, y, rounds=ROUNDS, n_jobs=None):
+    """Candidate model: `current` boosted `rounds` more trees (warm) or a
+    fresh XGBoost with the notebook's settings (window)."""
+    import pandas as pd
+
+    from .features import SAFE_COLS
+
+    n_jobs = n_jobs or os.cpu_count()
+    if mode == "warm":
+        from xgboost import XGBClassifier
+
+        # A booster fitted on a DataFrame (as in the notebook) only continues
+        # on data with the same feature names.
+        names = current.get_booster().feature_names
+        if names:
+            X = pd.DataFrame(X, columns=names, copy=False)
+        params = dict(current.get_params(), n_estimators=rounds, n_jobs=n_jobs)
+        model = XGBClassifier(**params)
+        model.fit(X, y, xgb_model=current.get_booster())
+    else:
+        from .training import MODELS
+
+        model = MODELS["XGBoost"][0](n_jobs)
+        model.fit(pd.DataFrame(X, columns=SAFE_COLS, copy=False), y)
+    return model
+
+
+def _auc(model, X, y):
+    from sklearn.metrics import roc_auc_score
+
+    if len(np.unique(y)) < 2:
+        return None
+    return round(float(roc_auc_score(y, model.predict_proba(X)[:, 1])), 5)
+
+
+def retrain(mode="warm", store_path=DATASET_STORE, new=None,
+            model_path=MODEL_PATH, preprocess_path=PREPROCESS_PATH,
+            rounds=ROUNDS, window_days=WINDOW_DAYS, holdout=HOLDOUT,
+            max_auc_drop=MAX_AUC_DROP, force=False, dry_run=False,
+            log_path=RETRAIN_LOG, refit=False):
+    """Run one retrain and return its log entry (also appended to
+    `log_path`)."""
+    import joblib
+
+    from . import dataset, serving
+    from .training import load_xy, save_model
+
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+    seconds = {}
+    t0 = time.perf_counter()
+    if new is not None:
+        with _stage(seconds, "append"):
+            dataset.append(new, store_path)
+    if not dataset.is_store(store_path):
+        raise FileNotFoundError(f"no column store at {store_path}")
+    store = dataset.ColumnStore(store_path)
+
+    with _stage(seconds, "load"):
+        since = _last_trained(store, log_path)
+        rows = select_rows(store, mode, since, window_days)
+        if len(rows) < 2:
+            raise ValueError(f"only {len(rows)} rows to train on in {mode} mode; "
+                             f"append new shipments first")
+        fit_rows, out_rows = split_recent(store, rows, holdout)
+        pre = serving.get_preprocessor(preprocess_path)
+        _, X_fit, y_fit = load_xy(store_path, pre, fit_rows)
+        _, X_out, y_out = load_xy(store_path, pre, out_rows)
+        current = joblib.load(model_path)
+
+    with _stage(seconds, "fit"):
+        model = fit(mode, current, X_fit, y_fit, rounds)
+
+    with _stage(seconds, "validate"):
+        auc_current = _auc(current, X_out, y_out)
+        auc_candidate = _auc(model, X_out, y_out)
+
+    if force:
+        accepted, reason = True, "forced"
+    elif auc_candidate is None:
+        accepted, reason = False, "holdout has a single class"
+    elif auc_candidate < auc_current - max_auc_drop:
+        accepted, reason = False, (f"holdout AUC {auc_candidate:.4f} < "
+                                   f"{auc_current:.4f} - {max_auc_drop}")
+    else:
+        accepted, reason = True, "holdout AUC within bounds"
+    if dry_run:
+        accepted, reason = False, f"dry run ({reason})"
+    auc_refit = None
+    if accepted and refit:
+        with _stage(seconds, "refit"):
+            refitted = fit(mode, current, np.concatenate([X_fit, X_out]),
+                           np.concatenate([y_fit, y_out]), rounds)
+            auc_refit = _auc(refitted, X_out, y_out)
+        if auc_refit is not None and auc_refit >= auc_current - max_auc_drop:
+            model, reason = refitted, f"{reason}, refit on all rows"
+        else:
+            reason = f"{reason}, refit failed the holdout check"
+    if accepted:
+        with _stage(seconds, "publish"):
+            save_model(model, model_path)
+
+    entry = {
+        "at": time.time(),
+        "mode": mode,
+        "store": str(store.path),
+        "store_rows": len(store),
+        "train_rows": len(fit_rows),
+        "holdout_rows": len(out_rows),
+        "n_estimators": model.get_booster().num_boosted_rounds(),
+        "auc_current": auc_current,
+        "auc_candidate": auc_candidate,
+        "auc_refit": auc_refit,
+        "accepted": accepted,
+        "reason": reason,
+        "model": str(model_path),
+        "seconds": seconds,
+        "total_seconds": round(time.perf_counter() - t0, 3),
+    }
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a") as fh:
+        fh.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def _fmt_auc(auc):
+    return "   -  " if auc is None else f"{auc:.4f}"
+
+
+def print_history(log_path=RETRAIN_LOG):
+    entries = history(log_path)
+    if not entries:
+        print(f"no retrains logged in {log_path}")
+        return
+    print(f"{'when':<16} {'mode':<6} {'history':>11} {'trained':>9} "
+          f"{'fit s':>7} {'total s':>8} {'AUC now':>7} {'AUC new':>7}  result")
+    for e in entries:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["at"]))
+        print(f"{when:<16} {e['mode']:<6} {e['store_rows']:>11,} "
+              f"{e['train_rows']:>9,} {e['seconds'].get('fit', 0):>7.1f} "
+              f"{e['total_seconds']:>8.1f} {_fmt_auc(e['auc_current']):>7} "
+              f"{_fmt_auc(e['auc_candidate']):>7}  "
+              f"{'replaced' if e['accepted'] else 'kept'}: {e['reason']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.retrain",
+        description="Retrain the delay model on the column store and replace "
+                    "it if it holds up on recent orders.")
+    ap.add_argument("--mode", choices=MODES, default="warm")
+    ap.add_argument("--new", help="CSV of newly labeled shipments to append "
+                                  "to the store first")
+    ap.add_argument("--store", default=str(DATASET_STORE))
+    ap.add_argument("--model", default=str(MODEL_PATH))
+    ap.add_argument("--preprocess", default=str(PREPROCESS_PATH))
+    ap.add_argument("--rounds", type=int, default=ROUNDS,
+                    help="trees added by a warm start")
+    ap.add_argument("--window-days", type=int, default=WINDOW_DAYS)
+    ap.add_argument("--holdout", type=float, default=HOLDOUT,
+                    help="most recent fraction of the rows kept for validation")
+    ap.add_argument("--max-auc-drop", type=float, default=MAX_AUC_DROP)
+    ap.add_argument("--force", action="store_true",
+                    help="replace the model whatever the holdout says")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="train and validate but keep the current model")
+    ap.add_argument("--refit", action="store_true",
+                    help="once accepted, fit again on the holdout rows too "
+                         "and publish that model if it still passes")
+    ap.add_argument("--log-file", default=str(RETRAIN_LOG))
+    ap.add_argument("--log", action="store_true",
+                    help="list past retrains and exit")
+    args = ap.parse_args(argv)
+
+    if args.log:
+        print_history(args.log_file)
+        return
+    try:
+        e = retrain(args.mode, args.store, args.new, args.model,
+                    args.preprocess, args.rounds, args.window_days,
+                    args.holdout, args.max_auc_drop, args.force, args.dry_run,
+                    args.log_file, args.refit)
+    except (FileNotFoundError, ValueError) as exc:
+        raise SystemExit(str(exc))
+    stages = ", ".join(f"{k} {v:.1f} s" for k, v in e["seconds"].items())
+    print(f"{e['mode']}: {e['train_rows']:,} rows trained, "
+          f"{e['holdout_rows']:,} held out of {e['store_rows']:,}; "
+          f"holdout AUC {_fmt_auc(e['auc_current'])} -> "
+          f"{_fmt_auc(e['auc_candidate'])}")
+    print(f"{'replaced ' + e['model'] if e['accepted'] else 'kept the model'}"
+          f" ({e['reason']}) in {e['total_seconds']:.1f} s: {stages}")
+
+
+if __name__ == "__main__":
+    main()
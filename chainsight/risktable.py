@@ -0,0 +1,357 @@
+"""
+Lane-level risk table: the model precomputed on a dense grid.
+
+Much of the variation in delay risk comes from the lane, i.e. the
+combination of origin, destination, route type, transport mode and product
+category (6 × 6 × 5 × 2 × 7 = 2,520 with the shipped vocabulary).  Shipping
+cost and order weight weigh the most on top of it, mostly through their
+ratio, then the base lead time, the schedule buffer (scheduled minus base
+lead time) and the two risk indices.  `build` scores every lane at every
+point of a grid over those five (GRID, densest along cost per kg) through
+chainsight.parallel, with the remaining features, the weight among them,
+held at reference values (their medians in the dataset), and stores the
+probabilities as one float16 n-d array.
+
+A lookup indexes the array by the lane codes and interpolates multilinearly
+between the 2**5 surrounding grid points: 32 gathers, whatever the number of
+lanes or rows scored before.  The CLI reports the error against the exact
+model on real rows (--interpolation adds the error with the reference
+values substituted, i.e. of the interpolation alone):
+
+    python -m chainsight.risktable            # writes chainsight_risktable.npz
+"""
+
+import argparse
+import itertools
+import math
+import time
+from bisect import bisect_right
+from pathlib import Path
+
+import numpy as np
+
+from .config import DATASET_PATH, DATASET_STORE, MODEL_PATH, RISK_TABLE_PATH
+from .features import CAT_COLS, SAFE_COLS
+
+BUFFER = "Lead_Buffer_Days"         # Scheduled_Lead_Time_Days - Base_Lead_Time_Days
+COST_PER_KG = "Cost_Per_Kg"         # Shipping_Cost_USD / Order_Weight_Kg
+GRID = {
+    "Base_Lead_Time_Days":     (2, 14, 35),
+    BUFFER:                    (0, 4),
+    "Geopolitical_Risk_Index": (0.1, 0.3, 0.5, 0.7, 0.9),
+    "Weather_Severity_Index":  (0, 3, 6, 10),
+    COST_PER_KG:               (0.1, 0.35, 0.5, 0.6, 0.7, 0.8, 0.9, 1, 1.15,
+                                1.3, 1.5, 1.75, 2, 2.5, 3.3, 5, 8, 12, 25, 100),
+}
+CHUNK_CELLS = 1 << 20               # grid rows encoded per step
+REPORT_ROWS = 200_000
+
+
+class RiskTable:
+
+    def __init__(self, prob, columns, vocab, grid, reference, source_digest=""):
+        """`prob` is shaped (vocab sizes in CAT_COLS order, grid sizes in GRID
+        order); `reference` holds the value of every other model column."""
+        self.prob = np.asarray(prob, dtype=np.float16)
+        self.columns = list(columns)
+        self.vocab = {col: np.asarray(v, dtype=str) for col, v in vocab.items()}
+        self.grid = {name: np.asarray(v, dtype=np.float64)
+                     for name, v in grid.items()}
+        self.reference = {col: float(v) for col, v in reference.items()}
+        self.source_digest = source_digest
+        self._flat = self.prob.reshape(-1)
+        strides = np.array(self.prob.strides) // self.prob.itemsize
+        self._cat_strides = strides[:len(CAT_COLS)]
+        self._grid_strides = strides[len(CAT_COLS):]
+        # The 2**d corners of a grid cell: which axes step up, and the
+        # offset that adds.
+        self._corners = np.array(list(itertools.product(
+            (False, True), repeat=len(self.grid))))
+        self._corner_offsets = self._corners @ self._grid_strides
+        self._col = {col: j for j, col in enumerate(self.columns)}
+        self._cat_idx = [self._col[col] for col in CAT_COLS]
+        # Plain-Python copies for predict_row().
+        self._row_cats = list(zip(self._cat_idx, self._cat_strides.tolist()))
+        self._row_axes = [(points.tolist(), stride) for points, stride
+                          in zip(self.grid.values(), self._grid_strides.tolist())]
+        self._row_corners = list(zip(self._corners.tolist(),
+                                     self._corner_offsets.tolist()))
+
+    @property
+    def nbytes(self):
+        return self.prob.nbytes
+
+    # ─── persistence ─────────────────────────────────────────────────────────
+    def save(self, path=RISK_TABLE_PATH):
+        arrays = {f"vocab__{col}": v for col, v in self.vocab.items()}
+        arrays.update({f"grid__{name}": v for name, v in self.grid.items()})
+        with open(path, "wb") as fh:
+            np.savez(fh, prob=self.prob,
+                     columns=np.asarray(self.columns, dtype=str),
+                     grid_names=np.asarray(list(self.grid), dtype=str),
+                     ref_names=np.asarray(list(self.reference), dtype=str),
+                     ref_values=np.asarray(list(self.reference.values())),
+                     source_digest=np.asarray(self.source_digest), **arrays)
+
+    @classmethod
+    def load(cls, path=RISK_TABLE_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(npz["prob"], npz["columns"].tolist(),
+                       {col: npz[f"vocab__{col}"] for col in CAT_COLS},
+                       {name: npz[f"grid__{name}"]
+                        for name in npz["grid_names"].tolist()},
+                       dict(zip(npz["ref_names"].tolist(),
+                                npz["ref_values"].tolist())),
+                       str(npz["source_digest"]))
+
+    # ─── lookup ──────────────────────────────────────────────────────────────
+    def _axis_values(self, X):
+        base = X[:, self._col["Base_Lead_Time_Days"]]
+        for name in self.grid:
+            if name == BUFFER:
+                yield X[:, self._col["Scheduled_Lead_Time_Days"]] - base
+            elif name == COST_PER_KG:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    v = (X[:, self._col["Shipping_Cost_USD"]]
+                         / X[:, self._col["Order_Weight_Kg"]])
+                yield v
+            else:
+                yield X[:, self._col[name]]
+
+    def predict(self, X):
+        """Approximate delay probability of encoded rows (the Preprocessor's
+        columns, as for serving.predict_proba); NaN for unknown categories
+        or missing grid values.  Values outside the grid are clamped."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        codes = X[:, self._cat_idx]
+        ok = ~np.isnan(codes).any(axis=1)
+        offset = np.nan_to_num(codes).astype(np.int64) @ self._cat_strides
+
+        frac = np.empty((len(X), len(self.grid)))
+        for k, (points, v) in enumerate(zip(self.grid.values(),
+                                            self._axis_values(X))):
+            ok &= ~np.isnan(v)
+            i = np.clip(np.searchsorted(points, v, side="right") - 1,
+                        0, len(points) - 2)
+            frac[:, k] = np.clip((v - points[i]) / (points[i + 1] - points[i]),
+                                 0, 1)
+            offset += i * self._grid_strides[k]
+        frac = np.nan_to_num(frac)[:, None, :]
+        weight = np.where(self._corners, frac, 1 - frac).prod(axis=2)
+        values = self._flat[offset[:, None] + self._corner_offsets]
+        prob = np.einsum("ij,ij->i", weight, values)
+        return np.where(ok, prob, np.nan)
+
+    def predict_row(self, row):
+        """predict() for one encoded row, in plain Python: for single
+        lookups, where NumPy's per-call overhead would dominate."""
+        offset = 0
+        for j, stride in self._row_cats:
+            if row[j] != row[j]:
+                return math.nan
+            offset += int(row[j]) * stride
+        base = row[self._col["Base_Lead_Time_Days"]]
+        frac = []
+        for name, (points, stride) in zip(self.grid, self._row_axes):
+            if name == BUFFER:
+                v = row[self._col["Scheduled_Lead_Time_Days"]] - base
+            elif name == COST_PER_KG:
+                weight = row[self._col["Order_Weight_Kg"]]
+                v = (row[self._col["Shipping_Cost_USD"]] / weight
+                     if weight else math.inf)
+            else:
+                v = row[self._col[name]]
+            if v != v:
+                return math.nan
+            i = min(max(bisect_right(points, v) - 1, 0), len(points) - 2)
+            frac.append(min(max((v - points[i]) / (points[i + 1] - points[i]),
+                                0.0), 1.0))
+            offset += i * stride
+        prob = 0.0
+        for corner, corner_offset in self._row_corners:
+            weight = 1.0
+            for up, t in zip(corner, frac):
+                weight *= t if up else 1.0 - t
+            if weight:
+                prob += weight * self._flat.item(offset + corner_offset)
+        return prob
+
+    def lookup(self, shipment):
+        """Approximate delay probability of one raw shipment dict."""
+        from . import serving
+
+        return self.predict_row(
+            serving.get_preprocessor().transform_row(shipment))
+
+
+# ─── building ────────────────────────────────────────────────────────────────
+def reference_values(df, columns):
+    """Median of every model column outside the table's axes, from a frame
+    of reference shipments (encoded by the serving Preprocessor)."""
+    from . import serving
+
+    X = serving.get_preprocessor().transform(df)
+    fixed = [c for c in columns
+             if c not in CAT_COLS and c not in GRID
+             and c not in ("Scheduled_Lead_Time_Days", "Shipping_Cost_USD")]
+    return {c: float(np.nanmedian(X[:, columns.index(c)])) for c in fixed}
+
+
+def _grid_rows(table_shape, axes, columns, reference, start, stop):
+    """Encoded rows for the flat cells [start, stop) of the table."""
+    idx = np.unravel_index(np.arange(start, stop), table_shape)
+    X = np.empty((stop - start, len(columns)), dtype=np.float32)
+    for col, value in reference.items():
+        X[:, columns.index(col)] = value
+    for k, col in enumerate(CAT_COLS):
+        X[:, columns.index(col)] = idx[k]
+    values = {name: points[idx[len(CAT_COLS) + k]]
+              for k, (name, points) in enumerate(axes.items())}
+    X[:, columns.index("Base_Lead_Time_Days")] = values["Base_Lead_Time_Days"]
+    X[:, columns.index("Scheduled_Lead_Time_Days")] = (
+        values["Base_Lead_Time_Days"] + values[BUFFER])
+    for name in ("Geopolitical_Risk_Index", "Weather_Severity_Index"):
+        X[:, columns.index(name)] = values[name]
+    X[:, columns.index("Shipping_Cost_USD")] = (
+        values[COST_PER_KG] * X[:, columns.index("Order_Weight_Kg")])
+    return X
+
+
+def build(reference, path=MODEL_PATH, grid=GRID, workers=None):
+    """Score the model at `path` on every lane × grid point; returns a
+    RiskTable.  `reference` is from reference_values()."""
+    from . import parallel, serving
+    from .trees import file_digest
+
+    pre = serving.get_preprocessor()
+    vocab = {col: pre.vocab[col] for col in CAT_COLS}
+    axes = {name: np.asarray(points, dtype=np.float64)
+            for name, points in grid.items()}
+    shape = tuple(len(v) for v in vocab.values()) + tuple(
+        len(v) for v in axes.values())
+    cells = int(np.prod(shape))
+
+    with parallel.scratch() as tmp:
+        x_file = Path(tmp) / "grid.npy"
+        X = np.lib.format.open_memmap(x_file, mode="w+", dtype=np.float32,
+                                      shape=(cells, len(pre.columns)))
+        for start in range(0, cells, CHUNK_CELLS):
+            stop = min(start + CHUNK_CELLS, cells)
+            X[start:stop] = _grid_rows(shape, axes, pre.columns, reference,
+                                       start, stop)
+        X.flush()
+        del X
+        prob = parallel.predict_proba(str(x_file), workers, path)
+    return RiskTable(prob.reshape(shape), pre.columns, vocab, axes,
+                     reference, file_digest(path))
+
+
+# ─── accuracy ────────────────────────────────────────────────────────────────
+def accuracy(table, X, path=MODEL_PATH):
+    """Error of the table against the exact model on encoded rows `X`.
+
+    "rows" is the error on the rows as they are; "grid" substitutes the
+    table's reference values first (keeping each row's cost per kg), so it
+    measures the interpolation alone.  Each gives the mean, p95 and max
+    absolute error in probability and the share of rows whose
+    LOW/MODERATE/HIGH level agrees.
+    """
+    from . import serving
+    from .batch import risk_levels
+
+    X = np.asarray(X, dtype=np.float32)
+    approx = table.predict(X)
+    fixed = X.copy()
+    for col, value in table.reference.items():
+        fixed[:, table.columns.index(col)] = value
+    if COST_PER_KG in table.grid:
+        cost = table.columns.index("Shipping_Cost_USD")
+        weight = table.columns.index("Order_Weight_Kg")
+        fixed[:, cost] = X[:, cost] / X[:, weight] * fixed[:, weight]
+    out = {}
+    for name, rows in (("rows", X), ("grid", fixed)):
+        exact = serving.predict_proba(rows, path)
+        ok = ~np.isnan(approx)
+        err = np.abs(approx[ok] - exact[ok])
+        out[name] = {
+            "rows":        int(ok.sum()),
+            "mean_abs":    float(err.mean()),
+            "p95_abs":     float(np.quantile(err, 0.95)),
+            "max_abs":     float(err.max()),
+            "level_agree": float(np.mean(risk_levels(approx[ok])
+                                         == risk_levels(exact[ok]))),
+        }
+    return out
+
+
+def _reference_frame(source, rows, seed=0):
+    """Up to `rows` shipments from `source` (column store or CSV), or
+    synthetic ones when there is no source."""
+    from . import dataset, synth
+
+    if source is None:
+        if dataset.is_store(DATASET_STORE):
+            source = DATASET_STORE
+        elif Path(DATASET_PATH).exists():
+            source = DATASET_PATH
+    if source is None:
+        return "synthetic", synth.generate(rows, seed).frame(SAFE_COLS)
+    df = dataset.read(source, SAFE_COLS)
+    if len(df) > rows:
+        df = df.sample(rows, random_state=seed)
+    return str(source), df
+
+
+def main(argv=None):
+    from . import serving
+
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.risktable",
+        description="Precompute the lane risk table and report its accuracy.")
+    ap.add_argument("--data", help="column store or CSV for the reference "
+                                   "values and the report (default: the "
+                                   "dataset, else synthetic shipments)")
+    ap.add_argument("--model", default=str(MODEL_PATH))
+    ap.add_argument("--out", default=str(RISK_TABLE_PATH))
+    ap.add_argument("--workers", type=int,
+                    help="scoring processes (default: one per CPU)")
+    ap.add_argument("--report-rows", type=int, default=REPORT_ROWS)
+    ap.add_argument("--interpolation", action="store_true",
+                    help="also report the error on the rows with the "
+                         "reference values substituted")
+    args = ap.parse_args(argv)
+
+    source, df = _reference_frame(args.data, args.report_rows)
+    pre = serving.get_preprocessor()
+    t0 = time.perf_counter()
+    table = build(reference_values(df, pre.columns), args.model,
+                  workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    table.save(args.out)
+    print(f"{table.prob.size:,} cells {table.prob.shape} scored in "
+          f"{elapsed:.1f} s -> {args.out} ({table.nbytes / 2**20:.1f} MB)")
+
+    X = pre.transform(df)
+    rows = X[:1000].tolist()
+    t0 = time.perf_counter()
+    for row in rows:
+        table.predict_row(row)
+    single = (time.perf_counter() - t0) / len(rows)
+    t0 = time.perf_counter()
+    table.predict(X)
+    batch = (time.perf_counter() - t0) / len(X)
+    print(f"lookup: {single * 1e6:.0f} µs for one row, "
+          f"{batch * 1e6:.2f} µs/row in a batch of {len(X):,}")
+    print(f"accuracy vs the exact model on {len(X):,} rows ({source}):")
+    print(f"  {'':<6} {'mean |err|':>10} {'p95':>8} {'max':>8} {'level agree':>12}")
+    for name, r in accuracy(table, X, args.model).items():
+        if name == "grid" and not args.interpolation:
+            continue
+        print(f"  {name:<6} {r['mean_abs']:>10.4f} {r['p95_abs']:>8.4f} "
+              f"{r['max_abs']:>8.4f} {r['level_agree']:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
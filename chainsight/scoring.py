@@ -0,0 +1,155 @@
+"""
+Single-shipment risk assessment shared by the Risk Predictor page and the
+HTTP API.
+
+A shipment is a dict keyed by the raw dataset column names (the sixteen
+model features, with the date parts optionally replaced by "Order_Date").
+assess() returns the model's delay probability together with the LOW /
+MODERATE / HIGH level and the factor breakdown the page draws as bars: the
+TreeSHAP contribution of each input, in log-odds, with the order-date parts
+summed into one factor.  The contributions and "baseline" (the model's
+average log-odds) add up to the log-odds of the prediction.  assess_many()
+does the same for a list with one predict call, and adds the shipments to
+the drift sketch (chainsight.drift).  Probabilities go through the
+prediction cache in chainsight.serving.  sweep() scores the what-if grid
+of routes, transport modes and scheduled lead times for one shipment.
+"""
+
+import time
+
+import numpy as np
+
+from . import drift, serving
+from .batch import LOW_RISK, risk_levels
+from .features import DATE_COLS
+
+# Risk Predictor field -> model features whose contributions it sums.
+FACTORS = {
+    "Origin City":         ["Origin_City"],
+    "Destination":         ["Destination_City"],
+    "Route Type":          ["Route_Type"],
+    "Transport Mode":      ["Transportation_Mode"],
+    "Product Category":    ["Product_Category"],
+    "Base Lead Time":      ["Base_Lead_Time_Days"],
+    "Scheduled Lead Time": ["Scheduled_Lead_Time_Days"],
+    "Geopolitical Risk":   ["Geopolitical_Risk_Index"],
+    "Weather Severity":    ["Weather_Severity_Index"],
+    "Inflation Rate":      ["Inflation_Rate_Pct"],
+    "Shipping Cost":       ["Shipping_Cost_USD"],
+    "Order Weight":        ["Order_Weight_Kg"],
+    "Order Date":          DATE_COLS,
+}
+
+
+def factor_matrix(contrib):
+    """(n, len(FACTORS)) factor contributions from serving.explain() rows."""
+    columns = serving.get_preprocessor().columns
+    contrib = np.asarray(contrib)
+    return np.column_stack([
+        contrib[:, [columns.index(c) for c in cols]].sum(axis=1)
+        for cols in FACTORS.values()])
+
+
+def factors(contrib):
+    """{factor: log-odds contribution} for one serving.explain() row,
+    largest effect first, for the RISK FACTOR BREAKDOWN bars."""
+    values = factor_matrix(np.reshape(contrib, (1, -1)))[0]
+    return {name: round(float(v), 4)
+            for name, v in sorted(zip(FACTORS, values),
+                                  key=lambda kv: -abs(kv[1]))}
+
+
+def encode(shipment):
+    """Feature row for one shipment.
+
+    Raises ValueError naming the field when a value is missing or not a
+    number, so callers can report it back as a bad request.
+    """
+    try:
+        return serving.get_preprocessor().transform_row(shipment)
+    except KeyError as exc:
+        raise ValueError(f"missing field: {exc.args[0]}") from None
+
+
+def result(prob, contrib=None):
+    """Assessment dict from a delay probability and, unless None, its
+    serving.explain() row."""
+    out = {"delay_probability": round(float(prob), 4),
+           "risk_pct": round(float(prob) * 100),
+           "risk_level": str(risk_levels(prob))}
+    if contrib is not None:
+        out["baseline"] = round(float(contrib[-1]), 4)
+        out["factors"] = factors(contrib)
+    return out
+
+
+def assess_many(shipments, explain=True):
+    """Risk assessment dicts for a list of shipments, scored in one call;
+    `explain=False` leaves out the factor breakdown."""
+    shipments = list(shipments)
+    if not shipments:
+        return []
+    rows = [encode(s) for s in shipments]
+    drift.record(rows)
+    probs = serving.predict_cached(rows)
+    contribs = serving.explain(rows) if explain else [None] * len(rows)
+    return [result(p, c) for p, c in zip(probs, contribs)]
+
+
+def assess(shipment):
+    """Risk assessment dict for a single shipment."""
+    return assess_many([shipment])[0]
+
+
+# ─── what-if sweep ───────────────────────────────────────────────────────────
+SWEEP_ROUTES = ["Pacific", "Atlantic", "Suez", "Intra-Asia", "Commodity"]
+SWEEP_MODES  = ["Sea", "Air"]
+MAX_LEAD     = 70                   # the Risk Predictor's upper bound
+
+
+def sweep(shipment, routes=SWEEP_ROUTES, modes=SWEEP_MODES, leads=None):
+    """Delay probability of every route × mode × scheduled-lead variant.
+
+    `leads` defaults to every whole day from the base lead time to MAX_LEAD.
+    The grid is encoded from one row per (route, mode) with the lead column
+    filled in, and scored in a single call.  Returns a dict with the axes,
+    "probability" shaped (routes, modes, leads), the cheapest LOW-risk
+    variant (see cheapest_low) and the time taken.
+    """
+    t0 = time.perf_counter()
+    if leads is None:
+        leads = range(int(float(shipment["Base_Lead_Time_Days"])), MAX_LEAD + 1)
+    leads = np.asarray(leads, dtype=np.float32)
+    base = np.asarray([encode(dict(shipment, Route_Type=r,
+                                   Transportation_Mode=m))
+                       for r in routes for m in modes], dtype=np.float32)
+    X = np.repeat(base, len(leads), axis=0)
+    column = serving.get_preprocessor().columns.index(
+        "Scheduled_Lead_Time_Days")
+    X[:, column] = np.tile(leads, len(base))
+    prob = serving.get_scorer().obj.predict_proba(X)[:, 1]
+    prob = prob.reshape(len(routes), len(modes), len(leads))
+    out = {"routes": list(routes), "modes": list(modes),
+           "leads": [int(v) for v in leads], "probability": prob}
+    out["cheapest_low"] = cheapest_low(out, shipment)
+    out["seconds"] = time.perf_counter() - t0
+    return out
+
+
+def cheapest_low(grid, shipment):
+    """The cheapest variant of a sweep() grid that is LOW risk, or None.
+
+    Cheapest means staying on sea freight if any sea option is LOW, then the
+    shortest scheduled lead time, then keeping the shipment's own route.
+    """
+    r, m, k = np.nonzero(grid["probability"] <= LOW_RISK)
+    if len(r) == 0:
+        return None
+    options = [(grid["modes"][mi] != "Sea", grid["leads"][ki],
+                grid["routes"][ri] != shipment["Route_Type"], ri, mi, ki)
+               for ri, mi, ki in zip(r, m, k)]
+    *_, ri, mi, ki = min(options)
+    return {"route": grid["routes"][ri], "mode": grid["modes"][mi],
+            "scheduled_lead": grid["leads"][ki],
+            "delay_probability": round(float(
+                grid["probability"][ri, mi, ki]), 4)}
@@ -0,0 +1,165 @@
+"""
+Process-wide cache for the pickled XGBoost model, its compiled NumPy copy
+and its preprocessing artifact.
+
+Streamlit re-executes app.py on every interaction, but imported modules live
+as long as the server process, so the booster held here is deserialized once
+and shared by every session.  Each lookup stats the file and reloads it when
+its mtime or size changes, so a new model can be dropped in without a restart
+(see chainsight.filecache).
+
+When `python -m chainsight.trees` has compiled the current model, small
+batches (the Risk Predictor, single API calls) are scored by the NumPy
+evaluator and xgboost is only imported for large batches, if at all.
+Explanations come from a chainsight.explain.PathExplainer built from the
+same trees.
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+
+from .config import (COMPILED_MAX_ROWS, DRIFT_REFERENCE_PATH, MODEL_PATH,
+                     PREPROCESS_PATH, RISK_TABLE_PATH)
+from .drift import Sketch
+from .explain import PathExplainer
+from .filecache import cached, peek
+from .predcache import PredictionCache
+from .preprocess import Preprocessor
+from .risktable import RiskTable
+from . import trees
+from .trees import TreeEnsemble, compiled_path, file_digest
+
+_DEFAULT_PREPROCESSOR = Preprocessor.default()
+
+predictions = PredictionCache()
+
+_HAVE_XGBOOST = importlib.util.find_spec("xgboost") is not None
+
+
+def _unpickle(path):
+    import joblib                           # ~70 ms; only the pickle needs it
+    return joblib.load(path)
+
+
+def get_model(path=MODEL_PATH):
+    """Loaded entry holding the XGBClassifier unpickled from `path`."""
+    return cached(path, _unpickle)
+
+
+def get_compiled(path=MODEL_PATH):
+    """Loaded entry holding the TreeEnsemble compiled from the model at `path`.
+
+    None when there is no compiled file or it was compiled from a different
+    pickle, so a freshly dropped-in model is never answered by the trees of
+    the old one.  The pickle's digest is recomputed only when it changes.
+    """
+    compiled_file = compiled_path(path)
+    if not os.path.exists(compiled_file):
+        return None
+    compiled = cached(compiled_file, trees.load)
+    if compiled.obj.source_digest != cached(path, file_digest).obj:
+        return None
+    return compiled
+
+
+def get_scorer(path=MODEL_PATH):
+    """The compiled model when it is current, otherwise the pickled one."""
+    return get_compiled(path) or get_model(path)
+
+
+def peek_scorer(path=MODEL_PATH):
+    """The entry get_scorer() last returned if this process has loaded the
+    model already, else None; never loads or even stats a file."""
+    return (peek(compiled_path(path), trees.load)
+            or peek(path, _unpickle))
+
+
+def _explainer_from_trees(path):
+    return PathExplainer(trees.load(path))
+
+
+def _explainer_from_model(path):
+    return PathExplainer(TreeEnsemble.from_model(get_model(path).obj))
+
+
+def get_explainer(path=MODEL_PATH):
+    """Loaded entry holding the PathExplainer of the model served from `path`.
+
+    Built from the compiled file when it is current, otherwise from the
+    pickle, and rebuilt whenever that file changes.
+    """
+    compiled = get_compiled(path)
+    if compiled is not None:
+        return cached(compiled.path, _explainer_from_trees)
+    return cached(path, _explainer_from_model)
+
+
+def get_risk_table(path=MODEL_PATH, table=RISK_TABLE_PATH):
+    """Loaded entry holding the RiskTable precomputed from the model at
+    `path`; None when there is none or it was built from another pickle,
+    like get_compiled()."""
+    if not os.path.exists(table):
+        return None
+    loaded = cached(table, RiskTable.load)
+    if loaded.obj.source_digest != cached(path, file_digest).obj:
+        return None
+    return loaded
+
+
+def get_drift_reference(path=DRIFT_REFERENCE_PATH):
+    """Sketch of the training data written by `python -m chainsight.drift`,
+    or None when there is none yet."""
+    if not os.path.exists(path):
+        return None
+    return cached(path, Sketch.load).obj
+
+
+def get_preprocessor(path=PREPROCESS_PATH):
+    """Fitted Preprocessor saved next to the model.
+
+    Falls back to the shipped model's built-in vocabulary when no artifact
+    has been written yet.
+    """
+    if not os.path.exists(path):
+        return _DEFAULT_PREPROCESSOR
+    return cached(path, Preprocessor.load).obj
+
+
+def predict_proba(rows, path=MODEL_PATH, compiled=True):
+    """Delay probability (class 1) for a 2-D array of encoded feature rows.
+
+    compiled=False keeps small batches on the xgboost model too (when it is
+    installed), for blocks that must match scoring their whole batch at once.
+    """
+    X = np.asarray(rows, dtype=np.float32)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if not _HAVE_XGBOOST or compiled and len(X) <= COMPILED_MAX_ROWS:
+        compiled = get_compiled(path)
+        if compiled is not None:
+            return compiled.obj.predict_proba(X)[:, 1]
+    return get_model(path).obj.predict_proba(X)[:, 1]
+
+
+def explain(rows, path=MODEL_PATH):
+    """Per-feature log-odds contributions, (n, features + 1) with the bias
+    last; see chainsight.explain."""
+    return get_explainer(path).obj.shap_values(rows)
+
+
+def model_version(path=MODEL_PATH):
+    """Identity of the model currently served from `path`."""
+    loaded = get_scorer(path)
+    return (loaded.path, loaded.version)
+
+
+def predict_cached(rows, path=MODEL_PATH):
+    """predict_proba through the prediction cache.
+
+    Meant for interactive scoring where the same shipments recur; bulk
+    scoring of files should call predict_proba directly.
+    """
+    return predictions.predict(rows, model_version(path),
+                               lambda X: predict_proba(X, path))
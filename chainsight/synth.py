@@ -0,0 +1,323 @@
+"""
+Seeded synthetic shipments for scale and load testing.
+
+Reproduces the schema of the 10,000-shipment sample: six origin/destination
+lanes over the five route types, Sea and Air with lane-specific base lead
+times, the seven product categories, the risk indices, costs and dates.
+Whether a shipment is late follows a logistic model of its lane, product,
+mode, risk indices and schedule slack, calibrated to the sample's 12.5%
+delay rate; late shipments draw their delay from the sample's histogram and
+a disruption from its mix.
+
+Rows are generated in fixed blocks, each from its own seeded generator, so
+row i is the same whatever the table size, and are written straight into
+the chainsight.dataset column store:
+
+    python -m chainsight.synth 10000000 data/shipments_10m
+    python -m chainsight.synth 100000 shipments_100k.csv     # raw CSV
+"""
+
+import argparse
+import functools
+import time
+from pathlib import Path
+
+import numpy as np
+
+from . import dataset
+from .features import DATE_COLS, VOCAB
+
+BLOCK_ROWS = 1 << 17
+FIRST_DAY = np.datetime64("2024-01-01")
+DAYS = 731                                  # 2024-01-01 .. 2025-12-31
+
+LANES = {       # origin -> (destination, route, Sea days, Air days)
+    "Hamburg, DE":  ("New York, US",    "Atlantic",   12, 3),
+    "Mumbai, IN":   ("Felixstowe, UK",  "Suez",       24, 4),
+    "Santos, BR":   ("Shanghai, CN",    "Commodity",  35, 5),
+    "Shanghai, CN": ("Los Angeles, US", "Pacific",    18, 3),
+    "Shenzhen, CN": ("Rotterdam, NL",   "Suez",       28, 3),
+    "Tokyo, JP":    ("Singapore, SG",   "Intra-Asia",  7, 2),
+}
+AIR_SHARE = 0.18
+SEA_USD_PER_KG, AIR_USD_PER_KG = 0.9, 8.0
+
+# Odds multipliers of being late, from the sample's mean delay per origin,
+# product and mode.
+ORIGIN_RISK = {"Hamburg, DE": 0.72, "Mumbai, IN": 1.22, "Santos, BR": 1.30,
+               "Shanghai, CN": 0.98, "Shenzhen, CN": 1.05, "Tokyo, JP": 0.88}
+PRODUCT_RISK = {"Automotive": 0.91, "Consumer Electronics": 1.07,
+                "Perishables": 1.28, "Pharmaceuticals": 0.98,
+                "Raw Materials": 0.78, "Semiconductors": 1.14,
+                "Textiles": 0.85}
+MODE_RISK = {"Air": 0.62, "Sea": 1.12}
+GEO_WEIGHT = 2.0            # log-odds across the index's 0.1–0.9 range
+WEATHER_WEIGHT = 1.5        # log-odds across 0–10
+SLACK_WEIGHT = 0.4          # log-odds per day of schedule buffer
+DELAY_RATE = 0.125
+
+# Late shipments: the sample's counts of 1..14 delay days, then 15 or more
+# (spread evenly over 15..20), and its disruption mix.
+DELAY_CNTS = [362, 185, 148, 112, 89, 72, 58, 45, 38, 30, 24, 19, 14, 11, 40]
+DISRUPT_CNTS = {"Extreme Weather": 115, "Geopolitical Conflict": 312,
+                "Port Congestion": 820}
+
+# Column -> (store kind, dtype, labels), in the raw CSV's column order.
+# The dtypes are the ones chainsight.dataset.ingest picks for this data.
+SCHEMA = {
+    "Order_ID":                 ("str",  "S12", None),
+    "Order_Date":               ("date", "M8[D]", None),
+    "Origin_City":              ("cat",  "i1", VOCAB["Origin_City"]),
+    "Destination_City":         ("cat",  "i1", VOCAB["Destination_City"]),
+    "Route_Type":               ("cat",  "i1", VOCAB["Route_Type"]),
+    "Transportation_Mode":      ("cat",  "i1", VOCAB["Transportation_Mode"]),
+    "Product_Category":         ("cat",  "i1", VOCAB["Product_Category"]),
+    "Base_Lead_Time_Days":      ("num",  "i1", None),
+    "Scheduled_Lead_Time_Days": ("num",  "i1", None),
+    "Actual_Lead_Time_Days":    ("num",  "i1", None),
+    "Delay_Days":               ("num",  "i1", None),
+    "Delivery_Status":          ("cat",  "i1", ["Delayed", "On Time"]),
+    "Disruption_Event":         ("cat",  "i1", sorted(DISRUPT_CNTS)),
+    "Geopolitical_Risk_Index":  ("num",  "f8", None),
+    "Weather_Severity_Index":   ("num",  "f8", None),
+    "Inflation_Rate_Pct":       ("num",  "f8", None),
+    "Shipping_Cost_USD":        ("num",  "f8", None),
+    "Order_Weight_Kg":          ("num",  "i2", None),
+    "Mitigation_Action_Taken":  ("cat",  "i1", ["Standard Shipping"]),
+    "Order_Year":               ("num",  "i2", None),
+    "Order_Month":              ("num",  "i1", None),
+    "Order_Day":                ("num",  "i1", None),
+    "Order_DayOfweek":          ("num",  "i1", None),
+}
+
+# Per-origin lookups, indexed by the origin's code (VOCAB order).
+_ORIGINS = VOCAB["Origin_City"]
+_DEST = np.array([VOCAB["Destination_City"].index(LANES[o][0])
+                  for o in _ORIGINS], dtype=np.int8)
+_ROUTE = np.array([VOCAB["Route_Type"].index(LANES[o][1]) for o in _ORIGINS],
+                  dtype=np.int8)
+_SEA_DAYS = np.array([LANES[o][2] for o in _ORIGINS], dtype=np.int8)
+_AIR_DAYS = np.array([LANES[o][3] for o in _ORIGINS], dtype=np.int8)
+_ORIGIN_LOGODDS = np.log([ORIGIN_RISK[o] for o in _ORIGINS])
+_PRODUCT_LOGODDS = np.log([PRODUCT_RISK[p] for p in VOCAB["Product_Category"]])
+_MODE_LOGODDS = np.log([MODE_RISK[m] for m in VOCAB["Transportation_Mode"]])
+_AIR, _SEA = (VOCAB["Transportation_Mode"].index(m) for m in ("Air", "Sea"))
+# Cumulative shares, to draw from with one searchsorted.
+_DELAY_CDF = np.cumsum(DELAY_CNTS)[:-1] / sum(DELAY_CNTS)
+_DISRUPT_CDF = (np.cumsum([DISRUPT_CNTS[e] for e in sorted(DISRUPT_CNTS)])[:-1]
+                / sum(DISRUPT_CNTS.values()))
+# Four hex digits of every 16-bit value as one 4-byte word, and the date
+# features of every day.
+_HEX4 = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)[
+    (np.arange(1 << 16)[:, None] >> np.array([12, 8, 4, 0])) & 15
+].copy().view(np.uint32).ravel()
+_ORD = np.frombuffer(b"ORD-", dtype=np.uint32)[0]
+_CALENDAR = FIRST_DAY + np.arange(DAYS)
+_DATE_PARTS = {
+    "Order_Year":      _CALENDAR.astype("M8[Y]").astype(np.int64) + 1970,
+    "Order_Month":     _CALENDAR.astype("M8[M]").astype(np.int64) % 12 + 1,
+    "Order_Day":       (_CALENDAR - _CALENDAR.astype("M8[M]")).astype(np.int64) + 1,
+    "Order_DayOfweek": (_CALENDAR.astype(np.int64) + 3) % 7,  # 1970-01-01: Thu
+}
+
+
+# ─── generation ──────────────────────────────────────────────────────────────
+def _features(rng, n):
+    """Everything known when the order is placed, plus its late log-odds."""
+    origin = rng.integers(0, len(_ORIGINS), n, dtype=np.int8)
+    mode = np.where(rng.random(n) < AIR_SHARE, _AIR, _SEA).astype(np.int8)
+    product = rng.integers(0, len(_PRODUCT_LOGODDS), n, dtype=np.int8)
+    base = np.where(mode == _AIR, _AIR_DAYS[origin], _SEA_DAYS[origin])
+    slack = rng.integers(1, 4, n, dtype=np.int8)
+    geo = rng.integers(10, 91, n) / 100
+    weather = rng.integers(0, 101, n) / 10
+    weight = rng.integers(100, 10_000, n, dtype=np.int16)
+    usd_per_kg = np.where(mode == _AIR, AIR_USD_PER_KG, SEA_USD_PER_KG)
+    cols = {
+        "Order_Date":               rng.integers(0, DAYS, n, dtype=np.int16),
+        "Origin_City":              origin,
+        "Destination_City":         _DEST[origin],
+        "Route_Type":               _ROUTE[origin],
+        "Transportation_Mode":      mode,
+        "Product_Category":         product,
+        "Base_Lead_Time_Days":      base,
+        "Scheduled_Lead_Time_Days": base + slack,
+        "Geopolitical_Risk_Index":  geo,
+        "Weather_Severity_Index":   weather,
+        "Inflation_Rate_Pct":       np.round(rng.normal(3.5, 1.2, n), 2),
+        "Shipping_Cost_USD":        np.round(weight * usd_per_kg
+                                             * rng.lognormal(0.0, 0.6, n), 2),
+        "Order_Weight_Kg":          weight,
+    }
+    logodds = (_ORIGIN_LOGODDS[origin] + _PRODUCT_LOGODDS[product]
+               + _MODE_LOGODDS[mode]
+               + GEO_WEIGHT * (geo - 0.5) / 0.8
+               + WEATHER_WEIGHT * (weather - 5.0) / 10.0
+               - SLACK_WEIGHT * (slack - 2))
+    return cols, logodds
+
+
+@functools.lru_cache(maxsize=None)
+def intercept():
+    """Log-odds offset giving DELAY_RATE on average (Newton's method on a
+    fixed sample)."""
+    _, z = _features(np.random.default_rng(0), 1 << 18)
+    b = np.log(DELAY_RATE / (1 - DELAY_RATE))
+    for _ in range(20):
+        p = 1 / (1 + np.exp(-(z + b)))
+        step = (p.mean() - DELAY_RATE) / np.mean(p * (1 - p))
+        b -= step
+        if abs(step) < 1e-9:
+            break
+    return float(b)
+
+
+def _order_ids(rows, seed):
+    """"ORD-" and eight hex digits, unique per seed: an odd multiplier makes
+    the row -> id map a bijection on 32 bits."""
+    h = (rows.astype(np.uint32) * np.uint32(0x9E3779B1)
+         + np.uint32(seed * 0x632BE5AB & 0xFFFFFFFF))
+    out = np.empty((len(h), 3), dtype=np.uint32)
+    out[:, 0] = _ORD
+    out[:, 1] = _HEX4[h >> 16]
+    out[:, 2] = _HEX4[h & 0xFFFF]
+    return out.view("S12").ravel()
+
+
+def block(seed, b):
+    """Columns of rows [b * BLOCK_ROWS, (b + 1) * BLOCK_ROWS) in store
+    representation (codes for categoricals, -1 = missing)."""
+    rng = np.random.default_rng([seed, b])
+    n = BLOCK_ROWS
+    cols, logodds = _features(rng, n)
+    late = rng.random(n) < 1 / (1 + np.exp(-(logodds + intercept())))
+    days = np.searchsorted(_DELAY_CDF, rng.random(n), side="right") + 1
+    days += np.where(days == len(DELAY_CNTS), rng.integers(0, 6, n), 0)
+    delay = np.where(late, days, 0)
+    base = cols["Base_Lead_Time_Days"]
+    sched = cols["Scheduled_Lead_Time_Days"]
+    on_time = np.clip(base + rng.integers(-1, 3, n), 1, sched)
+    event = np.searchsorted(_DISRUPT_CDF, rng.random(n), side="right")
+
+    cols["Order_ID"] = _order_ids(np.arange(b * n, (b + 1) * n), seed)
+    cols["Actual_Lead_Time_Days"] = np.where(late, sched + delay, on_time)
+    cols["Delay_Days"] = delay
+    cols["Delivery_Status"] = np.where(late, 0, 1)
+    cols["Disruption_Event"] = np.where(late, event, -1)
+    cols["Mitigation_Action_Taken"] = np.zeros(n, dtype=np.int8)
+    day = cols["Order_Date"]
+    cols["Order_Date"] = _CALENDAR[day]
+    for col, parts in _DATE_PARTS.items():
+        cols[col] = parts[day]
+    return cols
+
+
+def fill(arrays, seed=0, start=0, on_block=None):
+    """Generate rows [start, start + len) into `arrays` ({column: array},
+    e.g. memory maps); `on_block(rows_done)` is called after every block."""
+    n = len(next(iter(arrays.values())))
+    done = 0
+    while done < n:
+        b, offset = divmod(start + done, BLOCK_ROWS)
+        take = min(BLOCK_ROWS - offset, n - done)
+        cols = block(seed, b)
+        for col, arr in arrays.items():
+            arr[done:done + take] = cols[col][offset:offset + take]
+        done += take
+        if on_block is not None:
+            on_block(done)
+
+
+def _entry(col):
+    kind, dtype, labels = SCHEMA[col]
+    entry = {"kind": kind, "dtype": np.dtype(dtype).str}
+    if labels is not None:
+        entry["labels"] = len(labels)
+    return entry
+
+
+class SyntheticTable(dataset.ColumnStore):
+    """Synthetic rows [start, start + rows) in memory, with the ColumnStore
+    interface (frame(), array(), labels(), ShipmentIndex.from_store)."""
+
+    def __init__(self, rows, seed=0, start=0, columns=None):
+        self.path = None
+        self.columns = list(columns or SCHEMA)
+        self.meta = {"rows": rows, "seed": seed,
+                     "columns": {col: _entry(col) for col in self.columns}}
+        self._arrays = {col: np.empty(rows, dtype=SCHEMA[col][1])
+                        for col in self.columns}
+        fill(self._arrays, seed, start)
+
+    def array(self, col):
+        if col not in self._arrays:
+            raise KeyError(f"{col!r} is not a synthetic column")
+        return self._arrays[col]
+
+    def labels(self, col):
+        return np.array(SCHEMA[col][2], dtype=str)
+
+
+def generate(rows, seed=0):
+    """The first `rows` synthetic shipments as a SyntheticTable."""
+    return SyntheticTable(rows, seed)
+
+
+def write_store(out, rows, seed=0, on_block=None):
+    """Generate `rows` shipments straight into a column store at `out`,
+    swapped in when complete like dataset.ingest.  Returns the meta."""
+    tmp = dataset.staging(out)
+    arrays = {col: np.lib.format.open_memmap(tmp / f"{col}.npy", mode="w+",
+                                             dtype=dtype, shape=(rows,))
+              for col, (_, dtype, _) in SCHEMA.items()}
+    fill(arrays, seed, on_block=on_block)
+    for col, arr in arrays.items():
+        arr.flush()
+        if SCHEMA[col][2] is not None:
+            np.save(tmp / f"{col}.labels.npy", np.array(SCHEMA[col][2], dtype=str),
+                    allow_pickle=False)
+    del arrays
+    meta = {"rows": rows, "built_at": time.time(),
+            "source": f"chainsight.synth seed={seed}",
+            "columns": {col: _entry(col) for col in SCHEMA}}
+    dataset.publish(tmp, out, meta)
+    return meta
+
+
+def write_csv(path, rows, seed=0, chunksize=dataset.CHUNK_ROWS,
+              on_block=None):
+    """Write `rows` shipments as a raw CSV (without DATE_COLS), to benchmark
+    the CSV paths and ingestion itself."""
+    raw = [col for col in SCHEMA if col not in DATE_COLS]
+    for start in range(0, rows, chunksize):
+        df = SyntheticTable(min(chunksize, rows - start), seed, start,
+                            raw).frame()
+        df["Order_Date"] = df["Order_Date"].dt.strftime("%m/%d/%Y")
+        df.to_csv(path, mode="a" if start else "w", header=not start,
+                  index=False)
+        if on_block is not None:
+            on_block(start + len(df))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.synth",
+        description="Generate synthetic shipments into a column store or CSV.")
+    ap.add_argument("rows", type=int)
+    ap.add_argument("out", help="column store directory, or a .csv file")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    progress = lambda n: print(f"\r{n:,} rows", end="", flush=True)  # noqa: E731
+    t0 = time.perf_counter()
+    if ".csv" in Path(args.out).name:
+        write_csv(args.out, args.rows, args.seed, on_block=progress)
+    else:
+        write_store(args.out, args.rows, args.seed, on_block=progress)
+    elapsed = time.perf_counter() - t0
+    print(f"\r{args.rows:,} rows in {elapsed:.2f} s "
+          f"({args.rows / elapsed:,.0f} rows/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
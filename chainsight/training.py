@@ -0,0 +1,99 @@
+"""
+Training data and model definitions shared by the offline jobs.
+
+Reproduces the notebook's setup: the target is Delay_Days > 0, features are
+the 16 `safe_cols` encoded by a Preprocessor fitted on the dataset, and the
+80/20 split uses random_state 23.  MODELS holds the five classifiers with the
+notebook's hyperparameters; LR, SVM and KNN are trained on standardized
+features.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from . import dataset
+from .features import SAFE_COLS
+from .preprocess import RANDOM_STATE, TEST_SIZE, Preprocessor
+
+
+def _logistic_regression(n_jobs):
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(max_iter=5000, class_weight="balanced")
+
+
+def _random_forest(n_jobs):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(class_weight="balanced", n_estimators=300,
+                                  random_state=23, n_jobs=n_jobs)
+
+
+def _xgboost(n_jobs):
+    from xgboost import XGBClassifier
+    return XGBClassifier(eval_metric="logloss", scale_pos_weight=7,
+                         n_estimators=300, learning_rate=0.05, max_depth=6,
+                         random_state=23, n_jobs=n_jobs)
+
+
+def _svm(n_jobs):
+    from sklearn.svm import SVC
+    return SVC(kernel="rbf", probability=True, class_weight="balanced")
+
+
+def _knn(n_jobs):
+    from sklearn.neighbors import KNeighborsClassifier
+    return KNeighborsClassifier(n_neighbors=5, n_jobs=n_jobs)
+
+
+# Display name -> (factory(n_jobs), trained on scaled features)
+MODELS = {
+    "Logistic Regression": (_logistic_regression, True),
+    "Random Forest":       (_random_forest,       False),
+    "XGBoost":             (_xgboost,             False),
+    "SVM":                 (_svm,                 True),
+    "KNN":                 (_knn,                 True),
+}
+
+
+def load_xy(path, pre=None, rows=None):
+    """(Preprocessor, X, y) for a raw shipments CSV or column store.
+
+    Only the model's columns and Delay_Days are read, for `rows` (a slice or
+    index array; default: all).  A Preprocessor is fitted on the data unless
+    one is passed in.
+    """
+    df = dataset.read(path, SAFE_COLS + ["Delay_Days"], rows)
+    if pre is None:
+        pre = Preprocessor.fit(df)
+    X = pre.transform(df)
+    y = (df["Delay_Days"].to_numpy() > 0).astype(np.int8)
+    return pre, X, y
+
+
+def split(X, y):
+    """The notebook's train/test split: (x_train, x_test, y_train, y_test)."""
+    from sklearn.model_selection import train_test_split
+    return train_test_split(X, y, test_size=TEST_SIZE,
+                            random_state=RANDOM_STATE)
+
+
+def save_model(model, model_path):
+    """Pickle `model` to `model_path` and compile its trees next to it.
+
+    The pickle is written to a temp file and renamed into place, so a running
+    dashboard or API hot-reloads a complete model; until the compiled copy is
+    rewritten, its digest no longer matches and serving falls back to xgboost.
+    """
+    import joblib
+
+    from .trees import TreeEnsemble, compiled_path, file_digest
+
+    model_path = Path(model_path)
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = model_path.with_name(f".{model_path.name}.tmp")
+    joblib.dump(model, tmp)
+    os.replace(tmp, model_path)
+    trees = TreeEnsemble.from_model(model)
+    trees.source_digest = file_digest(model_path)
+    trees.save(compiled_path(model_path))
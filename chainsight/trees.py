@@ -0,0 +1,290 @@
+"""
+The XGBoost ensemble compiled to flat NumPy arrays.
+
+Scoring through the pickled XGBClassifier means importing xgboost (slow at
+dashboard start-up) and paying its per-call overhead, which dominates for
+the one-shipment requests the Risk Predictor and the API make.
+TreeEnsemble.from_booster() flattens every tree of the booster into contiguous per-node arrays — split
+feature, float32 threshold, left/right child, default direction for missing
+values and leaf value — with node ids global across trees and leaves
+pointing at themselves.  TreeEnsemble then advances every (row, tree) pair
+one level per step with a few fancy-indexing operations, so a batch is
+scored in `depth` vectorized steps whatever the number of trees.  Splits
+compare float32 values with `x < threshold` and send missing values down
+the default branch, exactly as xgboost does:
+
+    python -m chainsight.trees            # writes chainsight_trees.npz
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .config import MODEL_PATH, TREES_PATH
+
+BLOCK_ROWS = 4096           # rows per evaluation block (bounds the n×trees state)
+
+
+class TreeEnsemble:
+
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, depth, base_margin, source_digest="", tree_gain=None,
+                 cover=None, n_features=None):
+        """`source_digest` is file_digest() of the pickle the trees came from;
+        `tree_gain` is the summed split gain of each tree, `cover` the
+        training hessian sum reaching each node and `n_features` the width
+        of the model's input (for files written without it, the highest
+        feature split on, plus one)."""
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float32)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.base_margin = float(base_margin)
+        self.source_digest = str(source_digest)
+        self.tree_gain = (np.zeros(len(self.roots)) if tree_gain is None
+                          else np.asarray(tree_gain, dtype=np.float64))
+        self.cover = (np.ones(len(self.value), dtype=np.float32)
+                      if cover is None
+                      else np.ascontiguousarray(cover, dtype=np.float32))
+        self.n_features = int(self.feature.max() + 1 if n_features is None
+                              else n_features)
+        # children[2 * node + went_left]: one gather per level for both ways.
+        self._children = np.column_stack([self.right, self.left]).ravel()
+
+    # ─── construction ────────────────────────────────────────────────────────
+    @classmethod
+    def from_booster(cls, booster):
+        """Flatten an xgboost Booster (binary:logistic, numeric splits)."""
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"unsupported objective {objective!r}")
+        base_score = float(learner["learner_model_param"]["base_score"]
+                           .strip("[]"))
+        trees = learner["gradient_booster"]["model"]["trees"]
+
+        cols = {k: [] for k in ("feature", "threshold", "left", "right",
+                                "default_left", "value", "cover")}
+        roots, gains, depth, offset = [], [], 0, 0
+        for tree in trees:
+            if any(tree["split_type"]):
+                raise ValueError("categorical splits are not supported")
+            left = np.asarray(tree["left_children"], dtype=np.int64)
+            right = np.asarray(tree["right_children"], dtype=np.int64)
+            leaf = left < 0
+            ids = np.arange(len(left)) + offset
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            cols["feature"].append(np.where(leaf, 0, tree["split_indices"]))
+            cols["threshold"].append(np.where(leaf, 0, cond))
+            cols["left"].append(np.where(leaf, ids, left + offset))
+            cols["right"].append(np.where(leaf, ids, right + offset))
+            cols["default_left"].append(np.asarray(tree["default_left"], bool))
+            cols["value"].append(np.where(leaf, cond, 0))
+            cols["cover"].append(np.asarray(tree["sum_hessian"], np.float32))
+            depth = max(depth, _depth(left, right))
+            gains.append(float(np.sum(np.where(leaf, 0, tree["loss_changes"]))))
+            roots.append(offset)
+            offset += len(left)
+
+        return cls(**{k: np.concatenate(v) for k, v in cols.items()},
+                   roots=roots, depth=depth, tree_gain=gains,
+                   base_margin=math.log(base_score / (1 - base_score)),
+                   n_features=booster.num_features())
+
+    @classmethod
+    def from_model(cls, model):
+        return cls.from_booster(model.get_booster())
+
+    # ─── persistence ─────────────────────────────────────────────────────────
+    def save(self, path=TREES_PATH):
+        """Write the arrays; the file is replaced atomically."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "wb") as fh:
+            np.savez(fh, feature=self.feature, threshold=self.threshold,
+                     left=self.left, right=self.right,
+                     default_left=self.default_left, value=self.value,
+                     roots=self.roots, depth=self.depth,
+                     base_margin=self.base_margin,
+                     source_digest=self.source_digest,
+                     tree_gain=self.tree_gain, cover=self.cover,
+                     n_features=self.n_features)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=TREES_PATH):
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(**{k: npz[k] for k in npz.files})
+
+    # ─── evaluation ──────────────────────────────────────────────────────────
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def expected_value(self):
+        """Cover-weighted mean leaf value of each tree: its average
+        contribution to the margin over the training data."""
+        leaf = self.left == np.arange(len(self.left))
+        tree_of = np.searchsorted(self.roots, np.arange(len(self.value)),
+                                  side="right") - 1
+        weight = np.where(leaf, self.cover, 0).astype(np.float64)
+        return (np.bincount(tree_of, weight * self.value, self.n_trees)
+                / np.maximum(np.bincount(tree_of, weight, self.n_trees), 1e-12))
+
+    @property
+    def nbytes(self):
+        """Memory held by the node arrays."""
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.right, self.default_left,
+                                      self.value, self.cover, self.roots,
+                                      self._children))
+
+    def leaves(self, X):
+        """Leaf node id reached by every row in every tree, shape (n, trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        flat = X.ravel()
+        row_start = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        missing = bool(np.isnan(flat).any())
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.depth):
+            x = flat[row_start + self.feature[node]]
+            go_left = x < self.threshold[node]
+            if missing:
+                go_left |= np.isnan(x) & self.default_left[node]
+            node = self._children[2 * node + go_left]
+        return node
+
+    def margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        out = np.empty(len(X))
+        for i in range(0, len(X), BLOCK_ROWS):
+            leaves = self.leaves(X[i:i + BLOCK_ROWS])
+            out[i:i + BLOCK_ROWS] = self.value[leaves].sum(axis=1,
+                                                          dtype=np.float64)
+        return out + self.base_margin
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities, like XGBClassifier.predict_proba."""
+        p = 1.0 / (1.0 + np.exp(-self.margin(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+def load(path=TREES_PATH):
+    """TreeEnsemble or, for files written by chainsight.compact, the
+    CompactEnsemble stored at `path`."""
+    with np.load(path, allow_pickle=False) as npz:
+        compact = "thr_code" in npz.files
+    if compact:
+        from .compact import CompactEnsemble
+        return CompactEnsemble.load(path)
+    return TreeEnsemble.load(path)
+
+
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def compile_model(model_path=MODEL_PATH, out=None):
+    """Compile the pickle at `model_path` and save it; returns (ensemble, model)."""
+    import joblib
+
+    model = joblib.load(model_path)
+    ens = TreeEnsemble.from_model(model)
+    ens.source_digest = file_digest(model_path)
+    ens.save(out or compiled_path(model_path))
+    return ens, model
+
+
+def compiled_path(model_path=MODEL_PATH):
+    """Where the compiled copy of the model at `model_path` is kept."""
+    if Path(model_path) == Path(MODEL_PATH):
+        return TREES_PATH
+    return Path(model_path).with_name(Path(TREES_PATH).name)
+
+
+def _depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int64)
+    for i in range(len(left)):              # children always follow parents
+        if left[i] >= 0:
+            depth[left[i]] = depth[right[i]] = depth[i] + 1
+    return int(depth.max())
+
+
+def probe_rows(ensemble, n_features, n, seed=0):
+    """Rows that exercise every split: values drawn from each feature's
+    thresholds (the `<` boundary), uniform between its extreme thresholds,
+    and ~2% missing."""
+    rng = np.random.default_rng(seed)
+    internal = ensemble.left != np.arange(len(ensemble.left))
+    X = np.empty((n, n_features), dtype=np.float32)
+    for j in range(n_features):
+        thr = ensemble.threshold[internal & (ensemble.feature == j)]
+        if len(thr) == 0:
+            X[:, j] = rng.normal(size=n)
+            continue
+        exact = rng.random(n) < 0.5
+        X[:, j] = np.where(exact, rng.choice(thr, n),
+                           rng.uniform(thr.min() - 1, thr.max() + 1, n))
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return X
+
+
+def verify(ensemble, model, X):
+    """Largest absolute difference from the booster's predict_proba."""
+    return float(np.abs(ensemble.predict_proba(X)[:, 1]
+                        - model.predict_proba(X)[:, 1]).max())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.trees",
+        description="Compile the pickled XGBoost model to NumPy arrays.")
+    ap.add_argument("--model", default=str(MODEL_PATH))
+    ap.add_argument("--out", help="default: chainsight_trees.npz next to the model")
+    ap.add_argument("--check-rows", type=int, default=20_000,
+                    help="random rows compared against predict_proba")
+    args = ap.parse_args(argv)
+
+    out = args.out or compiled_path(args.model)
+    ens, model = compile_model(args.model, out)
+    X = probe_rows(ens, model.n_features_in_, args.check_rows)
+    diff = verify(ens, model, X)
+    if diff > 1e-5:
+        os.remove(out)
+        raise SystemExit(f"compiled model differs from xgboost by {diff:.2e}")
+
+    one = X[:1]
+    timings = {}
+    for name, fn in (("xgboost", model.predict_proba),
+                     ("numpy", ens.predict_proba)):
+        fn(one)
+        t0 = time.perf_counter()
+        for _ in range(200):
+            fn(one)
+        timings[name] = (time.perf_counter() - t0) / 200 * 1e3
+    print(f"{ens.n_trees} trees, {len(ens.value):,} nodes, depth {ens.depth}; "
+          f"max |diff| {diff:.1e} on {len(X):,} rows")
+    print(f"single-row latency: xgboost {timings['xgboost']:.3f} ms, "
+          f"numpy {timings['numpy']:.3f} ms -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Hyperparameter search for the XGBoost delay model.
+
+Random candidates from SPACE are raced with successive halving: every
+candidate is trained with a small tree budget, the best 1/ETA by validation
+ROC-AUC move on to ETA times the budget, and so on up to --max-trees.  Each
+trial also early-stops on the validation fold, so a rung never trains trees
+that stopped helping.  Trials of a rung run in parallel worker processes.
+
+Finished trials are cached on disk under the data fingerprint, candidate and
+budget, so an interrupted or repeated search resumes where it left off.  The
+winner is refitted on the notebook's full training split, checked on its test
+split and exported with the fitted preprocessor, its compiled NumPy copy
+(chainsight.trees) and a search log:
+
+    python -m chainsight.tuning global_supply_chain_disruption_v1.csv
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .config import MODEL_PATH, PREPROCESS_PATH, ROOT
+from .training import load_xy, save_model, split
+
+SPACE = {                                   # name -> (low, high, kind)
+    "max_depth":        (3, 10, "int"),
+    "learning_rate":    (0.01, 0.3, "log"),
+    "subsample":        (0.6, 1.0, "float"),
+    "colsample_bytree": (0.6, 1.0, "float"),
+    "min_child_weight": (1.0, 10.0, "log"),
+    "gamma":            (0.0, 2.0, "float"),
+}
+
+# Hand-picked settings of xgb_final in the notebook; always a candidate.
+BASELINE = {"max_depth": 6, "learning_rate": 0.05, "subsample": 0.8,
+            "colsample_bytree": 0.8, "min_child_weight": 1.0, "gamma": 0.0}
+
+ETA = 3
+EARLY_STOPPING = 30
+VAL_SIZE = 0.2                              # of the training split
+CACHE_DIR = Path(os.environ.get("CHAINSIGHT_TUNING_CACHE",
+                                ROOT / "chainsight_tuning"))
+
+
+def sample(n, seed=0):
+    """`n` candidates: the notebook baseline plus n-1 random draws."""
+    rng = np.random.default_rng(seed)
+    out = [dict(BASELINE)]
+    for _ in range(n - 1):
+        cand = {}
+        for name, (lo, hi, kind) in SPACE.items():
+            if kind == "int":
+                cand[name] = int(rng.integers(lo, hi + 1))
+            elif kind == "log":
+                cand[name] = round(float(math.exp(rng.uniform(math.log(lo),
+                                                              math.log(hi)))), 4)
+            else:
+                cand[name] = round(float(rng.uniform(lo, hi)), 4)
+        out.append(cand)
+    return out
+
+
+def rungs(min_trees, max_trees, eta=ETA):
+    budgets = [min_trees]
+    while budgets[-1] * eta <= max_trees:
+        budgets.append(budgets[-1] * eta)
+    return budgets
+
+
+def fingerprint(*arrays):
+    h = hashlib.blake2b(digest_size=10)
+    for arr in arrays:
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+
+def _trial_key(data_id, params, budget):
+    blob = json.dumps([data_id, params, budget], sort_keys=True)
+    return hashlib.blake2b(blob.encode(), digest_size=10).hexdigest()
+
+
+def _classifier(params, n_estimators, scale_pos_weight, n_jobs, **extra):
+    from xgboost import XGBClassifier
+    return XGBClassifier(n_estimators=n_estimators,
+                         scale_pos_weight=scale_pos_weight,
+                         eval_metric="logloss", random_state=42,
+                         n_jobs=n_jobs, **params, **extra)
+
+
+def _trial(params, budget, data_dir, scale_pos_weight, n_jobs):
+    """Train one candidate for `budget` trees; runs in a worker process."""
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    d = {k: np.load(Path(data_dir) / f"{k}.npy", mmap_mode="r")
+         for k in ("x_fit", "y_fit", "x_val", "y_val")}
+    model = _classifier(params, budget, scale_pos_weight, n_jobs,
+                        early_stopping_rounds=EARLY_STOPPING)
+    t0 = time.perf_counter()
+    model.fit(d["x_fit"], d["y_fit"], eval_set=[(d["x_val"], d["y_val"])],
+              verbose=False)
+    seconds = time.perf_counter() - t0
+    prob = model.predict_proba(d["x_val"])[:, 1]
+    return {"auc": round(float(roc_auc_score(d["y_val"], prob)), 5),
+            "logloss": round(float(log_loss(d["y_val"], prob)), 5),
+            "best_iteration": int(model.best_iteration),
+            "seconds": round(seconds, 3)}
+
+
+def search(X_train, y_train, candidates=27, min_trees=50, max_trees=1350,
+           workers=None, seed=0, cache_dir=CACHE_DIR, log=print):
+    """Successive-halving search; returns the list of trial records."""
+    from sklearn.model_selection import train_test_split
+
+    x_fit, x_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=VAL_SIZE, random_state=seed,
+        stratify=y_train)
+    data_id = fingerprint(x_fit, y_fit, x_val, y_val)
+    scale_pos_weight = float((y_fit == 0).sum() / max((y_fit == 1).sum(), 1))
+    workers = workers or os.cpu_count() or 1
+    n_jobs = max((os.cpu_count() or 1) // workers, 1)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    alive = list(enumerate(sample(candidates, seed)))
+    trials = []
+    with tempfile.TemporaryDirectory() as tmp, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, arr in {"x_fit": x_fit, "y_fit": y_fit,
+                          "x_val": x_val, "y_val": y_val}.items():
+            np.save(Path(tmp) / f"{name}.npy", arr)
+
+        budgets = rungs(min_trees, max_trees)
+        for rung, budget in enumerate(budgets):
+            t0 = time.perf_counter()
+            results, pending = {}, {}
+            for cid, params in alive:
+                path = cache_dir / f"{_trial_key(data_id, params, budget)}.json"
+                if path.exists():
+                    results[cid] = dict(json.loads(path.read_text()),
+                                        cached=True)
+                else:
+                    pending[cid] = (path, pool.submit(
+                        _trial, params, budget, tmp, scale_pos_weight, n_jobs))
+            for cid, (path, fut) in pending.items():
+                results[cid] = fut.result()
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(results[cid]))
+                os.replace(tmp_path, path)
+                results[cid]["cached"] = False
+
+            for cid, params in alive:
+                trials.append({"candidate": cid, "rung": rung,
+                               "budget": budget, "params": params,
+                               **results[cid]})
+            alive.sort(key=lambda c: -results[c[0]]["auc"])
+            best = results[alive[0][0]]
+            log(f"rung {rung}: {len(alive):>3} candidates x {budget:>5} trees "
+                f"({len(alive) - len(pending)} cached) in "
+                f"{time.perf_counter() - t0:6.1f} s   best val AUC "
+                f"{best['auc']:.4f}")
+            if rung < len(budgets) - 1:
+                alive = alive[:max(len(alive) // ETA, 1)]
+    return trials
+
+
+def export(pre, X, y, trials, model_path=MODEL_PATH,
+           preprocess_path=PREPROCESS_PATH, n_jobs=None):
+    """Refit the winner on the training split, evaluate and write artifacts.
+
+    The model is written to a temp file and renamed into place, so a running
+    dashboard or API hot-reloads a complete pickle.  Returns the search log.
+    """
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    top = max(trials, key=lambda t: (t["rung"], t["auc"]))
+    x_train, x_test, y_train, y_test = split(X, y)
+    spw = float((y_train == 0).sum() / max((y_train == 1).sum(), 1))
+    model = _classifier(top["params"], top["best_iteration"] + 1, spw,
+                        n_jobs or os.cpu_count())
+    model.fit(x_train, y_train)
+    prob = model.predict_proba(x_test)[:, 1]
+
+    model_path = Path(model_path)
+    pre.save(preprocess_path)
+    save_model(model, model_path)
+
+    entry = {
+        "exported_at": time.time(),
+        "model": str(model_path),
+        "params": top["params"],
+        "n_estimators": top["best_iteration"] + 1,
+        "val_auc": top["auc"],
+        "test_accuracy": round(float(accuracy_score(y_test, prob > 0.5)), 4),
+        "test_auc": round(float(roc_auc_score(y_test, prob)), 4),
+        "trials": trials,
+    }
+    log_path = model_path.with_name(model_path.stem + "_search.json")
+    log_path.write_text(json.dumps(entry, indent=2))
+    return entry
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        prog="python -m chainsight.tuning",
+        description="Search XGBoost hyperparameters and export the winner.")
+    ap.add_argument("data", help="raw shipments CSV or column store")
+    ap.add_argument("--candidates", type=int, default=27)
+    ap.add_argument("--min-trees", type=int, default=50)
+    ap.add_argument("--max-trees", type=int, default=1350)
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--cache", default=str(CACHE_DIR),
+                    help="directory of completed trial results")
+    ap.add_argument("--out", default=str(MODEL_PATH))
+    ap.add_argument("--preprocess-out", default=str(PREPROCESS_PATH))
+    args = ap.parse_args(argv)
+
+    pre, X, y = load_xy(args.data)
+    x_train, _, y_train, _ = split(X, y)
+    trials = search(x_train, y_train, args.candidates, args.min_trees,
+                    args.max_trees, args.workers, args.seed, args.cache)
+    entry = export(pre, X, y, trials, args.out, args.preprocess_out)
+    print(f"best {entry['params']} with {entry['n_estimators']} trees: "
+          f"test accuracy {entry['test_accuracy']:.4f}, "
+          f"ROC-AUC {entry['test_auc']:.4f} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()